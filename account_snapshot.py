@@ -0,0 +1,139 @@
+"""
+🧊 SNIPER ACCOUNT SNAPSHOT - Snapshot Akun Ter-cache untuk Endpoint Polling
+Satu background thread membangun snapshot akun (balance, posisi, state harian) setiap
+refresh_interval detik. Representasi JSON dan teks Pine Script di-render sekali per
+perubahan data beserta ETag-nya, sehingga polling /pine_data dan /pine_script_inputs
+tidak memicu request exchange dan bisa dibalas 304 Not Modified.
+Author: Sniper AI Trading Agent
+"""
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from bybit_config import BybitProductionConfig
+
+logger = logging.getLogger(__name__)
+
+# Kunci yang selalu berubah tiap refresh; tidak ikut menentukan ETag
+VOLATILE_KEYS = ('last_update',)
+
+
+class RenderedSnapshot:
+    """Snapshot yang sudah di-render (immutable setelah dibuat)"""
+
+    __slots__ = ('data', 'json_body', 'text', 'etag', 'built_at')
+
+    def __init__(self, data: Dict, json_body: bytes, text: str, etag: str):
+        self.data = data
+        self.json_body = json_body
+        self.text = text
+        self.etag = etag
+        self.built_at = time.time()
+
+    def etag_for(self, kind: str) -> str:
+        """ETag per representasi ('json' / 'text')"""
+        return f"{self.etag}-{kind}"
+
+
+class AccountSnapshotCache:
+    """
+    builder() -> dict data akun (boleh memanggil exchange; hanya dijalankan thread refresh)
+    renderer(data) -> teks Pine Script
+    """
+
+    def __init__(self, builder: Callable[[], Dict], renderer: Callable[[Dict], str],
+                 refresh_interval: float = None, name: str = 'account-snapshot'):
+        config = BybitProductionConfig.PINE_SNAPSHOT_CONFIG
+        self.builder = builder
+        self.renderer = renderer
+        self.refresh_interval = refresh_interval or config.get('refresh_interval', 5.0)
+        self.name = name
+
+        self._snapshot: Optional[RenderedSnapshot] = None
+        self._digest: Optional[str] = None
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self.refreshed_at: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.stats = {'refreshes': 0, 'renders': 0, 'errors': 0}
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self) -> bool:
+        """Bangun snapshot pertama lalu refresh berkala di background thread (idempotent)"""
+        if self._running:
+            return True
+        self.refresh()
+        self._running = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name=self.name, daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._running = False
+        self._stop.set()
+        self._wake.set()
+
+    def request_refresh(self):
+        """Bangunkan thread refresh sekarang (misal setelah trade dieksekusi)"""
+        self._wake.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.refresh_interval)
+            self._wake.clear()
+            if self._stop.is_set():
+                break
+            self.refresh()
+
+    # ------------------------------------------------------------------ refresh / render
+
+    def refresh(self) -> bool:
+        """Bangun data baru; render ulang hanya jika isinya berubah"""
+        try:
+            data = self.builder()
+        except Exception as e:
+            self.stats['errors'] += 1
+            self.last_error = str(e)
+            logger.error(f"❌ {self.name} refresh error: {e}")
+            return False
+
+        self.stats['refreshes'] += 1
+        self.refreshed_at = time.time()
+        self.last_error = None
+
+        stable = {key: value for key, value in data.items() if key not in VOLATILE_KEYS}
+        digest = hashlib.sha1(json.dumps(stable, sort_keys=True, default=str).encode()).hexdigest()[:16]
+        if digest == self._digest and self._snapshot is not None:
+            return True
+
+        text = self.renderer(data)
+        json_body = json.dumps({'success': True, 'data': data, 'pine_script_format': text}).encode()
+        self._snapshot = RenderedSnapshot(data, json_body, text, digest)
+        self._digest = digest
+        self.stats['renders'] += 1
+        return True
+
+    def get(self) -> Optional[RenderedSnapshot]:
+        """Snapshot terakhir (None jika belum pernah berhasil dibangun)"""
+        return self._snapshot
+
+    def get_status(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'running': self._running,
+            'refresh_interval': self.refresh_interval,
+            'etag': snapshot.etag if snapshot else None,
+            'built_at': datetime.fromtimestamp(snapshot.built_at).isoformat() if snapshot else None,
+            'refreshed_at': datetime.fromtimestamp(self.refreshed_at).isoformat() if self.refreshed_at else None,
+            'last_error': self.last_error,
+            **self.stats
+        }
@@ -5,7 +5,7 @@ Port: 7000
 Format: Card-based layout seperti e-commerce
 """
 
-from flask import Flask, render_template, jsonify, request, session, redirect, url_for, flash
+from flask import Flask, Response, render_template, jsonify, request, session, redirect, url_for, flash
 from flask_cors import CORS
 import json
 import subprocess
@@ -29,6 +29,15 @@ load_dotenv()
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 from detailed_api_check import DetailedBybitChecker
 from focused_trading_analysis import FocusedTradingAnalyzer
+from market_data_feed import get_shared_market_feed
+from private_stream import get_private_stream_for_keys
+from rate_limiter import PRIORITY_LOW, get_rate_limiter, rate_limited_response
+from request_coalescer import coalesce_ttl, get_single_flight, request_key
+from metrics import METRICS_CONTENT_TYPE, observe_rate_limited, observe_request, render_metrics
+from pagination import collect_response, iter_executions, iter_order_history
+from models import Execution, Order, Position, PositionSnapshot, WalletSnapshot, loads, parse_first, parse_list, to_float
+from http_pool import get_http_session
+from structured_logging import read_events
 
 app = Flask(__name__)
 app.secret_key = os.getenv('DASHBOARD_SECRET_KEY', 'fallback-secret-key-2024')
@@ -44,8 +53,13 @@ def login_required(f):
     return decorated_function
 
 class APIDashboard:
+    MAX_HISTORY_ROWS = 1000  # Batas row execution per refresh (memori tetap kecil)
+    
     def __init__(self):
-        self.base_url = "https://api.bybit.com"
+        self.base_url = os.environ.get('BYBIT_BASE_URL', "https://api.bybit.com").rstrip('/')
+        
+        # Public websocket feed (shared) untuk mark price real-time
+        self.market_feed = get_shared_market_feed()
         
         # API credentials for both accounts
         self.api_details = {
@@ -63,6 +77,12 @@ class APIDashboard:
             }
         }
         
+        # Private websocket mirror per akun (wallet/position tanpa polling REST)
+        self.private_streams = {
+            account_key: get_private_stream_for_keys(details["api_key"], details["api_secret"], account_key)
+            for account_key, details in self.api_details.items()
+        }
+        
         # Log files untuk alerts
         self.log_files = {
             "webhook": "/home/clurut/binance_webhook/webhook.log",
@@ -73,12 +93,7 @@ class APIDashboard:
     
     def safe_float(self, value, default=0.0):
         """Safely convert value to float, handling empty strings and None"""
-        if value is None or value == '' or value == 'None':
-            return default
-        try:
-            return float(value)
-        except (ValueError, TypeError):
-            return default
+        return to_float(value, default)
     
     def generate_signature(self, api_secret, timestamp, api_key, recv_window, params_str):
         """Generate signature untuk autentikasi Bybit V5 API"""
@@ -90,13 +105,30 @@ class APIDashboard:
         ).hexdigest()
 
     def make_direct_request(self, credentials, endpoint, params=None):
-        """Membuat request langsung ke Bybit API dengan autentikasi"""
+        """Membuat request langsung ke Bybit API dengan autentikasi (tab/refresh bersamaan berbagi request)"""
         if params is None:
             params = {}
+        
+        key = request_key(credentials['api_key'], 'GET', endpoint, params, PRIORITY_LOW)
+        return get_single_flight().do(
+            key, lambda: self._send_direct_request(credentials, endpoint, params),
+            ttl=coalesce_ttl(endpoint, PRIORITY_LOW),
+            account=credentials.get('name', 'dashboard').lower(), endpoint=endpoint
+        )
+    
+    def _send_direct_request(self, credentials, endpoint, params):
+        """Signed GET ke Bybit (rate limit prioritas rendah + metrics)"""
+        api_key = credentials['api_key']
+        
+        # Dashboard = prioritas rendah; mundur lebih dulu agar kuota order webhook aman
+        rate_limiter = get_rate_limiter(api_key)
+        account_name = credentials.get('name', 'dashboard').lower()
+        if not rate_limiter.acquire('GET', endpoint, PRIORITY_LOW):
+            observe_rate_limited(account_name, 'GET', endpoint)
+            return rate_limited_response(endpoint)
             
         timestamp = str(int(time.time() * 1000))
         recv_window = "5000"
-        api_key = credentials['api_key']
         
         sorted_params = sorted(params.items())
         params_str = urlencode(sorted_params)
@@ -122,52 +154,122 @@ class APIDashboard:
         if params_str:
             url += f"?{params_str}"
         
+        start = time.perf_counter()
         try:
-            response = requests.get(url, headers=headers, timeout=10)
+            response = get_http_session().get(url, headers=headers, timeout=10)
             response.raise_for_status()
-            return response.json()
+            result = loads(response.content)
+            observe_request(account_name, 'GET', endpoint, time.perf_counter() - start,
+                            ret_code=result.get('retCode'), bytes_sent=len(params_str),
+                            bytes_received=len(response.content))
+            rate_limiter.update_from_headers('GET', endpoint, response.headers, result.get('retCode'))
+            return result
+        except requests.exceptions.Timeout as e:
+            observe_request(account_name, 'GET', endpoint, time.perf_counter() - start, timeout=True)
+            return {"error": str(e), "retCode": -1}
         except Exception as e:
-             return {"error": str(e), "retCode": -1}
+            observe_request(account_name, 'GET', endpoint, time.perf_counter() - start, error=type(e).__name__)
+            return {"error": str(e), "retCode": -1}
+    
+    def get_mark_price(self, symbol, fallback="0"):
+        """Mark price dari market feed (memori), fallback ke nilai REST"""
+        if self.market_feed is not None and symbol:
+            self.market_feed.add_symbols([symbol])
+            mark_price = self.market_feed.get_mark_price(symbol)
+            if mark_price:
+                return mark_price
+        return self.safe_float(fallback)
     
     def get_direct_positions(self, account_key):
         """Mengambil posisi langsung dari Bybit API"""
         credentials = self.api_details[account_key]
         
-        # Get positions
-        positions_response = self.make_direct_request(
-            credentials, 
-            "/v5/position/list",
-            {"category": "linear", "settleCoin": "USDT"}
-        )
-        
-        positions = []
-        if positions_response.get("retCode") == 0:
-            for pos in positions_response.get("result", {}).get("list", []):
-                size = self.safe_float(pos.get("size", "0"))
-                if size > 0:  # Only active positions
-                    # Format field names to match what format_positions_data expects
-                    tp_value = pos.get("takeProfit", "0")
-                    sl_value = pos.get("stopLoss", "0")
-                    
-                    positions.append({
-                        "symbol": pos.get("symbol", ""),
-                        "side": pos.get("side", ""),
-                        "size": size,
-                        "entry_price": self.safe_float(pos.get("avgPrice", "0")),
-                        "mark_price": self.safe_float(pos.get("markPrice", "0")),
-                        "unrealized_pnl": self.safe_float(pos.get("unrealisedPnl", "0")),
-                        "leverage": pos.get("leverage", "1"),
-                        "stop_loss": sl_value if sl_value and sl_value != "0" else "None",
-                        "take_profit": tp_value if tp_value and tp_value != "0" else "None"
-                    })
+        # Get positions (mirror private stream jika ter-sync, fallback REST)
+        stream = self.private_streams.get(account_key)
+        if stream is not None and stream.is_ready():
+            positions_response = stream.position_response()
+        else:
+            positions_response = self.make_direct_request(
+                credentials, 
+                "/v5/position/list",
+                {"category": "linear", "settleCoin": "USDT", "limit": 200}
+            )
         
-        return positions
+        # Satu snapshot semua symbol per akun; hanya posisi aktif yang ditampilkan
+        snapshot = PositionSnapshot.from_response(positions_response)
+        if snapshot is None:
+            return []
+        return [self._position_row(position) for position in snapshot.open_positions()]
+    
+    def _position_row(self, position):
+        """Position model -> dict untuk tampilan dashboard"""
+        return {
+            "symbol": position.symbol,
+            "side": position.side,
+            "size": position.size,
+            "entry_price": position.avg_price,
+            "mark_price": self.get_mark_price(position.symbol, position.mark_price),
+            "unrealized_pnl": position.unrealised_pnl,
+            "leverage": position.leverage,
+            "stop_loss": position.stop_loss or "None",
+            "take_profit": position.take_profit or "None"
+        }
+    
+    def read_event_alerts(self, cutoff_time):
+        """Alert dari file event JSON (bybit_events.jsonl) tanpa regex, di-join per signal_id"""
+        alerts = []
+        by_signal = {}
+        events = read_events(events=('signal_queued', 'signal_rejected', 'signal_finished'), limit=5000)
+        for record in events:
+            fields = record.get('fields') or {}
+            log_time = datetime.fromisoformat(record['ts']).astimezone().replace(tzinfo=None)
+            if log_time < cutoff_time:
+                continue
+            symbol = str(fields.get('symbol') or '')
+            
+            if record['event'] == 'signal_finished':
+                alert = by_signal.get(fields.get('signal_id'))
+                if alert is None:
+                    continue
+                alert["status"] = fields.get('status')
+                if fields.get('status') == 'executed':
+                    alert["details"]["execution"] = "SUCCESS"
+                    for key in ('position_size', 'entry_price', 'stop_loss', 'take_profit'):
+                        if fields.get(key) is not None:
+                            alert["details"][key] = fields[key]
+                else:
+                    alert["details"]["error"] = fields.get('error')
+                continue
+            
+            # Filter hanya ETHUSDT perpetual (ETHUSDT, ETHUSDT.P, ETHUSDT-PERP)
+            if not symbol.upper().startswith('ETHUSDT'):
+                continue
+            try:
+                price = float(fields.get('price'))
+            except (TypeError, ValueError):
+                price = None
+            alert = {
+                "timestamp": log_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "type": "webhook",
+                "action": str(fields.get('action') or '').upper(),
+                "symbol": symbol,
+                "price": price,
+                "status": "received" if record['event'] == 'signal_queued' else "rejected",
+                "message": record.get('message', ''),
+                "details": {} if record['event'] == 'signal_queued' else {"error": fields.get('reason')}
+            }
+            alerts.append(alert)
+            if fields.get('signal_id'):
+                by_signal[fields['signal_id']] = alert
+        return alerts
     
     def read_alert_logs(self, hours_back=24):
         """Membaca alert signals dari log files dengan detail eksekusi"""
-        alerts = []
         cutoff_time = datetime.now() - timedelta(hours=hours_back)
         
+        # Event JSON terstruktur (webhook baru); regex di bawah hanya untuk log teks lama
+        alerts = self.read_event_alerts(cutoff_time)
+        
         # Update log files untuk include bybit_production.log
         production_log = "/home/clurut/binance_webhook/bybit_production.log"
         
@@ -363,30 +465,32 @@ class APIDashboard:
         
         for account_id, credentials in self.api_details.items():
             try:
-                # Get wallet balance
-                wallet_response = self.make_direct_request(
-                    credentials, 
-                    "/v5/account/wallet-balance",
-                    {"accountType": "UNIFIED"}
-                )
+                # Get wallet balance (mirror private stream jika ter-sync, fallback REST)
+                stream = self.private_streams.get(account_id)
+                if stream is not None and stream.is_ready():
+                    wallet_response = stream.wallet_response()
+                else:
+                    wallet_response = self.make_direct_request(
+                        credentials, 
+                        "/v5/account/wallet-balance",
+                        {"accountType": "UNIFIED"}
+                    )
                 
                 # Get positions (direct API call)
                 positions = self.get_direct_positions(account_id)
                 
-                # Get recent trades
-                trades_response = self.make_direct_request(
-                    credentials,
-                    "/v5/execution/list",
-                    {"category": "linear", "limit": "20"}
-                )
+                def request_fn(endpoint, params, credentials=credentials):
+                    return self.make_direct_request(credentials, endpoint, params)
                 
-                # Get orders
-                orders_response = self.make_direct_request(
-                    credentials,
-                    "/v5/order/history",
-                    {"category": "linear", "limit": "20"}
+                # Trades 24 jam terakhir (semua halaman nextPageCursor, dibatasi MAX_HISTORY_ROWS)
+                trades_response = collect_response(
+                    iter_executions(request_fn, start_time=datetime.now() - timedelta(hours=24)),
+                    max_rows=self.MAX_HISTORY_ROWS
                 )
                 
+                # Get orders (20 terbaru)
+                orders_response = collect_response(iter_order_history(request_fn, limit=20), max_rows=20)
+                
                 results[account_id] = {
                     "name": credentials["name"],
                     "color": credentials["color"],
@@ -411,30 +515,21 @@ class APIDashboard:
     
     def format_wallet_data(self, wallet_result):
         """Format wallet data for display"""
-        if wallet_result.get("retCode") != 0:
-            return None
-            
-        # Handle direct API response format
-        if "result" in wallet_result and "list" in wallet_result["result"]:
-            wallet_data = wallet_result["result"]["list"][0]
-        else:
+        wallet = parse_first(wallet_result, WalletSnapshot)
+        if wallet is None:
             return None
         
         # Get USDT coin data
-        usdt_data = None
-        for coin in wallet_data.get('coin', []):
-            if coin['coin'] == 'USDT':
-                usdt_data = coin
-                break
+        usdt = wallet.coin('USDT')
         
         return {
-            "total_equity": self.safe_float(wallet_data.get('totalEquity', 0)),
-            "total_balance": self.safe_float(wallet_data.get('totalWalletBalance', 0)),
-            "available_balance": self.safe_float(wallet_data.get('totalAvailableBalance', 0)),
-            "margin_balance": self.safe_float(wallet_data.get('totalMarginBalance', 0)),
-            "unrealized_pnl": self.safe_float(wallet_data.get('totalPerpUPL', 0)),
-            "usdt_balance": self.safe_float(usdt_data.get('walletBalance', 0)) if usdt_data else 0,
-            "usdt_available": self.safe_float(usdt_data.get('availableToWithdraw', 0)) if usdt_data else 0
+            "total_equity": wallet.total_equity,
+            "total_balance": wallet.total_wallet_balance,
+            "available_balance": wallet.total_available_balance,
+            "margin_balance": wallet.total_margin_balance,
+            "unrealized_pnl": wallet.total_perp_upl,
+            "usdt_balance": usdt.wallet_balance if usdt else 0,
+            "usdt_available": usdt.available_to_withdraw if usdt else 0
         }
     
     def format_positions_data(self, positions_data):
@@ -444,44 +539,20 @@ class APIDashboard:
             return positions_data
             
         # Fallback for old format
-        if positions_data.get("retCode") != 0:
-            return []
-            
-        positions = positions_data["result"]["list"]
-        active_positions = []
-        
-        for pos in positions:
-            if self.safe_float(pos.get('size', 0)) > 0:
-                active_positions.append({
-                    "symbol": pos.get('symbol', 'N/A'),
-                    "side": pos.get('side', 'N/A'),
-                    "size": self.safe_float(pos.get('size', 0)),
-                    "entry_price": self.safe_float(pos.get('avgPrice', 0)),
-                    "mark_price": self.safe_float(pos.get('markPrice', 0)),
-                    "unrealized_pnl": self.safe_float(pos.get('unrealisedPnl', 0)),
-                    "leverage": pos.get('leverage', '0'),
-                    "stop_loss": pos.get('stopLoss', 'None'),
-                    "take_profit": pos.get('takeProfit', 'None')
-                })
-        
-        return active_positions
+        return [self._position_row(p) for p in parse_list(positions_data, Position) if p.is_open]
     
     def format_orders_data(self, orders_result, limit=5):
         """Format recent orders data for display"""
-        if orders_result.get("retCode") != 0:
-            return []
-            
-        orders = orders_result["result"]["list"]
         formatted_orders = []
         
-        for order in orders[:limit]:
-            created_time = datetime.fromtimestamp(int(order['createdTime'])/1000)
+        for order in parse_list(orders_result, Order)[:limit]:
+            created_time = datetime.fromtimestamp(order.created_time / 1000)
             formatted_orders.append({
-                "symbol": order.get('symbol', 'N/A'),
-                "side": order.get('side', 'N/A'),
-                "qty": self.safe_float(order.get('qty', 0)),
-                "price": self.safe_float(order.get('price', 0)),
-                "status": order.get('orderStatus', 'N/A'),
+                "symbol": order.symbol or 'N/A',
+                "side": order.side or 'N/A',
+                "qty": order.qty,
+                "price": order.price,
+                "status": order.order_status or 'N/A',
                 "time": created_time.strftime('%Y-%m-%d %H:%M:%S'),
                 "time_ago": self.time_ago(created_time)
             })
@@ -490,21 +561,17 @@ class APIDashboard:
     
     def format_trades_data(self, trades_result, limit=5):
         """Format recent trades data for display"""
-        if trades_result.get("retCode") != 0:
-            return []
-            
-        trades = trades_result["result"]["list"]
         formatted_trades = []
         
-        for trade in trades[:limit]:
-            exec_time = datetime.fromtimestamp(int(trade['execTime'])/1000)
+        for trade in parse_list(trades_result, Execution)[:limit]:
+            exec_time = datetime.fromtimestamp(trade.exec_time / 1000)
             formatted_trades.append({
-                "symbol": trade.get('symbol', 'N/A'),
-                "side": trade.get('side', 'N/A'),
-                "qty": self.safe_float(trade.get('execQty', 0)),
-                "price": self.safe_float(trade.get('execPrice', 0)),
-                "value": self.safe_float(trade.get('execValue', 0)),
-                "fee": self.safe_float(trade.get('execFee', 0)),
+                "symbol": trade.symbol or 'N/A',
+                "side": trade.side or 'N/A',
+                "qty": trade.exec_qty,
+                "price": trade.exec_price,
+                "value": trade.exec_value,
+                "fee": trade.exec_fee,
                 "time": exec_time.strftime('%Y-%m-%d %H:%M:%S'),
                 "time_ago": self.time_ago(exec_time)
             })
@@ -581,14 +648,15 @@ class APIDashboard:
                     # Initialize client
                     client = BybitProductionClient(api_key, secret_key, testnet=False)
                     
-                    # Get current position
-                    position_info = client.get_position_info(symbol)
+                    # Get current position (snapshot semua posisi akun, satu request)
+                    snapshot = client.get_positions_snapshot()
                     
-                    if not position_info.get('success'):
+                    if snapshot is None:
                         results.append({'account': name, 'success': False, 'error': 'Failed to get position info'})
                         continue
                     
-                    position_size = position_info.get('size', 0)
+                    position = snapshot.get(symbol)
+                    position_size = position.size
                     
                     if position_size == 0:
                         results.append({'account': name, 'success': True, 'action': 'no_position'})
@@ -604,7 +672,7 @@ class APIDashboard:
                             'action': 'closed',
                             'order_id': close_result.get('order_id'),
                             'closed_size': position_size,
-                            'closed_side': position_info.get('side', 'Unknown')
+                            'closed_side': position.side or 'Unknown'
                         })
                     else:
                         results.append({'account': name, 'success': False, 'error': close_result.get('error', 'Unknown error')})
@@ -664,6 +732,11 @@ def logout():
     flash('You have been logged out.', 'info')
     return redirect(url_for('login'))
 
+@app.route('/metrics')
+def metrics():
+    """Prometheus metrics: latency / retCode / timeout per endpoint per akun"""
+    return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+
 @app.route('/')
 @login_required
 def index():
@@ -769,6 +842,7 @@ def multi_account_summary():
                 positions = dashboard.format_positions_data(data["positions"])
                 orders = dashboard.format_orders_data(data["orders"])
                 trades = dashboard.format_trades_data(data["trades"])
+                daily_trades = dashboard.format_trades_data(data["trades"], limit=None)
                 
                 # Add to summary
                 if wallet:
@@ -803,8 +877,8 @@ def multi_account_summary():
                 }
                 
                 # Add to trading stats
-                summary["trading_stats"]["daily_trades"] += len(trades)
-                for trade in trades:
+                summary["trading_stats"]["daily_trades"] += len(daily_trades)
+                for trade in daily_trades:
                     summary["trading_stats"]["total_volume"] += trade["value"]
             
             else:
@@ -0,0 +1,428 @@
+"""
+⚡ SNIPER ASYNC BYBIT CLIENT - asyncio Production Trading
+Counterpart asyncio dari BybitProductionClient: satu event loop, koneksi keep-alive
+yang di-pool, sehingga webhook, executor dan dashboard bisa fan-out banyak
+request bertanda tangan secara bersamaan tanpa thread per request.
+Author: Sniper AI Trading Agent
+"""
+
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import aiohttp
+
+from bybit_client import (SERVER_ERROR_RET_CODES, TIMESTAMP_ERROR_RET_CODE, BybitProductionClient,
+                          BybitRequestSigner)
+from bybit_config import BybitProductionConfig
+from indicator_engine import KlineStore, get_shared_kline_store
+from rate_limiter import get_rate_limiter, rate_limited_response
+from circuit_breaker import get_endpoint_guard
+from connection_keeper import SERVER_TIME_ENDPOINT, get_exchange_clock
+from metrics import observe_rate_limited, observe_request
+from models import Position, PositionSnapshot, WalletSnapshot, loads, parse_first
+from request_coalescer import AsyncSingleFlight, coalesce_ttl, get_async_single_flight, request_key
+
+
+def create_shared_session(limit: int = 100, limit_per_host: int = 50,
+                          keepalive_timeout: float = 60.0) -> aiohttp.ClientSession:
+    """
+    Buat aiohttp session dengan connection pool keep-alive.
+    Satu session bisa dipakai bersama oleh banyak AsyncBybitProductionClient
+    (misal satu per akun) di event loop yang sama.
+    """
+    connector = aiohttp.TCPConnector(
+        limit=limit,
+        limit_per_host=limit_per_host,
+        keepalive_timeout=keepalive_timeout,
+        ttl_dns_cache=300
+    )
+    return aiohttp.ClientSession(connector=connector)
+
+
+class AsyncBybitProductionClient:
+    """Async Bybit Production Client untuk Sniper Trading Bot"""
+
+    def __init__(self, api_key: str, secret_key: str, testnet: bool = False,
+                 session: Optional[aiohttp.ClientSession] = None, timeout: float = 10.0,
+                 kline_store: Optional[KlineStore] = None, account_name: str = None,
+                 base_url: str = None):
+        self.api_key = api_key
+        self.account_name = account_name or 'default'  # Label metrics per akun
+        self.secret_key = secret_key
+        self.testnet = testnet
+        self.base_url = (base_url or BybitProductionConfig.get_bybit_base_url()).rstrip('/')
+        self.signer = BybitRequestSigner(api_key, secret_key)
+        self.kline_store = kline_store or get_shared_kline_store()
+        self.market_feed = None
+        self.rate_limiter = get_rate_limiter(api_key)
+        self.default_priority = None
+        self.coalesce = BybitProductionConfig.COALESCE_CONFIG.get('enabled', True)
+        self.clock = get_exchange_clock()
+        self.guard = get_endpoint_guard(self.base_url)
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+
+        # Session eksternal (shared pool) tidak ditutup oleh client ini
+        self._session = session
+        self._owns_session = session is None
+
+        print(f"⚡ Async Bybit Client initialized - {'Testnet' if testnet else 'Production'}")
+        print(f"📊 Base URL: {self.base_url}")
+
+    @property
+    def single_flight(self) -> AsyncSingleFlight:
+        """Single-flight event loop yang sedang berjalan (dibagi semua client di loop itu, key per API key)"""
+        return get_async_single_flight()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Lazily create session di event loop yang sedang berjalan"""
+        if self._session is None or self._session.closed:
+            self._session = create_shared_session()
+            self._owns_session = True
+        return self._session
+
+    async def close(self):
+        """Tutup session milik client (session shared dibiarkan terbuka)"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+
+    def attach_market_feed(self, feed):
+        """Pakai PublicMarketDataFeed untuk price lookup (REST hanya fallback)"""
+        self.market_feed = feed
+
+    async def warm_up(self) -> Dict:
+        """Buka koneksi pool (DNS + TCP + TLS) dengan call publik ringan tanpa signing"""
+        session = await self._get_session()
+        start = time.perf_counter()
+        try:
+            async with session.get(f"{self.base_url}{SERVER_TIME_ENDPOINT}", timeout=self.timeout) as response:
+                response.raise_for_status()
+                await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return {'success': False, 'error': str(e) or type(e).__name__}
+        return {'success': True, 'latency_ms': round((time.perf_counter() - start) * 1000, 1)}
+
+    async def sync_clock(self, samples: int = None) -> Dict:
+        """Ukur ulang offset jam server (sampel RTT terkecil), setara BybitProductionClient.sync_clock"""
+        samples = samples or BybitProductionConfig.CONNECTION_CONFIG.get('clock_samples', 5)
+        session = await self._get_session()
+        best = None
+        for _ in range(samples):
+            try:
+                t0 = time.time() * 1000
+                async with session.get(f"{self.base_url}{SERVER_TIME_ENDPOINT}", timeout=self.timeout) as response:
+                    payload = loads(await response.read())
+                t1 = time.time() * 1000
+            except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+                print(f"⚠️ Clock sync sample failed: {e}")
+                continue
+            server_ms = self.clock._server_ms(payload)
+            if server_ms is None:
+                continue
+            rtt = t1 - t0
+            if best is None or rtt < best[0]:
+                best = (rtt, server_ms - (t0 + t1) / 2)
+        return self.clock.apply(best)
+
+    def _generate_signature(self, timestamp: str, params: str) -> str:
+        """Generate signature for Bybit API"""
+        return self.signer.sign(timestamp, params.encode('utf-8'))
+
+    async def _acquire(self, method: str, endpoint: str, priority: str = None) -> bool:
+        """Token bucket acquire tanpa memblokir event loop"""
+        deadline = time.monotonic() + self.rate_limiter.max_wait_for(method, endpoint, priority)
+        while True:
+            delay = self.rate_limiter.try_acquire(method, endpoint, priority)
+            if delay == 0.0:
+                return True
+            if delay > deadline - time.monotonic():
+                self.rate_limiter.record_rejected()
+                return False
+            await asyncio.sleep(delay)
+
+    async def _make_request(self, method: str, endpoint: str, params: Dict = None, priority: str = None) -> Dict:
+        """Make authenticated request to Bybit API (GET identik bersamaan berbagi satu request)"""
+        priority = priority or self.default_priority
+        key = request_key(self.api_key, method, endpoint, params, priority) if self.coalesce else None
+        if key is None:
+            result = await self._send_request(method, endpoint, params, priority)
+            if method.upper() != 'GET' and result.get('retCode') == 0:
+                self.single_flight.invalidate(self.api_key)
+            return result
+        return await self.single_flight.do(
+            key, lambda: self._send_request(method, endpoint, params, priority),
+            ttl=coalesce_ttl(endpoint, priority), account=self.account_name, endpoint=endpoint
+        )
+
+    async def _send_request(self, method: str, endpoint: str, params: Dict = None, priority: str = None,
+                            _retry_on_timestamp: bool = True) -> Dict:
+        """Kirim satu request bertanda tangan (rate limit, circuit breaker, clock, metrics, retry timestamp)"""
+        # Token rate limit diambil sebelum circuit breaker: penolakan lokal tidak memakan slot half-open
+        if not await self._acquire(method, endpoint, priority):
+            print(f"🚦 Rate limit: {method} {endpoint} ditunda (priority {priority or 'auto'})")
+            observe_rate_limited(self.account_name, method, endpoint)
+            return rate_limited_response(endpoint)
+
+        timestamp = str(self.clock.now_ms())
+
+        if params is None:
+            params = {}
+
+        # Serialize + sign sekali; byte yang dikirim = byte yang ditandatangani
+        url, body, headers = self.signer.build(method, f"{self.base_url}{endpoint}", params, timestamp)
+
+        bytes_sent = len(body) if body else len(url) - len(self.base_url) - len(endpoint)
+        session = await self._get_session()
+        timeout = aiohttp.ClientTimeout(total=min(self.timeout.total, self.guard.timeout_for(method, endpoint)))
+
+        if not self.guard.allow(method, endpoint):
+            return self.guard.fallback(method, endpoint, params)
+
+        start = time.perf_counter()
+        try:
+            async with session.request(method.upper(), url, headers=headers, data=body,
+                                       timeout=timeout) as response:
+                if response.status >= 500:
+                    self.guard.record_failure(method, endpoint)
+                response.raise_for_status()
+                raw = await response.read()
+                result = loads(raw)
+                elapsed = time.perf_counter() - start
+                observe_request(self.account_name, method, endpoint, elapsed,
+                                ret_code=result.get('retCode'), bytes_sent=bytes_sent, bytes_received=len(raw))
+                self.rate_limiter.update_from_headers(method, endpoint, response.headers, result.get('retCode'))
+                if result.get('retCode') in SERVER_ERROR_RET_CODES:
+                    self.guard.record_failure(method, endpoint)
+                else:
+                    self.guard.record_success(method, endpoint, elapsed)
+                    self.guard.remember(endpoint, params, result)
+
+            # Timestamp ditolak (request tidak dieksekusi) -> sync jam lalu kirim ulang sekali
+            if result.get('retCode') == TIMESTAMP_ERROR_RET_CODE and _retry_on_timestamp:
+                print(f"🕒 Timestamp rejected, re-syncing exchange clock: {result.get('retMsg')}")
+                await self.sync_clock()
+                return await self._send_request(method, endpoint, params, priority, _retry_on_timestamp=False)
+            return result
+
+        except asyncio.TimeoutError as e:
+            observe_request(self.account_name, method, endpoint, time.perf_counter() - start,
+                            bytes_sent=bytes_sent, timeout=True)
+            self.guard.record_failure(method, endpoint)
+            print(f"❌ Async API Request Timeout ({timeout.total:.2f}s): {e}")
+            return {'retCode': -1, 'retMsg': str(e) or type(e).__name__}
+        except aiohttp.ClientResponseError as e:
+            observe_request(self.account_name, method, endpoint, time.perf_counter() - start,
+                            bytes_sent=bytes_sent, error=type(e).__name__)
+            if e.status < 500:
+                self.guard.record_success(method, endpoint, time.perf_counter() - start)
+            print(f"❌ Async API Request Error: {e}")
+            return {'retCode': -1, 'retMsg': str(e) or type(e).__name__}
+        except (aiohttp.ClientError, ValueError) as e:
+            observe_request(self.account_name, method, endpoint, time.perf_counter() - start,
+                            bytes_sent=bytes_sent, error=type(e).__name__)
+            self.guard.record_failure(method, endpoint)
+            print(f"❌ Async API Request Error: {e}")
+            return {'retCode': -1, 'retMsg': str(e) or type(e).__name__}
+        finally:
+            # Keluar tanpa record_success/record_failure (cancel, exception lain) -> slot trial dilepas
+            self.guard.release(method, endpoint)
+
+    async def get_account_balance(self) -> Dict:
+        """Get account balance"""
+        endpoint = "/v5/account/wallet-balance"
+        params = {'accountType': 'UNIFIED'}
+
+        response = await self._make_request('GET', endpoint, params)
+        return BybitProductionClient._parse_balance_response(response)
+
+    async def get_wallet(self) -> Optional[WalletSnapshot]:
+        """Wallet UNIFIED sebagai model (None jika gagal)"""
+        response = await self._make_request('GET', "/v5/account/wallet-balance", {'accountType': 'UNIFIED'})
+        return parse_first(response, WalletSnapshot)
+
+    async def get_current_price(self, symbol: str) -> Optional[float]:
+        """Get current price for symbol (market feed jika fresh, fallback REST)"""
+        if self.market_feed is not None:
+            price = self.market_feed.get_last_price(symbol)
+            if price:
+                return price
+
+        endpoint = "/v5/market/tickers"
+        params = {'category': 'linear', 'symbol': symbol}
+
+        response = await self._make_request('GET', endpoint, params)
+        return BybitProductionClient._parse_price_response(response)
+
+    async def get_mark_price(self, symbol: str) -> Optional[float]:
+        """Get mark price for symbol (market feed jika fresh, fallback REST)"""
+        if self.market_feed is not None:
+            price = self.market_feed.get_mark_price(symbol)
+            if price:
+                return price
+
+        endpoint = "/v5/market/tickers"
+        params = {'category': 'linear', 'symbol': symbol}
+
+        response = await self._make_request('GET', endpoint, params)
+        return BybitProductionClient._parse_price_response(response, field='markPrice')
+
+    async def _positions_response(self, settle_coin: str = 'USDT') -> Dict:
+        """Raw position/list semua symbol linear (halaman > 200 posisi digabung)"""
+        params = {'category': 'linear', 'settleCoin': settle_coin,
+                  'limit': BybitProductionClient.POSITION_PAGE_LIMIT}
+        response = await self._make_request('GET', "/v5/position/list", params)
+        cursor = (response.get('result') or {}).get('nextPageCursor') if response.get('retCode') == 0 else None
+        if not cursor:
+            return response
+
+        items = list(response['result'].get('list') or [])
+        while cursor:
+            page = await self._make_request('GET', "/v5/position/list", {**params, 'cursor': cursor})
+            if page.get('retCode') != 0:
+                return page
+            items.extend(page['result'].get('list') or [])
+            cursor = page['result'].get('nextPageCursor')
+        return {**response, 'result': {**response['result'], 'list': items, 'nextPageCursor': ''}}
+
+    async def get_positions_snapshot(self, settle_coin: str = 'USDT') -> Optional[PositionSnapshot]:
+        """Semua posisi linear akun dalam satu call, di-index per symbol/side (None jika gagal)"""
+        return PositionSnapshot.from_response(await self._positions_response(settle_coin), time.time())
+
+    async def get_position(self, symbol: str) -> Optional[Position]:
+        """Posisi symbol sebagai model (size 0 jika flat, None jika request gagal)"""
+        snapshot = await self.get_positions_snapshot()
+        return snapshot.get(symbol) if snapshot is not None else None
+
+    async def get_position_info(self, symbol: str) -> Dict:
+        """Get current position information (dari snapshot semua posisi akun)"""
+        response = await self._positions_response()
+        return BybitProductionClient._parse_position_response(response, symbol)
+
+    async def place_order(self, symbol: str, side: str, qty: float, price: float = None,
+                          stop_loss: float = None, take_profit: float = None) -> Dict:
+        """Place order (market jika price None, limit jika price diisi)"""
+        endpoint = "/v5/order/create"
+        params = BybitProductionClient._build_order_params(symbol, side, qty, price, stop_loss, take_profit)
+
+        print(f"⚡ Placing {side.upper()} order for {symbol} | Qty: {qty} | Price: {price if price else 'Market'}")
+
+        response = await self._make_request('POST', endpoint, params)
+        return BybitProductionClient._parse_order_response(
+            response, symbol, side, qty, price, stop_loss, take_profit
+        )
+
+    async def close_position(self, symbol: str) -> Dict:
+        """Close open position for specified symbol"""
+        try:
+            position_info = await self.get_position_info(symbol)
+
+            if not position_info['success']:
+                return {'success': False, 'error': 'Unable to get position info'}
+
+            if position_info.get('size', 0) == 0:
+                return {'success': False, 'error': 'No open position to close'}
+
+            current_side = position_info['side']
+            close_side = 'Sell' if current_side == 'Buy' else 'Buy'
+            position_size = position_info['size']
+
+            endpoint = "/v5/order/create"
+            params = BybitProductionClient._build_close_params(symbol, close_side, position_size)
+
+            print(f"🔄 Closing {current_side} position for {symbol} | Size: {position_size}")
+
+            response = await self._make_request('POST', endpoint, params)
+            return BybitProductionClient._parse_close_response(
+                response, symbol, close_side, position_size, current_side
+            )
+
+        except Exception as e:
+            print(f"❌ Error closing position: {e}")
+            return {
+                'success': False,
+                'error': f'Error closing position: {str(e)}'
+            }
+
+    async def calculate_atr(self, symbol: str, period: int = 14) -> float:
+        """Calculate ATR dari KlineStore (delta fetch), fallback kline 1 jam / 0.5% harga"""
+        if period == self.kline_store.atr_period:
+            limit = self.kline_store.refresh_limit(symbol)
+            if limit:
+                response = await self._make_request('GET', "/v5/market/kline", {
+                    'category': 'linear',
+                    'symbol': symbol,
+                    'interval': self.kline_store.interval,
+                    'limit': limit
+                })
+                if response.get('retCode') == 0:
+                    self.kline_store.ingest(symbol, response['result']['list'])
+            atr = self.kline_store.get_atr(symbol)
+            if atr:
+                return atr
+
+        endpoint = "/v5/market/kline"
+        params = {
+            'category': 'linear',
+            'symbol': symbol,
+            'interval': '60',
+            'limit': period + 1
+        }
+
+        response = await self._make_request('GET', endpoint, params)
+
+        if response.get('retCode') == 0:
+            atr = BybitProductionClient._compute_atr(response['result']['list'], period)
+            if atr is not None:
+                return atr
+
+        # Fallback: use 0.5% of current price as ATR estimate
+        current_price = await self.get_current_price(symbol)
+        return current_price * 0.005 if current_price else 0
+
+    async def get_open_orders(self, symbol: str = None) -> Dict:
+        """Get all open orders including TP/SL orders"""
+        endpoint = "/v5/order/realtime"
+        params = {
+            'category': 'linear'
+        }
+
+        if symbol:
+            params['symbol'] = symbol
+
+        response = await self._make_request('GET', endpoint, params)
+        return BybitProductionClient._parse_open_orders_response(response)
+
+    async def get_trade_history(self, symbol: str, limit: int = 50) -> Dict:
+        """Get recent trade history"""
+        endpoint = "/v5/execution/list"
+        params = {
+            'category': 'linear',
+            'symbol': symbol,
+            'limit': limit
+        }
+
+        response = await self._make_request('GET', endpoint, params)
+        return BybitProductionClient._parse_trade_history_response(response)
+
+
+async def gather_for_accounts(clients: Dict[str, AsyncBybitProductionClient], method: str,
+                              *args, **kwargs) -> Dict[str, object]:
+    """
+    Jalankan method yang sama di semua akun secara bersamaan.
+    Contoh: await gather_for_accounts(clients, 'get_account_balance')
+    """
+    names: List[str] = list(clients.keys())
+    results = await asyncio.gather(
+        *(getattr(clients[name], method)(*args, **kwargs) for name in names),
+        return_exceptions=True
+    )
+    return {
+        name: ({'success': False, 'error': str(result)} if isinstance(result, Exception) else result)
+        for name, result in zip(names, results)
+    }
@@ -10,21 +10,122 @@ import time
 import json
 import requests
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
 from bybit_config import BybitProductionConfig
+from indicator_engine import KlineStore, get_shared_kline_store
+from rate_limiter import get_rate_limiter, rate_limited_response
+from connection_keeper import SERVER_TIME_ENDPOINT, get_exchange_clock
+from metrics import observe_rate_limited, observe_request
+from pagination import iter_executions, iter_order_history
+from models import Position, PositionSnapshot, Ticker, WalletSnapshot, loads, parse_first
+from request_coalescer import coalesce_ttl, get_single_flight, request_key
+from circuit_breaker import get_endpoint_guard
+from http_pool import create_session
+from ws_order_entry import DUPLICATE_ORDER_LINK_ID, new_order_link_id
+from pretrade import gather_pretrade
+from symbol_registry import get_symbol_registry
+
+RECV_WINDOW = str(BybitProductionConfig.CONNECTION_CONFIG.get('recv_window', 5000))
+
+# retCode Bybit: timestamp di luar recv_window (jam lokal drift)
+TIMESTAMP_ERROR_RET_CODE = 10002
+
+# retCode Bybit untuk error sisi server (dihitung sebagai kegagalan endpoint)
+SERVER_ERROR_RET_CODES = (10000, 10016)
+
+# Field tickers API -> atribut model Ticker
+TICKER_PRICE_FIELDS = {'lastPrice': 'last_price', 'markPrice': 'mark_price', 'indexPrice': 'index_price'}
+
+class BybitRequestSigner:
+    """
+    Builder request bertanda tangan untuk Bybit V5.
+    Body/query diserialisasi SEKALI, byte yang ditandatangani sama persis dengan
+    byte yang dikirim, dan konteks HMAC ber-key dipakai ulang (copy per request).
+    """
+    
+    def __init__(self, api_key: str, secret_key: str, recv_window: str = RECV_WINDOW):
+        self.api_key = api_key
+        self.recv_window = recv_window
+        self._hmac = hmac.new(secret_key.encode('utf-8'), digestmod=hashlib.sha256)
+        self._key_window = f"{api_key}{recv_window}".encode('utf-8')
+    
+    def sign(self, timestamp: str, payload: bytes) -> str:
+        """HMAC-SHA256 dari timestamp + api_key + recv_window + payload"""
+        mac = self._hmac.copy()
+        mac.update(timestamp.encode('ascii'))
+        mac.update(self._key_window)
+        mac.update(payload)
+        return mac.hexdigest()
+    
+    @staticmethod
+    def encode_query(params: Dict) -> str:
+        """Query string kanonik (key terurut) - dipakai untuk sign dan URL"""
+        return urlencode(sorted(params.items())) if params else ''
+    
+    @staticmethod
+    def encode_body(params: Dict) -> bytes:
+        """JSON body kompak, diserialisasi sekali"""
+        return json.dumps(params, separators=(',', ':')).encode('utf-8') if params else b''
+    
+    def build(self, method: str, url: str, params: Dict, timestamp: str) -> Tuple[str, Optional[bytes], Dict]:
+        """
+        Return (url, body, headers) siap kirim.
+        GET: signature atas query string yang sama dengan di URL.
+        POST: signature atas body bytes yang sama dengan yang dikirim.
+        """
+        method = method.upper()
+        if method == 'GET':
+            query_string = self.encode_query(params)
+            payload = query_string.encode('utf-8')
+            body = None
+            if query_string:
+                url = f"{url}?{query_string}"
+        elif method == 'POST':
+            body = self.encode_body(params)
+            payload = body
+        else:
+            raise ValueError(f"Unsupported method: {method}")
+        
+        headers = {
+            'X-BAPI-API-KEY': self.api_key,
+            'X-BAPI-SIGN': self.sign(timestamp, payload),
+            'X-BAPI-TIMESTAMP': timestamp,
+            'X-BAPI-RECV-WINDOW': self.recv_window,
+            'Content-Type': 'application/json'
+        }
+        return url, body, headers
 
 class BybitProductionClient:
     """Bybit Production Client untuk Sniper Trading Bot"""
     
-    def __init__(self, api_key: str, secret_key: str, testnet: bool = False):
+    def __init__(self, api_key: str, secret_key: str, testnet: bool = False,
+                 kline_store: Optional[KlineStore] = None, account_name: str = None,
+                 base_url: str = None):
         self.api_key = api_key
+        self.account_name = account_name or 'default'  # Label metrics per akun
         self.secret_key = secret_key
         self.testnet = testnet
-        self.base_url = BybitProductionConfig.get_bybit_base_url()
-        self.session = requests.Session()
-        
-        # Set headers
-        self.session.headers.update({
+        self.base_url = (base_url or BybitProductionConfig.get_bybit_base_url()).rstrip('/')
+        self.signer = BybitRequestSigner(api_key, secret_key)
+        # Kline/indikator store bersama semua akun (ATR dibaca O(1))
+        self.kline_store = kline_store or get_shared_kline_store()
+        # Public websocket feed (opsional); harga dibaca dari memori jika fresh
+        self.market_feed = None
+        # Private websocket mirror (opsional); position/order/wallet dari memori jika ter-sync
+        self.private_stream = None
+        # Trade websocket (opsional); order create/amend/cancel tanpa HTTP, REST fallback
+        self.order_entry = None
+        # Token bucket per API key (dibagi semua client dengan key yang sama)
+        self.rate_limiter = get_rate_limiter(api_key)
+        self.default_priority = None  # None = otomatis (order high, read normal); dashboard set 'low'
+        self.coalesce = BybitProductionConfig.COALESCE_CONFIG.get('enabled', True)
+        self.guard = get_endpoint_guard(self.base_url)  # Adaptive timeout + circuit breaker
+        # Jam server (offset diukur dari /v5/market/time) untuk X-BAPI-TIMESTAMP
+        self.clock = get_exchange_clock()
+        # Session per akun (header sendiri) di atas connection pool process-wide
+        self.session = create_session({
             'X-BAPI-API-KEY': self.api_key,
             'Content-Type': 'application/json'
         })
@@ -32,130 +133,314 @@ class BybitProductionClient:
         print(f"🎯 Bybit Client initialized - {'Testnet' if testnet else 'Production'}")
         print(f"📊 Base URL: {self.base_url}")
     
+    def attach_market_feed(self, feed):
+        """Pakai PublicMarketDataFeed untuk price lookup (REST hanya fallback)"""
+        self.market_feed = feed
+    
+    def attach_private_stream(self, stream):
+        """Pakai PrivateStreamMirror untuk position/order/wallet (REST hanya fallback)"""
+        self.private_stream = stream
+    
+    def attach_order_entry(self, entry):
+        """Pakai WebSocketOrderEntry untuk order create/amend/cancel (REST hanya fallback)"""
+        self.order_entry = entry
+    
+    def _private_mirror(self):
+        """Mirror private stream jika sedang authoritative, selain itu None"""
+        if self.private_stream is not None and self.private_stream.is_ready():
+            return self.private_stream
+        return None
+    
     def _generate_signature(self, timestamp: str, params: str) -> str:
         """Generate signature for Bybit API"""
-        param_str = f"{timestamp}{self.api_key}5000{params}"
-        return hmac.new(
-            self.secret_key.encode('utf-8'),
-            param_str.encode('utf-8'),
-            hashlib.sha256
-        ).hexdigest()
+        return self.signer.sign(timestamp, params.encode('utf-8'))
+    
+    def warm_up(self) -> Dict:
+        """Buka koneksi keep-alive (DNS + TCP + TLS) dengan call publik ringan tanpa signing"""
+        start = time.perf_counter()
+        try:
+            response = self.session.get(f"{self.base_url}{SERVER_TIME_ENDPOINT}", timeout=5)
+            response.raise_for_status()
+        except requests.exceptions.RequestException as e:
+            return {'success': False, 'error': str(e)}
+        return {'success': True, 'latency_ms': round((time.perf_counter() - start) * 1000, 1)}
+    
+    def sync_clock(self) -> Dict:
+        """Ukur ulang offset jam server memakai session client ini"""
+        return self.clock.sync(self.session, self.base_url)
+    
+    def _make_request(self, method: str, endpoint: str, params: Dict = None, priority: str = None) -> Dict:
+        """
+        Make authenticated request to Bybit API.
+        GET identik yang bersamaan (akun, endpoint, params, priority) berbagi satu request;
+        hasil dibagi antar caller dan harus diperlakukan read-only.
+        """
+        priority = priority or self.default_priority
+        key = request_key(self.api_key, method, endpoint, params, priority) if self.coalesce else None
+        if key is None:
+            result = self._send_write(method, endpoint, params, priority)
+            if method.upper() != 'GET' and result.get('retCode') == 0:
+                # Order/posisi berubah -> cache read dashboard tidak lagi valid
+                get_single_flight().invalidate(self.api_key)
+            return result
+        return get_single_flight().do(
+            key, lambda: self._send_request(method, endpoint, params, priority),
+            ttl=coalesce_ttl(endpoint, priority), account=self.account_name, endpoint=endpoint
+        )
     
-    def _make_request(self, method: str, endpoint: str, params: Dict = None) -> Dict:
-        """Make authenticated request to Bybit API"""
-        timestamp = str(int(time.time() * 1000))
+    def _send_write(self, method: str, endpoint: str, params: Dict = None, priority: str = None) -> Dict:
+        """Request non-GET: order lewat trade websocket jika siap, selain itu REST"""
+        entry = self.order_entry
+        if entry is None or not entry.supports(endpoint) or not entry.is_ready():
+            return self._send_request(method, endpoint, params, priority)
+        
+        # orderLinkId membuat konfirmasi ulang via REST idempotent
+        if endpoint == '/v5/order/create' and not params.get('orderLinkId'):
+            params = {**params, 'orderLinkId': new_order_link_id()}
+        elif endpoint == '/v5/order/create-batch':
+            params = {**params, 'request': self._with_order_link_ids(params.get('request') or [])}
+        if not self.rate_limiter.acquire(method, endpoint, priority):
+            print(f"🚦 Rate limit: WS {endpoint} ditunda (priority {priority or 'auto'})")
+            observe_rate_limited(self.account_name, method, endpoint)
+            return rate_limited_response(endpoint)
+        
+        start = time.perf_counter()
+        result = entry.submit(endpoint, params)
+        if result is None:
+            # Stream putus sebelum terkirim
+            return self._send_request(method, endpoint, params, priority)
+        observe_request(self.account_name, 'WS', endpoint, time.perf_counter() - start,
+                        ret_code=result.get('retCode'), timeout=bool(result.get('unconfirmed')))
+        if not result.get('unconfirmed'):
+            self.rate_limiter.update_from_headers(method, endpoint, result.get('header') or {}, result.get('retCode'))
+            return result
+        
+        # Ack hilang: status tidak diketahui -> kirim ulang via REST dengan orderLinkId yang sama
+        print(f"⚠️ WS {endpoint} tanpa ack, konfirmasi via REST")
+        response = self._send_request(method, endpoint, params, priority)
+        if endpoint == '/v5/order/create' and response.get('retCode') == DUPLICATE_ORDER_LINK_ID:
+            return self._order_by_link_id(params)
+        return response
+    
+    def _order_by_link_id(self, params: Dict) -> Dict:
+        """Order yang sudah diterima exchange (via websocket) -> respon seperti /v5/order/create"""
+        response = self._send_request('GET', '/v5/order/realtime', {
+            'category': params.get('category', 'linear'),
+            'symbol': params.get('symbol'),
+            'orderLinkId': params['orderLinkId']
+        }, 'high')
+        items = (response.get('result') or {}).get('list') or []
+        if response.get('retCode') != 0 or not items:
+            return {'retCode': DUPLICATE_ORDER_LINK_ID, 'retMsg': 'OrderLinkedID is duplicate (order not found)'}
+        return {'retCode': 0, 'retMsg': 'OK',
+                'result': {'orderId': items[0].get('orderId'), 'orderLinkId': items[0].get('orderLinkId')}}
+    
+    def _send_request(self, method: str, endpoint: str, params: Dict = None, priority: str = None,
+                      _retry_on_timestamp: bool = True) -> Dict:
+        """Kirim satu request bertanda tangan (rate limit, circuit breaker, clock, metrics, retry timestamp)"""
+        # Token rate limit diambil sebelum circuit breaker: penolakan lokal tidak memakan slot half-open
+        if not self.rate_limiter.acquire(method, endpoint, priority):
+            print(f"🚦 Rate limit: {method} {endpoint} ditunda (priority {priority or 'auto'})")
+            observe_rate_limited(self.account_name, method, endpoint)
+            return rate_limited_response(endpoint)
+        
+        timestamp = str(self.clock.now_ms())
         
         if params is None:
             params = {}
         
-        # Prepare request
-        if method.upper() == 'GET':
-            query_string = '&'.join([f"{k}={v}" for k, v in params.items()])
-            url = f"{self.base_url}{endpoint}?{query_string}" if query_string else f"{self.base_url}{endpoint}"
-            signature = self._generate_signature(timestamp, query_string)
-        else:
-            json_params = json.dumps(params) if params else ""
-            url = f"{self.base_url}{endpoint}"
-            signature = self._generate_signature(timestamp, json_params)
+        # Serialize + sign sekali; byte yang dikirim = byte yang ditandatangani
+        url, body, headers = self.signer.build(method, f"{self.base_url}{endpoint}", params, timestamp)
+        bytes_sent = len(body) if body else len(url) - len(self.base_url) - len(endpoint)
+        timeout = self.guard.timeout_for(method, endpoint)
         
-        # Set headers
-        headers = {
-            'X-BAPI-API-KEY': self.api_key,
-            'X-BAPI-SIGN': signature,
-            'X-BAPI-TIMESTAMP': timestamp,
-            'X-BAPI-RECV-WINDOW': '5000',
-            'Content-Type': 'application/json'
-        }
+        if not self.guard.allow(method, endpoint):
+            # Endpoint sedang gagal: fail-fast (atau market data terakhir) daripada menahan worker
+            return self.guard.fallback(method, endpoint, params)
         
+        start = time.perf_counter()
         try:
             if method.upper() == 'GET':
-                response = self.session.get(url, headers=headers, timeout=10)
-            elif method.upper() == 'POST':
-                response = self.session.post(url, headers=headers, json=params, timeout=10)
+                response = self.session.get(url, headers=headers, timeout=timeout)
             else:
-                raise ValueError(f"Unsupported method: {method}")
+                response = self.session.post(url, headers=headers, data=body, timeout=timeout)
             
+            if response.status_code >= 500:
+                self.guard.record_failure(method, endpoint)
             response.raise_for_status()
-            return response.json()
+            result = loads(response.content)
+            elapsed = time.perf_counter() - start
+            observe_request(self.account_name, method, endpoint, elapsed,
+                            ret_code=result.get('retCode'), bytes_sent=bytes_sent,
+                            bytes_received=len(response.content))
+            if result.get('retCode') in SERVER_ERROR_RET_CODES:
+                self.guard.record_failure(method, endpoint)
+            else:
+                self.guard.record_success(method, endpoint, elapsed)
+                self.guard.remember(endpoint, params, result)
+            # Sisa kuota exchange dari header X-Bapi-Limit-*
+            self.rate_limiter.update_from_headers(method, endpoint, response.headers, result.get('retCode'))
             
-        except requests.exceptions.RequestException as e:
+            # Timestamp ditolak (request tidak dieksekusi) -> sync jam lalu kirim ulang sekali
+            if result.get('retCode') == TIMESTAMP_ERROR_RET_CODE and _retry_on_timestamp:
+                print(f"🕒 Timestamp rejected, re-syncing exchange clock: {result.get('retMsg')}")
+                self.sync_clock()
+                return self._send_request(method, endpoint, params, priority, _retry_on_timestamp=False)
+            return result
+            
+        except requests.exceptions.Timeout as e:
+            observe_request(self.account_name, method, endpoint, time.perf_counter() - start,
+                            bytes_sent=bytes_sent, timeout=True)
+            self.guard.record_failure(method, endpoint)
+            print(f"❌ API Request Timeout ({timeout:.2f}s): {e}")
+            return {'retCode': -1, 'retMsg': str(e)}
+        except requests.exceptions.HTTPError as e:
+            observe_request(self.account_name, method, endpoint, time.perf_counter() - start,
+                            bytes_sent=bytes_sent, error=type(e).__name__)
+            if e.response is not None and e.response.status_code < 500:
+                self.guard.record_success(method, endpoint, time.perf_counter() - start)
             print(f"❌ API Request Error: {e}")
             return {'retCode': -1, 'retMsg': str(e)}
+        except (requests.exceptions.RequestException, ValueError) as e:
+            observe_request(self.account_name, method, endpoint, time.perf_counter() - start,
+                            bytes_sent=bytes_sent, error=type(e).__name__)
+            self.guard.record_failure(method, endpoint)
+            print(f"❌ API Request Error: {e}")
+            return {'retCode': -1, 'retMsg': str(e)}
+        finally:
+            # Keluar tanpa record_success/record_failure (exception lain) -> slot trial half-open dilepas
+            self.guard.release(method, endpoint)
     
-    def get_account_balance(self) -> Dict:
-        """Get account balance"""
+    def _wallet_response(self) -> Dict:
+        """Raw wallet-balance response (private stream mirror jika ter-sync, fallback REST)"""
+        mirror = self._private_mirror()
+        if mirror is not None:
+            response = mirror.wallet_response()
+            if response['result']['list']:
+                return response
+        
         endpoint = "/v5/account/wallet-balance"
         params = {'accountType': 'UNIFIED'}
-        
-        response = self._make_request('GET', endpoint, params)
-        
+        return self._make_request('GET', endpoint, params)
+    
+    def get_wallet(self) -> Optional[WalletSnapshot]:
+        """Wallet UNIFIED sebagai model (None jika gagal)"""
+        return parse_first(self._wallet_response(), WalletSnapshot)
+    
+    def get_account_balance(self) -> Dict:
+        """Get account balance (private stream mirror jika ter-sync, fallback REST)"""
+        return self._parse_balance_response(self._wallet_response())
+    
+    @staticmethod
+    def _parse_balance_response(response: Dict) -> Dict:
+        """Parse wallet-balance response (dipakai juga oleh async client)"""
         if response.get('retCode') == 0:
-            try:
-                wallet_balance = response['result']['list'][0]
-                total_balance = float(wallet_balance['totalWalletBalance'])
-                available_balance = float(wallet_balance['totalAvailableBalance'])
-                
-                return {
-                    'success': True,
-                    'total_balance': total_balance,
-                    'available_balance': available_balance,
-                    'currency': 'USDT'
-                }
-            except (KeyError, IndexError, ValueError) as e:
-                return {'success': False, 'error': f'Balance parsing error: {e}'}
+            wallet = parse_first(response, WalletSnapshot)
+            if wallet is None:
+                return {'success': False, 'error': 'Balance parsing error: empty wallet list'}
+            return {
+                'success': True,
+                'total_balance': wallet.total_wallet_balance,
+                'available_balance': wallet.total_available_balance,
+                'total_equity': wallet.total_equity,
+                'currency': 'USDT'
+            }
         else:
             return {'success': False, 'error': response.get('retMsg', 'Unknown error')}
     
     def get_current_price(self, symbol: str) -> Optional[float]:
-        """Get current price for symbol"""
+        """Get current price for symbol (market feed jika fresh, fallback REST)"""
+        if self.market_feed is not None:
+            price = self.market_feed.get_last_price(symbol)
+            if price:
+                return price
+        
         endpoint = "/v5/market/tickers"
         params = {'category': 'linear', 'symbol': symbol}
         
         response = self._make_request('GET', endpoint, params)
-        
-        if response.get('retCode') == 0:
-            try:
-                ticker = response['result']['list'][0]
-                return float(ticker['lastPrice'])
-            except (KeyError, IndexError, ValueError):
-                return None
-        return None
+        return self._parse_price_response(response)
     
-    def get_position_info(self, symbol: str) -> Dict:
-        """Get current position information"""
-        endpoint = "/v5/position/list"
+    def get_mark_price(self, symbol: str) -> Optional[float]:
+        """Get mark price for symbol (market feed jika fresh, fallback REST)"""
+        if self.market_feed is not None:
+            price = self.market_feed.get_mark_price(symbol)
+            if price:
+                return price
+        
+        endpoint = "/v5/market/tickers"
         params = {'category': 'linear', 'symbol': symbol}
         
         response = self._make_request('GET', endpoint, params)
+        return self._parse_price_response(response, field='markPrice')
+    
+    @staticmethod
+    def _parse_price_response(response: Dict, field: str = 'lastPrice') -> Optional[float]:
+        """Parse tickers response menjadi last price (atau field lain, misal markPrice)"""
+        ticker = parse_first(response, Ticker)
+        if ticker is None:
+            return None
+        price = getattr(ticker, TICKER_PRICE_FIELDS.get(field, 'last_price'))
+        return price if price > 0 else None
+    
+    POSITION_PAGE_LIMIT = 200  # Maksimum per halaman /v5/position/list
+    
+    def _positions_response(self, settle_coin: str = 'USDT') -> Dict:
+        """Raw position/list semua symbol linear (mirror private stream jika ter-sync, fallback REST)"""
+        mirror = self._private_mirror()
+        if mirror is not None:
+            return mirror.position_response()
+        
+        params = {'category': 'linear', 'settleCoin': settle_coin, 'limit': self.POSITION_PAGE_LIMIT}
+        response = self._make_request('GET', "/v5/position/list", params)
+        cursor = (response.get('result') or {}).get('nextPageCursor') if response.get('retCode') == 0 else None
+        if not cursor:
+            return response
         
+        # > 200 posisi: gabungkan halaman berikutnya ke satu respon
+        items = list(response['result'].get('list') or [])
+        while cursor:
+            page = self._make_request('GET', "/v5/position/list", {**params, 'cursor': cursor})
+            if page.get('retCode') != 0:
+                return page
+            items.extend(page['result'].get('list') or [])
+            cursor = page['result'].get('nextPageCursor')
+        return {**response, 'result': {**response['result'], 'list': items, 'nextPageCursor': ''}}
+    
+    def get_positions_snapshot(self, settle_coin: str = 'USDT') -> Optional[PositionSnapshot]:
+        """Semua posisi linear akun dalam satu call, di-index per symbol/side (None jika gagal)"""
+        return PositionSnapshot.from_response(self._positions_response(settle_coin), time.time())
+    
+    def get_position(self, symbol: str) -> Optional[Position]:
+        """Posisi symbol sebagai model (size 0 jika flat, None jika request gagal)"""
+        snapshot = self.get_positions_snapshot()
+        return snapshot.get(symbol) if snapshot is not None else None
+    
+    def get_position_info(self, symbol: str) -> Dict:
+        """Get current position information (dari snapshot semua posisi akun)"""
+        return self._parse_position_response(self._positions_response(), symbol)
+    
+    @staticmethod
+    def _parse_position_response(response: Dict, symbol: str = None) -> Dict:
+        """Parse position/list response (posisi symbol, atau posisi pertama jika symbol None)"""
         if response.get('retCode') == 0:
-            positions = response['result']['list']
-            if positions:
-                position = positions[0]
-                
-                # Safe parsing with empty string handling
-                try:
-                    size = float(position['size']) if position['size'] and position['size'] != '' else 0
-                    avg_price = float(position['avgPrice']) if position['avgPrice'] and position['avgPrice'] != '' else 0
-                    unrealized_pnl = float(position['unrealisedPnl']) if position['unrealisedPnl'] and position['unrealisedPnl'] != '' else 0
-                    
-                    # Only return position if size > 0
-                    if size > 0:
-                        return {
-                            'success': True,
-                            'symbol': position['symbol'],
-                            'side': position['side'],
-                            'size': size,
-                            'entry_price': avg_price,
-                            'unrealized_pnl': unrealized_pnl,
-                            'percentage': unrealized_pnl / BybitProductionConfig.ACCOUNT_BALANCE * 100 if BybitProductionConfig.ACCOUNT_BALANCE > 0 else 0
-                        }
-                    else:
-                        return {'success': True, 'size': 0, 'message': 'No position'}
-                except (ValueError, TypeError) as e:
-                    return {'success': False, 'error': f'Position parsing error: {e}'}
+            if symbol:
+                position = PositionSnapshot.from_response(response).get(symbol)
             else:
-                return {'success': True, 'size': 0, 'message': 'No position'}
+                position = parse_first(response, Position)
+            # Only return position if size > 0
+            if position is not None and position.is_open:
+                return {
+                    'success': True,
+                    'symbol': position.symbol,
+                    'side': position.side,
+                    'size': position.size,
+                    'entry_price': position.avg_price,
+                    'mark_price': position.mark_price,
+                    'unrealized_pnl': position.unrealised_pnl,
+                    'percentage': position.unrealised_pnl / BybitProductionConfig.ACCOUNT_BALANCE * 100 if BybitProductionConfig.ACCOUNT_BALANCE > 0 else 0
+                }
+            return {'success': True, 'size': 0, 'message': 'No position'}
         else:
             return {'success': False, 'error': response.get('retMsg', 'Unknown error')}
     
@@ -165,7 +450,21 @@ class BybitProductionClient:
         Place order with professional Sniper Method calculations
         """
         endpoint = "/v5/order/create"
+        params = self._build_order_params(symbol, side, qty, price, stop_loss, take_profit)
         
+        print(f"🎯 Placing {side.upper()} order for {symbol}")
+        print(f"📊 Quantity: {qty}")
+        print(f"💰 Price: {price if price else 'Market'}")
+        print(f"🛑 Stop Loss: {stop_loss}")
+        print(f"🎯 Take Profit: {take_profit}")
+        
+        response = self._make_request('POST', endpoint, params)
+        return self._parse_order_response(response, symbol, side, qty, price, stop_loss, take_profit)
+    
+    @staticmethod
+    def _build_order_params(symbol: str, side: str, qty: float, price: float = None,
+                            stop_loss: float = None, take_profit: float = None) -> Dict:
+        """Build parameter /v5/order/create"""
         # Determine order type
         order_type = "Market" if price is None else "Limit"
         
@@ -188,14 +487,12 @@ class BybitProductionClient:
         if take_profit:
             params['takeProfit'] = str(take_profit)
         
-        print(f"🎯 Placing {side.upper()} order for {symbol}")
-        print(f"📊 Quantity: {qty}")
-        print(f"💰 Price: {price if price else 'Market'}")
-        print(f"🛑 Stop Loss: {stop_loss}")
-        print(f"🎯 Take Profit: {take_profit}")
-        
-        response = self._make_request('POST', endpoint, params)
-        
+        return params
+    
+    @staticmethod
+    def _parse_order_response(response: Dict, symbol: str, side: str, qty: float, price: float = None,
+                              stop_loss: float = None, take_profit: float = None) -> Dict:
+        """Parse response /v5/order/create"""
         if response.get('retCode') == 0:
             order_id = response['result']['orderId']
             return {
@@ -237,11 +534,36 @@ class BybitProductionClient:
             price=None  # Market order
         )
     
-    def calculate_atr(self, symbol: str, period: int = 14) -> float:
+    def _fetch_klines(self, symbol: str, limit: int, interval: str = '60') -> Optional[List]:
+        """Ambil kline mentah (newest first) dari REST"""
+        params = {
+            'category': 'linear',
+            'symbol': symbol,
+            'interval': interval,
+            'limit': limit
+        }
+        response = self._make_request('GET', "/v5/market/kline", params)
+        if response.get('retCode') == 0:
+            return response['result']['list']
+        return None
+    
+    def calculate_atr(self, symbol: str, period: int = 14, fallback_price: Optional[float] = None) -> float:
         """
         Calculate ATR (Average True Range) for volatility-based SL/TP
-        Simplified calculation using recent price data
+        Dibaca dari KlineStore (Wilder ATR inkremental); network call hanya
+        untuk delta kline saat candle baru sudah close.
+        fallback_price: harga untuk estimasi 0.5% jika kline gagal (None = ambil harga sekarang)
         """
+        if period == self.kline_store.atr_period:
+            limit = self.kline_store.refresh_limit(symbol)
+            if limit:
+                klines = self._fetch_klines(symbol, limit, self.kline_store.interval)
+                if klines:
+                    self.kline_store.ingest(symbol, klines)
+            atr = self.kline_store.get_atr(symbol)
+            if atr:
+                return atr
+        
         endpoint = "/v5/market/kline"
         params = {
             'category': 'linear',
@@ -253,40 +575,49 @@ class BybitProductionClient:
         response = self._make_request('GET', endpoint, params)
         
         if response.get('retCode') == 0:
-            klines = response['result']['list']
-            
-            if len(klines) >= period:
-                true_ranges = []
-                
-                for i in range(1, len(klines)):
-                    current = klines[i]
-                    previous = klines[i-1]
-                    
-                    high = float(current[2])
-                    low = float(current[3])
-                    prev_close = float(previous[4])
-                    
-                    tr1 = high - low
-                    tr2 = abs(high - prev_close)
-                    tr3 = abs(low - prev_close)
-                    
-                    true_range = max(tr1, tr2, tr3)
-                    true_ranges.append(true_range)
-                
-                # Calculate ATR as simple moving average
-                atr = sum(true_ranges[-period:]) / period
+            atr = self._compute_atr(response['result']['list'], period)
+            if atr is not None:
                 return atr
         
         # Fallback: use 0.5% of current price as ATR estimate
-        current_price = self.get_current_price(symbol)
+        current_price = fallback_price if fallback_price is not None else self.get_current_price(symbol)
         return current_price * 0.005 if current_price else 0
     
-    def execute_sniper_trade(self, signal_data: Dict) -> Dict:
+    @staticmethod
+    def _compute_atr(klines: List, period: int) -> Optional[float]:
+        """Hitung ATR (SMA dari true range) dari list kline Bybit"""
+        if len(klines) < period:
+            return None
+        
+        true_ranges = []
+        
+        for i in range(1, len(klines)):
+            current = klines[i]
+            previous = klines[i-1]
+            
+            high = float(current[2])
+            low = float(current[3])
+            prev_close = float(previous[4])
+            
+            tr1 = high - low
+            tr2 = abs(high - prev_close)
+            tr3 = abs(low - prev_close)
+            
+            true_range = max(tr1, tr2, tr3)
+            true_ranges.append(true_range)
+        
+        # Calculate ATR as simple moving average
+        return sum(true_ranges[-period:]) / period
+    
+    def execute_sniper_trade(self, signal_data: Dict, pretrade=None) -> Dict:
         """
         Execute trade using Sniper Method with professional calculations
+        pretrade: PreTradeData dari gather_pretrade (price/ATR/wallet tidak di-fetch ulang)
         """
         try:
-            symbol = signal_data.get('symbol', BybitProductionConfig.TARGET_SYMBOL)
+            # Spec per symbol (leverage, rounding) dari registry, sama dengan executor multi-akun
+            spec = get_symbol_registry().spec(signal_data.get('symbol') or BybitProductionConfig.TARGET_SYMBOL)
+            symbol = spec.symbol
             side = signal_data.get('action', '').upper()
             confidence = float(signal_data.get('confidence', 0))
             
@@ -297,25 +628,30 @@ class BybitProductionClient:
                     'error': f'Confidence {confidence:.1%} below minimum {BybitProductionConfig.SNIPER_CONFIG["min_confidence"]:.1%}'
                 }
             
-            # Get current price and ATR
-            current_price = self.get_current_price(symbol)
+            if pretrade is None or pretrade.symbol != symbol:
+                pretrade = gather_pretrade(symbol, self, {self.account_name: self})
+            
+            # Current price and ATR (diambil paralel bersama balance)
+            current_price = pretrade.price
             if not current_price:
                 return {'success': False, 'error': 'Unable to get current price'}
             
-            atr_value = self.calculate_atr(symbol)
+            atr_value = pretrade.atr
             
             # Calculate position details using Sniper Method
             position_info = BybitProductionConfig.get_position_info(
-                side, current_price, atr_value
+                side, current_price, atr_value, symbol=symbol
             )
             
             # Check account balance
-            balance_info = self.get_account_balance()
-            if not balance_info['success']:
+            wallet = pretrade.wallet(self.account_name)
+            if wallet is None:
+                wallet = self.get_wallet()
+            if wallet is None:
                 return {'success': False, 'error': 'Unable to get account balance'}
             
-            available_balance = balance_info['available_balance']
-            required_margin = position_info['position_size'] * current_price / BybitProductionConfig.LEVERAGE
+            available_balance = wallet.total_available_balance
+            required_margin = position_info['position_size'] * current_price / spec.leverage
             
             if required_margin > available_balance * 0.8:  # Use max 80% of available balance
                 return {
@@ -358,7 +694,11 @@ class BybitProductionClient:
             return {'success': False, 'error': f'Trade execution error: {str(e)}'}
     
     def get_open_orders(self, symbol: str = None) -> Dict:
-        """Get all open orders including TP/SL orders"""
+        """Get all open orders including TP/SL orders (private stream mirror jika ter-sync)"""
+        mirror = self._private_mirror()
+        if mirror is not None:
+            return self._parse_open_orders_response(mirror.open_orders_response(symbol))
+        
         endpoint = "/v5/order/realtime"
         params = {
             'category': 'linear'
@@ -368,7 +708,11 @@ class BybitProductionClient:
             params['symbol'] = symbol
         
         response = self._make_request('GET', endpoint, params)
-        
+        return self._parse_open_orders_response(response)
+    
+    @staticmethod
+    def _parse_open_orders_response(response: Dict) -> Dict:
+        """Parse order/realtime response dan kelompokkan TP/SL"""
         if response.get('retCode') == 0:
             orders = response['result']['list']
             
@@ -436,44 +780,14 @@ class BybitProductionClient:
             
             # Place market order to close position
             endpoint = "/v5/order/create"
-            params = {
-                'category': 'linear',
-                'symbol': symbol,
-                'side': close_side,
-                'orderType': 'Market',
-                'qty': str(position_size),
-                'timeInForce': 'IOC',  # Immediate or Cancel
-                'reduceOnly': True  # This ensures we're closing, not opening new position
-            }
+            params = self._build_close_params(symbol, close_side, position_size)
             
             print(f"🔄 Closing {current_side} position for {symbol}")
             print(f"📊 Position Size: {position_size}")
             print(f"💰 Close Side: {close_side}")
             
             response = self._make_request('POST', endpoint, params)
-            
-            if response.get('retCode') == 0:
-                order_id = response['result']['orderId']
-                
-                print(f"✅ Position close order placed successfully!")
-                print(f"📋 Order ID: {order_id}")
-                
-                return {
-                    'success': True,
-                    'message': 'Position closed successfully',
-                    'order_id': order_id,
-                    'symbol': symbol,
-                    'side': close_side,
-                    'quantity': position_size,
-                    'closed_position_side': current_side
-                }
-            else:
-                error_msg = response.get('retMsg', 'Unknown error')
-                print(f"❌ Failed to close position: {error_msg}")
-                return {
-                    'success': False,
-                    'error': f'Failed to close position: {error_msg}'
-                }
+            return self._parse_close_response(response, symbol, close_side, position_size, current_side)
                 
         except Exception as e:
             print(f"❌ Error closing position: {e}")
@@ -482,6 +796,46 @@ class BybitProductionClient:
                 'error': f'Error closing position: {str(e)}'
             }
 
+    @staticmethod
+    def _build_close_params(symbol: str, close_side: str, position_size: float) -> Dict:
+        """Build parameter market order reduce-only untuk menutup posisi"""
+        return {
+            'category': 'linear',
+            'symbol': symbol,
+            'side': close_side,
+            'orderType': 'Market',
+            'qty': str(position_size),
+            'timeInForce': 'IOC',  # Immediate or Cancel
+            'reduceOnly': True  # This ensures we're closing, not opening new position
+        }
+    
+    @staticmethod
+    def _parse_close_response(response: Dict, symbol: str, close_side: str,
+                              position_size: float, current_side: str) -> Dict:
+        """Parse response order penutupan posisi"""
+        if response.get('retCode') == 0:
+            order_id = response['result']['orderId']
+            
+            print(f"✅ Position close order placed successfully!")
+            print(f"📋 Order ID: {order_id}")
+            
+            return {
+                'success': True,
+                'message': 'Position closed successfully',
+                'order_id': order_id,
+                'symbol': symbol,
+                'side': close_side,
+                'quantity': position_size,
+                'closed_position_side': current_side
+            }
+        else:
+            error_msg = response.get('retMsg', 'Unknown error')
+            print(f"❌ Failed to close position: {error_msg}")
+            return {
+                'success': False,
+                'error': f'Failed to close position: {error_msg}'
+            }
+
     def get_trade_history(self, symbol: str, limit: int = 50) -> Dict:
         """Get recent trade history"""
         endpoint = "/v5/execution/list"
@@ -492,7 +846,27 @@ class BybitProductionClient:
         }
         
         response = self._make_request('GET', endpoint, params)
-        
+        return self._parse_trade_history_response(response)
+    
+    def _history_request(self, endpoint: str, params: Dict) -> Dict:
+        return self._make_request('GET', endpoint, params, priority='low')
+    
+    def iter_trade_history(self, symbol: str = None, start_time=None, end_time=None,
+                           category: str = 'linear') -> Iterator[Dict]:
+        """
+        Stream semua execution (semua halaman nextPageCursor, per jendela 7 hari).
+        start_time/end_time: datetime, detik atau ms. Raise PaginationError jika halaman gagal.
+        """
+        return iter_executions(self._history_request, category, symbol, start_time, end_time)
+    
+    def iter_order_history(self, symbol: str = None, start_time=None, end_time=None,
+                           category: str = 'linear') -> Iterator[Dict]:
+        """Stream semua order history dalam rentang waktu (lihat iter_trade_history)"""
+        return iter_order_history(self._history_request, category, symbol, start_time, end_time)
+    
+    @staticmethod
+    def _parse_trade_history_response(response: Dict) -> Dict:
+        """Parse execution/list response"""
         if response.get('retCode') == 0:
             return {
                 'success': True,
@@ -502,4 +876,193 @@ class BybitProductionClient:
             return {
                 'success': False,
                 'error': response.get('retMsg', 'Unknown error')
-            }
\ No newline at end of file
+            }
+    
+    # ===== Batch Orders (/v5/order/*-batch) =====
+    
+    BATCH_SIZE = 10  # Maksimum order per batch request untuk linear
+    
+    def place_batch_orders(self, orders: List[Dict], category: str = 'linear') -> Dict:
+        """
+        Place banyak order dalam satu request /v5/order/create-batch (otomatis di-chunk per 10).
+        orders: list param order seperti /v5/order/create tanpa 'category'
+        """
+        return self._send_batch("/v5/order/create-batch", self._with_order_link_ids(orders), category)
+    
+    @staticmethod
+    def _with_order_link_ids(orders: List[Dict]) -> List[Dict]:
+        """Setiap order batch punya orderLinkId (replay via REST tidak membuka order ganda)"""
+        return [order if order.get('orderLinkId') else {**order, 'orderLinkId': new_order_link_id()}
+                for order in orders]
+    
+    def amend_batch_orders(self, amendments: List[Dict], category: str = 'linear') -> Dict:
+        """Amend banyak order (orderId/orderLinkId + field yang diubah) via /v5/order/amend-batch"""
+        return self._send_batch("/v5/order/amend-batch", amendments, category)
+    
+    def cancel_batch_orders(self, cancels: List[Dict], category: str = 'linear') -> Dict:
+        """Cancel banyak order ({'symbol', 'orderId'} atau orderLinkId) via /v5/order/cancel-batch"""
+        return self._send_batch("/v5/order/cancel-batch", cancels, category)
+    
+    def _send_batch(self, endpoint: str, entries: List[Dict], category: str) -> Dict:
+        """Kirim entries per chunk BATCH_SIZE dan gabungkan hasil per order"""
+        if not entries:
+            return {'success': False, 'error': 'No orders in batch', 'orders': [], 'failed': 0}
+        
+        results = []
+        for i in range(0, len(entries), self.BATCH_SIZE):
+            chunk = entries[i:i + self.BATCH_SIZE]
+            response = self._make_request('POST', endpoint, {'category': category, 'request': chunk})
+            results.extend(self._parse_batch_response(response, chunk))
+        
+        failed = [r for r in results if not r['success']]
+        if failed:
+            print(f"⚠️ Batch {endpoint}: {len(failed)}/{len(results)} order gagal")
+        return {
+            'success': not failed,
+            'orders': results,
+            'failed': len(failed),
+            'error': failed[0]['error'] if failed else None
+        }
+    
+    @staticmethod
+    def _parse_batch_response(response: Dict, entries: List[Dict]) -> List[Dict]:
+        """Parse respon batch: result.list (orderId) + retExtInfo.list (code per order)"""
+        if response.get('retCode') != 0:
+            error = response.get('retMsg', 'Unknown error')
+            return [{'success': False, 'order_link_id': e.get('orderLinkId'), 'order_id': e.get('orderId'),
+                     'code': response.get('retCode'), 'error': error} for e in entries]
+        
+        items = response.get('result', {}).get('list', [])
+        infos = (response.get('retExtInfo') or {}).get('list', [])
+        results = []
+        for index, entry in enumerate(entries):
+            item = items[index] if index < len(items) else {}
+            info = infos[index] if index < len(infos) else {'code': 0, 'msg': 'OK'}
+            # 110072: orderLinkId sudah dipakai -> order sudah diterima (replay setelah ack websocket hilang)
+            ok = info.get('code', 0) in (0, DUPLICATE_ORDER_LINK_ID)
+            results.append({
+                'success': ok,
+                'order_id': item.get('orderId') or entry.get('orderId'),
+                'order_link_id': item.get('orderLinkId') or entry.get('orderLinkId'),
+                'code': info.get('code', 0),
+                'error': None if ok else info.get('msg', 'Unknown error')
+            })
+        return results
+    
+    @staticmethod
+    def _format_step(value: float, step: float) -> str:
+        """Format qty/price sesuai step (hindari 0.030000000000000002)"""
+        decimals = max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+        return f"{value:.{decimals}f}"
+    
+    @staticmethod
+    def build_tp_ladder(symbol: str, side: str, qty: float, levels: List[Dict],
+                        qty_step: float = None, min_qty: float = None, tick_size: float = None) -> List[Dict]:
+        """
+        Susun ladder TP reduce-only (limit) untuk posisi side/qty.
+        levels: [{'price': float, 'percentage': float}, ...] urut dari TP terdekat.
+        Level dengan qty di bawah min_qty digabung ke level berikutnya; level terakhir
+        menerima sisa qty agar total ladder = qty posisi.
+        """
+        spec = BybitProductionConfig.CONTRACT_SPECS.get(symbol, {})
+        qty_step = qty_step or spec.get('qtyStep', 0.001)
+        min_qty = min_qty or spec.get('minOrderQty', qty_step)
+        tick_size = tick_size or spec.get('tickSize', 0.01)
+        close_side = 'Sell' if side.upper() == 'BUY' else 'Buy'
+        
+        steps_total = int(round(qty / qty_step))
+        min_steps = int(round(min_qty / qty_step))
+        orders = []
+        carried = 0
+        allocated = 0
+        for index, level in enumerate(levels):
+            is_last = index == len(levels) - 1
+            if is_last:
+                steps = steps_total - allocated
+            else:
+                steps = carried + int(steps_total * level['percentage'] / 100.0)
+            if steps < min_steps and not is_last:
+                carried = steps  # terlalu kecil -> gabung ke level berikutnya
+                continue
+            carried = 0
+            if steps <= 0:
+                continue
+            if steps < min_steps and orders:
+                # Sisa terakhir terlalu kecil -> tambahkan ke level sebelumnya
+                previous = orders[-1]
+                previous_steps = int(round(float(previous['qty']) / qty_step)) + steps
+                previous['qty'] = BybitProductionClient._format_step(previous_steps * qty_step, qty_step)
+                allocated += steps
+                continue
+            price = round(level['price'] / tick_size) * tick_size
+            orders.append({
+                'symbol': symbol,
+                'side': close_side,
+                'orderType': 'Limit',
+                'qty': BybitProductionClient._format_step(steps * qty_step, qty_step),
+                'price': BybitProductionClient._format_step(price, tick_size),
+                'timeInForce': 'GTC',
+                'reduceOnly': True,
+                'orderLinkId': f"tp{index + 1}-{int(time.time() * 1000)}-{symbol}"[:36]
+            })
+            allocated += steps
+        return orders
+    
+    def plan_tp_ladder(self, symbol: str, side: str, qty: float, levels: List[Dict]) -> List[Dict]:
+        """
+        Ladder TP yang akan dipasang setelah entry; kosong jika ladder kolaps ke satu order
+        (qty terlalu kecil untuk dibagi) -> pakai TP tunggal di order entry seperti biasa.
+        """
+        if not levels:
+            return []
+        orders = self.build_tp_ladder(symbol, side, qty, levels)
+        return orders if len(orders) > 1 else []
+    
+    def place_tp_ladder(self, symbol: str, side: str, qty: float, levels: List[Dict] = None,
+                        fallback_take_profit: float = None, orders: List[Dict] = None) -> Dict:
+        """
+        Place ladder TP reduce-only dalam satu batch request (orders: hasil plan_tp_ladder).
+        Qty yang gagal dipasang tetap mendapat TP: fallback ke /v5/position/trading-stop
+        (Full jika seluruh ladder gagal, Partial sebesar qty yang gagal jika sebagian).
+        """
+        orders = orders or self.build_tp_ladder(symbol, side, qty, levels or [])
+        if not orders:
+            return {'success': False, 'error': 'Empty TP ladder', 'orders': [], 'failed': 0}
+        
+        print(f"🪜 Placing TP ladder {symbol}: " + ", ".join(f"{o['qty']}@{o['price']}" for o in orders))
+        result = self.place_batch_orders(orders)
+        result['ladder'] = orders
+        
+        if result['failed'] and fallback_take_profit:
+            unplaced = sum(float(order['qty']) for order, placed in zip(orders, result['orders'])
+                           if not placed['success'])
+            if result['failed'] == len(orders):
+                print(f"⚠️ TP ladder gagal, fallback ke trading-stop TP {fallback_take_profit}")
+                result['fallback'] = self.set_trading_stop(symbol, take_profit=fallback_take_profit)
+            else:
+                print(f"⚠️ TP ladder gagal sebagian, fallback TP {fallback_take_profit} untuk qty {unplaced}")
+                result['fallback'] = self.set_trading_stop(symbol, take_profit=fallback_take_profit,
+                                                           tp_size=unplaced)
+        return result
+    
+    def set_trading_stop(self, symbol: str, take_profit: float = None, stop_loss: float = None,
+                         position_idx: int = 0, tp_size: float = None) -> Dict:
+        """Set TP/SL posisi via /v5/position/trading-stop (Full, atau Partial sebesar tp_size)"""
+        params = {
+            'category': 'linear',
+            'symbol': symbol,
+            'tpslMode': 'Partial' if tp_size else 'Full',
+            'positionIdx': position_idx
+        }
+        if tp_size:
+            qty_step = BybitProductionConfig.CONTRACT_SPECS.get(symbol, {}).get('qtyStep', 0.001)
+            params['tpSize'] = self._format_step(tp_size, qty_step)
+        if take_profit:
+            params['takeProfit'] = str(take_profit)
+        if stop_loss:
+            params['stopLoss'] = str(stop_loss)
+        
+        response = self._make_request('POST', "/v5/position/trading-stop", params)
+        if response.get('retCode') == 0:
+            return {'success': True, 'symbol': symbol, 'take_profit': take_profit, 'stop_loss': stop_loss}
+        return {'success': False, 'error': response.get('retMsg', 'Unknown error'), 'code': response.get('retCode')}
@@ -26,6 +26,111 @@ class BybitProductionConfig:
     # Bybit URLs
     BYBIT_MAINNET_URL = 'https://api.bybit.com'
     BYBIT_TESTNET_URL = 'https://api-testnet.bybit.com'
+
+    # Bybit WebSocket URLs (public stream linear perpetual)
+    BYBIT_PUBLIC_WS_MAINNET_URL = 'wss://stream.bybit.com/v5/public/linear'
+    BYBIT_PUBLIC_WS_TESTNET_URL = 'wss://stream-testnet.bybit.com/v5/public/linear'
+    BYBIT_PRIVATE_WS_MAINNET_URL = 'wss://stream.bybit.com/v5/private'
+    BYBIT_PRIVATE_WS_TESTNET_URL = 'wss://stream-testnet.bybit.com/v5/private'
+    BYBIT_TRADE_WS_MAINNET_URL = 'wss://stream.bybit.com/v5/trade'
+    BYBIT_TRADE_WS_TESTNET_URL = 'wss://stream-testnet.bybit.com/v5/trade'
+
+    # Koneksi REST: recv window signing, warm-up, keep-alive dan sync jam server
+    CONNECTION_CONFIG = {
+        'recv_window': int(os.environ.get('BYBIT_RECV_WINDOW', '5000')),  # ms
+        'keepalive_interval': 30,    # Detik antar keep-alive ringan (/v5/market/time)
+        'clock_sync_interval': 300,  # Detik antar pengukuran ulang offset jam server
+        'clock_samples': 5,          # Sampel per sync; dipakai yang RTT-nya terkecil
+        'pool_hosts': 4,             # Jumlah host yang pool-nya disimpan (api, testnet, simulator)
+        'pool_maxsize': 32           # Koneksi keep-alive per host, dibagi semua akun dan tool
+    }
+
+    # Market data feed (ticker + kline via websocket, REST hanya fallback)
+    MARKET_FEED_CONFIG = {
+        'enabled': True,
+        'kline_interval': '60',    # Sama dengan interval KlineStore / ATR
+        'stale_after': 10.0,       # Detik; harga lebih tua dari ini dianggap stale
+        'ping_interval': 20,       # Heartbeat {"op": "ping"} sesuai rekomendasi Bybit
+        'max_backoff': 30.0        # Batas backoff reconnect (detik)
+    }
+
+    # Private stream mirror (position/order/execution/wallet per akun)
+    PRIVATE_STREAM_CONFIG = {
+        'enabled': True,
+        'ping_interval': 20,
+        'max_backoff': 30.0,
+        'stale_after': 45.0,       # Detik tanpa pesan/pong -> mirror tidak ready (getter fallback ke REST)
+        'auth_expires_ms': 10000,  # Masa berlaku signature auth websocket
+        'execution_history': 500,  # Jumlah execution terakhir yang disimpan di memori
+        'closed_order_ttl': 300,   # Detik order tertutup diingat (melindungi resync dari snapshot REST lama)
+        'closed_order_max': 2000   # Batas jumlah order tertutup yang diingat
+    }
+
+    # Antrian eksekusi signal webhook (webhook membalas 202, worker mengeksekusi)
+    EXECUTION_QUEUE_CONFIG = {
+        'workers': 1,          # 1 = berurutan (cooldown/daily limit konsisten antar signal)
+        'max_pending': 50,     # Signal menunggu maksimum; lebih dari ini webhook membalas 503
+        'history': 500         # Jumlah status signal yang bisa di-query via /api/signal/<id>
+    }
+
+    # Validasi payload webhook (schema dikompilasi sekali, reject sebelum I/O apa pun)
+    WEBHOOK_SCHEMA_CONFIG = {
+        'max_body_bytes': 4096,    # Body lebih besar langsung 413 tanpa di-parse
+        'max_fields': 32,          # Jumlah key maksimum payload
+        'max_string_length': 128   # Panjang maksimum nilai string (strategy, timeframe, ...)
+    }
+
+    # Symbol registry: basket perpetual yang diterima webhook, satu execution lane per symbol
+    SYMBOL_CONFIG = {
+        # Env BYBIT_SYMBOLS="ETHUSDT,BTCUSDT"; default hanya TARGET_SYMBOL (harus ada di CONTRACT_SPECS)
+        'symbols': [s.strip().upper() for s in os.environ.get('BYBIT_SYMBOLS', 'ETHUSDT').split(',') if s.strip()],
+        'overrides': {
+            # Parameter risiko per symbol; yang tidak diisi memakai LEVERAGE/RISK_PER_TRADE/MAX_POSITION_SIZE
+            # 'BTCUSDT': {'leverage': 5, 'risk_per_trade': 0.02, 'max_position_size': 0.05}
+        },
+        'lane_workers': 1,       # Worker per symbol: 1 = signal symbol yang sama tetap berurutan
+        'lane_max_pending': 20   # Signal menunggu maksimum per symbol
+    }
+
+    # State trading persisten (daily limit, cooldown, emergency stop bertahan saat restart)
+    STATE_STORE_CONFIG = {
+        'path': os.environ.get('BYBIT_STATE_DB', 'bybit_state.db'),  # SQLite mode WAL
+        'busy_timeout': 5.0,             # Detik menunggu write lock worker lain
+        'signal_cooldown_seconds': 30,   # Cooldown signal per symbol yang dipulihkan setelah restart
+        'reservation_ttl': 120,          # Detik; reservasi slot daily limit worker yang mati kedaluwarsa
+        'dedupe_window': 10,             # Detik; payload identik dalam window ini dieksekusi sekali
+        'signal_history_seconds': 86400, # Status signal yang bisa di-query dari worker mana pun
+        'lock_dir': '.locks'             # File lock per symbol (relatif ke folder database)
+    }
+
+    # Snapshot akun untuk /pine_data dan /pine_script_inputs (polling tanpa request exchange)
+    PINE_SNAPSHOT_CONFIG = {
+        'refresh_interval': 5.0    # Detik antar refresh snapshot di background
+    }
+
+    # Logging non-blocking (QueueHandler -> satu writer background)
+    LOGGING_CONFIG = {
+        'level': os.environ.get('LOG_LEVEL', 'INFO'),
+        'console': True,
+        'log_file': '/home/clurut/binance_webhook/bybit_production.log',   # Log teks (manusia)
+        'events_file': '/home/clurut/binance_webhook/bybit_events.jsonl',  # Event JSON schema tetap (dashboard)
+        'trades_file': 'bybit_trades.log'                                  # Satu baris JSON per trade
+    }
+
+    # Pre-trade fan-out: price/ATR/wallet semua akun dibaca paralel sebelum order
+    PRETRADE_CONFIG = {
+        'deadline': 2.0,       # Batas waktu bersama (detik) untuk semua read pre-trade
+        'max_workers': 16      # Thread pool process-wide untuk read paralel
+    }
+
+    # Order entry via trade websocket (order create/amend/cancel tanpa HTTP per request)
+    ORDER_ENTRY_CONFIG = {
+        'enabled': True,
+        'ping_interval': 20,
+        'max_backoff': 30.0,
+        'auth_expires_ms': 10000,
+        'response_timeout': 2.0    # Detik menunggu ack; lewat dari ini dikonfirmasi ulang via REST
+    }
     
     # Contract Specifications (OPTIMIZED FOR 0.03 ETH TARGET)
     CONTRACT_SPECS = {
@@ -35,6 +140,20 @@ class BybitProductionConfig:
             'qtyStep': 0.001,          # Quantity step size
             'minNotionalValue': 1.0,   # Minimum notional value in USDT
             'tickSize': 0.01           # Price tick size
+        },
+        'BTCUSDT': {
+            'minOrderQty': 0.001,
+            'maxOrderQty': 100.0,
+            'qtyStep': 0.001,
+            'minNotionalValue': 5.0,
+            'tickSize': 0.1
+        },
+        'SOLUSDT': {
+            'minOrderQty': 0.1,
+            'maxOrderQty': 5000.0,
+            'qtyStep': 0.1,
+            'minNotionalValue': 5.0,
+            'tickSize': 0.01
         }
     }
     
@@ -148,7 +267,47 @@ class BybitProductionConfig:
     TRADE_LOG_FILE = 'bybit_trades.log'
     
     # Rate Limiting
-    RATE_LIMIT_PER_MINUTE = 30
+    RATE_LIMIT_PER_MINUTE = 30  # Budget REST per API key (order prioritas tinggi tidak ditahan)
+    RATE_LIMIT_CONFIG = {
+        # Fraksi bucket yang hanya boleh dipakai prioritas lebih tinggi
+        'priority_reserve': {'high': 0.0, 'normal': 0.2, 'low': 0.5},
+        # Maksimum tunggu (detik) sebelum call ditolak lokal
+        'max_wait': {'high': 2.0, 'normal': 5.0, 'low': 3.0},
+        # Limit awal per detik per endpoint class sebelum dikoreksi header X-Bapi-Limit
+        'endpoint_limits': {
+            'POST /v5/order': 10,
+            'POST /v5/position': 10,
+            'default': 50
+        },
+        # Jumlah proses yang berbagi API key (gunicorn WEB_CONCURRENCY); budget per key dan
+        # limit per endpoint dibagi rata antar worker
+        'workers': max(1, int(os.environ.get('WEB_CONCURRENCY', '1')))
+    }
+    # Adaptive timeout + circuit breaker per endpoint class (circuit_breaker.py)
+    RESILIENCE_CONFIG = {
+        # Timeout = p99 latency x multiplier, di-clamp ke [min, max]; default sebelum cukup sampel
+        'timeouts': {
+            'read': {'min': 0.25, 'max': 1.5, 'default': 1.0},
+            'order': {'min': 0.5, 'max': 2.5, 'default': 2.0}
+        },
+        'percentile': 0.99,
+        'multiplier': 3.0,
+        'min_samples': 20,
+        'failure_threshold': 3,    # Gagal beruntun sebelum circuit open
+        'reset_timeout': 5.0,      # Detik sebelum call percobaan (half-open)
+        'stale_market_ttl': 30.0   # Umur maksimum market data terakhir yang boleh dipakai saat open
+    }
+    # Single-flight GET: caller bersamaan berbagi satu request; TTL hanya untuk prioritas low
+    COALESCE_CONFIG = {
+        'enabled': True,
+        'ttl': {
+            '/v5/account/wallet-balance': 1.0,
+            '/v5/position/list': 0.5,
+            '/v5/order/realtime': 0.5,
+            '/v5/market/tickers': 0.5,
+            'default': 0.0
+        }
+    }
     COOLDOWN_SECONDS = 60  # 1 minute cooldown between trades
     
     # Emergency Settings
@@ -158,10 +317,43 @@ class BybitProductionConfig:
     
     @classmethod
     def get_bybit_base_url(cls):
-        """Get appropriate Bybit base URL"""
+        """Get appropriate Bybit base URL (env BYBIT_BASE_URL override, misal simulator lokal)"""
+        override = os.environ.get('BYBIT_BASE_URL')
+        if override:
+            return override.rstrip('/')
         if cls.BYBIT_TESTNET:
             return cls.BYBIT_TESTNET_URL
         return cls.BYBIT_MAINNET_URL
+
+    @classmethod
+    def get_bybit_public_ws_url(cls):
+        """Get appropriate Bybit public websocket URL (env BYBIT_PUBLIC_WS_URL override)"""
+        override = os.environ.get('BYBIT_PUBLIC_WS_URL')
+        if override:
+            return override
+        if cls.BYBIT_TESTNET:
+            return cls.BYBIT_PUBLIC_WS_TESTNET_URL
+        return cls.BYBIT_PUBLIC_WS_MAINNET_URL
+
+    @classmethod
+    def get_bybit_private_ws_url(cls):
+        """Get appropriate Bybit private websocket URL (env BYBIT_PRIVATE_WS_URL override)"""
+        override = os.environ.get('BYBIT_PRIVATE_WS_URL')
+        if override:
+            return override
+        if cls.BYBIT_TESTNET:
+            return cls.BYBIT_PRIVATE_WS_TESTNET_URL
+        return cls.BYBIT_PRIVATE_WS_MAINNET_URL
+
+    @classmethod
+    def get_bybit_trade_ws_url(cls):
+        """Get appropriate Bybit trade (order entry) websocket URL (env BYBIT_TRADE_WS_URL override)"""
+        override = os.environ.get('BYBIT_TRADE_WS_URL')
+        if override:
+            return override
+        if cls.BYBIT_TESTNET:
+            return cls.BYBIT_TRADE_WS_TESTNET_URL
+        return cls.BYBIT_TRADE_WS_MAINNET_URL
     
     @classmethod
     def validate_config(cls):
@@ -183,10 +375,15 @@ class BybitProductionConfig:
         return errors
     
     @classmethod
-    def get_position_info(cls, signal_type, entry_price, atr_value):
+    def get_position_info(cls, signal_type, entry_price, atr_value, symbol=None):
         """
         Calculate complete position information
+        symbol: default TARGET_SYMBOL; contract spec + override risiko dari SYMBOL_CONFIG
         """
+        symbol = symbol or cls.TARGET_SYMBOL
+        overrides = cls.SYMBOL_CONFIG['overrides'].get(symbol, {})
+        risk_per_trade = overrides.get('risk_per_trade', cls.RISK_PER_TRADE)
+        max_position_ratio = overrides.get('max_position_size', cls.MAX_POSITION_SIZE)
         # Calculate Stop Loss based on ATR
         if signal_type.upper() == 'BUY':
             stop_loss = entry_price - (atr_value * cls.SNIPER_CONFIG['atr_multiplier'])
@@ -194,18 +391,18 @@ class BybitProductionConfig:
             stop_loss = entry_price + (atr_value * cls.SNIPER_CONFIG['atr_multiplier'])
         
         # Calculate position size
-        risk_amount = cls.ACCOUNT_BALANCE * cls.RISK_PER_TRADE
+        risk_amount = cls.ACCOUNT_BALANCE * risk_per_trade
         price_diff = abs(entry_price - stop_loss)
         
         if price_diff == 0:
             position_size = 0
         else:
             position_size = risk_amount / price_diff
-            max_position = (cls.ACCOUNT_BALANCE * cls.MAX_POSITION_SIZE) / entry_price
+            max_position = (cls.ACCOUNT_BALANCE * max_position_ratio) / entry_price
             position_size = min(position_size, max_position)
         
         # Apply minimum position size and quantity step validation
-        contract_spec = cls.CONTRACT_SPECS.get(cls.TARGET_SYMBOL, {})
+        contract_spec = cls.CONTRACT_SPECS.get(symbol, {})
         min_qty = contract_spec.get('minOrderQty', 0.001)
         qty_step = contract_spec.get('qtyStep', 0.001)
         min_notional = contract_spec.get('minNotionalValue', 1.0)
@@ -233,7 +430,7 @@ class BybitProductionConfig:
             take_profit = entry_price - reward_amount
         
         return {
-            'symbol': cls.TARGET_SYMBOL,
+            'symbol': symbol,
             'side': signal_type.upper(),
             'entry_price': entry_price,
             'position_size': round(position_size, 4),
@@ -0,0 +1,845 @@
+#!/usr/bin/env python3
+"""
+🧪 LOCAL BYBIT V5 SIMULATOR - Exchange lokal untuk benchmark end-to-end
+HTTP server (stdlib) yang meniru endpoint V5 yang dipakai project ini:
+market time/tickers/kline, wallet-balance, position list/set-leverage/trading-stop,
+order create/cancel/realtime/history (+ batch), dan execution list.
+- Signature HMAC, timestamp/recv_window dan API key divalidasi seperti Bybit
+- Matching engine sederhana: market order langsung fill, limit order fill saat harga
+  menyentuh, TP/SL posisi ter-trigger saat harga digerakkan (set_price)
+- Latency dan rate limit per endpoint bisa diatur (header X-Bapi-Limit-* ikut dikirim)
+- Trade websocket opsional (start_trade_ws) untuk order.create/amend/cancel di exchange yang sama
+
+Contoh:
+    sim = BybitSimulator(api_keys={'key': 'secret'}, latency=0.02)
+    base_url = sim.start()                       # http://127.0.0.1:<port>
+    client = BybitProductionClient('key', 'secret', base_url=base_url)
+    client.place_order('ETHUSDT', 'Buy', 0.01, stop_loss=2900, take_profit=3100)
+    sim.set_price('ETHUSDT', 3100)               # TP ter-trigger
+
+Atau dari shell (BYBIT_BASE_URL mengarahkan client/dashboard ke simulator):
+    python bybit_simulator.py --port 8900 --api-key key --api-secret secret
+"""
+
+import argparse
+import hashlib
+import hmac
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlsplit
+
+from ws_standin import LocalWebSocketServer, StandInConnection, bybit_op_handler
+
+TAKER_FEE = 0.00055
+MAKER_FEE = 0.0002
+HISTORY_WINDOW_MS = 7 * 24 * 60 * 60 * 1000
+
+OPEN_STATUSES = ('New', 'PartiallyFilled', 'Untriggered')
+
+# Limit per detik per endpoint (kira-kira default Bybit untuk akun biasa)
+DEFAULT_RATE_LIMITS = {
+    '/v5/order/create': 10,
+    '/v5/order/amend': 10,
+    '/v5/order/cancel': 10,
+    '/v5/order/create-batch': 10,
+    '/v5/order/amend-batch': 10,
+    '/v5/order/cancel-batch': 10,
+    '/v5/position/set-leverage': 10,
+    '/v5/position/trading-stop': 10,
+    'default': 50
+}
+
+# op trade websocket (/v5/trade) -> endpoint REST yang setara
+TRADE_WS_OPS = {
+    'order.create': '/v5/order/create',
+    'order.amend': '/v5/order/amend',
+    'order.cancel': '/v5/order/cancel',
+    'order.create-batch': '/v5/order/create-batch',
+    'order.amend-batch': '/v5/order/amend-batch',
+    'order.cancel-batch': '/v5/order/cancel-batch'
+}
+
+DEFAULT_PRICES = {'ETHUSDT': 3000.0, 'BTCUSDT': 60000.0, 'SOLUSDT': 150.0}
+
+
+class SimulatorError(Exception):
+    """Error V5 (retCode + retMsg) yang dikembalikan ke client"""
+
+    def __init__(self, ret_code: int, ret_msg: str):
+        super().__init__(ret_msg)
+        self.ret_code = ret_code
+        self.ret_msg = ret_msg
+
+
+def _now_ms() -> int:
+    return int(time.time() * 1000)
+
+
+def _fmt(value: float) -> str:
+    """Angka -> string seperti respon Bybit (tanpa trailing zero berlebih)"""
+    if value == 0:
+        return '0'
+    return f"{value:.8f}".rstrip('0').rstrip('.')
+
+
+def _to_float(value, field: str) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise SimulatorError(10001, f"params error: {field} invalid")
+
+
+class SimAccount:
+    """State satu akun UNIFIED (one-way mode)"""
+
+    def __init__(self, api_key: str, secret: str, balance: float):
+        self.api_key = api_key
+        self.secret = secret
+        self.balance = balance
+        self.positions: Dict[str, Dict] = {}
+        self.orders: Dict[str, Dict] = {}       # orderId -> order (semua status)
+        self.executions: List[Dict] = []
+        self.leverage: Dict[str, str] = {}
+
+    def position(self, symbol: str) -> Dict:
+        position = self.positions.get(symbol)
+        if position is None:
+            position = {'size': 0.0, 'side': '', 'avg_price': 0.0, 'take_profit': 0.0, 'stop_loss': 0.0,
+                        'realised_pnl': 0.0, 'created_time': _now_ms(), 'updated_time': _now_ms()}
+            self.positions[symbol] = position
+        return position
+
+
+class SimulatedExchange:
+    """Order book-less matching engine: harga ditentukan simulator (set_price)"""
+
+    def __init__(self, prices: Dict[str, float] = None, balance: float = 1000.0, default_leverage: str = '10',
+                 min_qty: float = 0.001, seed: int = 7):
+        self.prices: Dict[str, float] = dict(prices or DEFAULT_PRICES)
+        self.balance = balance
+        self.default_leverage = default_leverage
+        self.min_qty = min_qty
+        self.seed = seed
+        self.accounts: Dict[str, SimAccount] = {}
+        self.lock = threading.RLock()
+
+    # ------------------------------------------------------------------ accounts
+
+    def add_account(self, api_key: str, secret: str, balance: float = None) -> SimAccount:
+        with self.lock:
+            account = SimAccount(api_key, secret, self.balance if balance is None else balance)
+            self.accounts[api_key] = account
+            return account
+
+    def account(self, api_key: str) -> Optional[SimAccount]:
+        return self.accounts.get(api_key)
+
+    # ------------------------------------------------------------------ market
+
+    def price(self, symbol: str) -> float:
+        price = self.prices.get(symbol)
+        if price is None:
+            raise SimulatorError(10001, f"params error: symbol {symbol} invalid")
+        return price
+
+    def set_price(self, symbol: str, price: float):
+        """Gerakkan harga lalu jalankan matching (limit order + TP/SL)"""
+        with self.lock:
+            self.prices[symbol] = float(price)
+            for account in self.accounts.values():
+                self._match_limits(account, symbol, price)
+                self._check_tpsl(account, symbol, price)
+
+    def ticker(self, symbol: str) -> Dict:
+        price = self.price(symbol)
+        spread = price * 0.00005
+        return {
+            'symbol': symbol,
+            'lastPrice': _fmt(price),
+            'markPrice': _fmt(price),
+            'indexPrice': _fmt(price),
+            'bid1Price': _fmt(price - spread),
+            'ask1Price': _fmt(price + spread),
+            'bid1Size': '10',
+            'ask1Size': '10',
+            'fundingRate': '0.0001',
+            'volume24h': '100000',
+            'turnover24h': _fmt(price * 100000),
+            'price24hPcnt': '0'
+        }
+
+    def klines(self, symbol: str, interval: str, limit: int, end: int = None) -> List[List[str]]:
+        """Candle sintetis deterministik; candle berjalan ditutup di harga sekarang (terbaru dulu)"""
+        price = self.price(symbol)
+        minutes = {'D': 1440, 'W': 10080, 'M': 43200}.get(interval) or int(interval)
+        step = minutes * 60 * 1000
+        current = ((end or _now_ms()) // step) * step
+        rows = []
+        close = price
+        for index in range(limit):
+            start = current - index * step
+            rng = random.Random(hash((self.seed, symbol, minutes, start)))
+            move = rng.uniform(-0.006, 0.006) * math.sqrt(minutes / 60.0)
+            open_price = close / (1 + move)
+            high = max(open_price, close) * (1 + rng.uniform(0.0005, 0.004))
+            low = min(open_price, close) * (1 - rng.uniform(0.0005, 0.004))
+            rows.append([str(start), _fmt(round(open_price, 4)), _fmt(round(high, 4)), _fmt(round(low, 4)),
+                         _fmt(round(close, 4)), '1000', _fmt(round(close * 1000, 2))])
+            close = open_price
+        return rows
+
+    # ------------------------------------------------------------------ orders
+
+    def create_order(self, account: SimAccount, params: Dict) -> Dict:
+        with self.lock:
+            symbol = params.get('symbol')
+            price_now = self.price(symbol)
+            side = params.get('side')
+            if side not in ('Buy', 'Sell'):
+                raise SimulatorError(10001, 'params error: side invalid')
+            order_type = params.get('orderType', 'Market')
+            qty = _to_float(params.get('qty'), 'qty')
+            if qty < self.min_qty:
+                raise SimulatorError(10001, f'params error: qty must be >= {self.min_qty}')
+            price = _to_float(params['price'], 'price') if order_type == 'Limit' else 0.0
+            if order_type == 'Limit' and price <= 0:
+                raise SimulatorError(10001, 'params error: price invalid')
+            reduce_only = str(params.get('reduceOnly', '')).lower() == 'true'
+            link_id = params.get('orderLinkId') or ''
+            if link_id and any(o['orderLinkId'] == link_id for o in account.orders.values()):
+                raise SimulatorError(110072, 'OrderLinkedID is duplicate')
+
+            position = account.position(symbol)
+            if reduce_only and (position['size'] == 0 or position['side'] == side):
+                raise SimulatorError(110017, 'Reduce-only rule not satisfied')
+            if not reduce_only:
+                leverage = float(account.leverage.get(symbol, self.default_leverage))
+                required = qty * (price or price_now) / leverage + qty * (price or price_now) * TAKER_FEE
+                if required > self._available(account):
+                    raise SimulatorError(110007, 'ab not enough for new order')
+
+            now = _now_ms()
+            order = {
+                'orderId': str(uuid.uuid4()),
+                'orderLinkId': link_id,
+                'symbol': symbol,
+                'side': side,
+                'orderType': order_type,
+                'price': _fmt(price),
+                'qty': _fmt(qty),
+                'cumExecQty': '0',
+                'cumExecValue': '0',
+                'cumExecFee': '0',
+                'avgPrice': '',
+                'orderStatus': 'New',
+                'timeInForce': params.get('timeInForce', 'GTC'),
+                'reduceOnly': reduce_only,
+                'takeProfit': params.get('takeProfit', ''),
+                'stopLoss': params.get('stopLoss', ''),
+                'stopOrderType': '',
+                'positionIdx': int(params.get('positionIdx', 0) or 0),
+                'createdTime': str(now),
+                'updatedTime': str(now)
+            }
+            account.orders[order['orderId']] = order
+
+            if order_type == 'Market':
+                self._fill(account, order, price_now, maker=False)
+            elif (side == 'Buy' and price >= price_now) or (side == 'Sell' and price <= price_now):
+                # Limit yang langsung crossing = taker di harga pasar
+                self._fill(account, order, price_now, maker=False)
+            return {'orderId': order['orderId'], 'orderLinkId': link_id}
+
+    def _find_order(self, account: SimAccount, params: Dict) -> Dict:
+        order = account.orders.get(params.get('orderId') or '')
+        if order is None and params.get('orderLinkId'):
+            order = next((o for o in account.orders.values() if o['orderLinkId'] == params['orderLinkId']), None)
+        if order is None or order['orderStatus'] not in OPEN_STATUSES:
+            raise SimulatorError(110001, 'Order does not exist.')
+        return order
+
+    def cancel_order(self, account: SimAccount, params: Dict) -> Dict:
+        with self.lock:
+            order = self._find_order(account, params)
+            order['orderStatus'] = 'Cancelled'
+            order['updatedTime'] = str(_now_ms())
+            return {'orderId': order['orderId'], 'orderLinkId': order['orderLinkId']}
+
+    def amend_order(self, account: SimAccount, params: Dict) -> Dict:
+        with self.lock:
+            order = self._find_order(account, params)
+            if 'qty' in params:
+                order['qty'] = _fmt(_to_float(params['qty'], 'qty'))
+            if 'price' in params:
+                order['price'] = _fmt(_to_float(params['price'], 'price'))
+            for field in ('takeProfit', 'stopLoss'):
+                if field in params:
+                    order[field] = params[field]
+            order['updatedTime'] = str(_now_ms())
+            self._match_limits(account, order['symbol'], self.price(order['symbol']))
+            return {'orderId': order['orderId'], 'orderLinkId': order['orderLinkId']}
+
+    def set_leverage(self, account: SimAccount, params: Dict):
+        with self.lock:
+            symbol = params.get('symbol')
+            self.price(symbol)
+            leverage = str(params.get('buyLeverage') or params.get('sellLeverage') or '')
+            _to_float(leverage, 'buyLeverage')
+            if account.leverage.get(symbol, self.default_leverage) == leverage:
+                raise SimulatorError(110043, 'leverage not modified')
+            account.leverage[symbol] = leverage
+
+    def set_trading_stop(self, account: SimAccount, params: Dict):
+        with self.lock:
+            position = account.position(params.get('symbol'))
+            if position['size'] == 0:
+                raise SimulatorError(10001, 'can not set tp/sl/ts for zero position')
+            if 'takeProfit' in params:
+                position['take_profit'] = float(params['takeProfit'] or 0)
+            if 'stopLoss' in params:
+                position['stop_loss'] = float(params['stopLoss'] or 0)
+            position['updated_time'] = _now_ms()
+
+    # ------------------------------------------------------------------ matching
+
+    def _available(self, account: SimAccount) -> float:
+        used = 0.0
+        for symbol, position in account.positions.items():
+            if position['size'] > 0:
+                leverage = float(account.leverage.get(symbol, self.default_leverage))
+                used += position['size'] * position['avg_price'] / leverage
+        for order in account.orders.values():
+            if order['orderStatus'] in OPEN_STATUSES and not order['reduceOnly']:
+                leverage = float(account.leverage.get(order['symbol'], self.default_leverage))
+                used += float(order['qty']) * float(order['price'] or 0) / leverage
+        return account.balance + self._unrealised(account) - used
+
+    def _unrealised(self, account: SimAccount, symbol: str = None) -> float:
+        total = 0.0
+        for sym, position in account.positions.items():
+            if position['size'] > 0 and (symbol is None or sym == symbol):
+                direction = 1 if position['side'] == 'Buy' else -1
+                total += (self.prices[sym] - position['avg_price']) * position['size'] * direction
+        return total
+
+    def _fill(self, account: SimAccount, order: Dict, price: float, maker: bool,
+              stop_order_type: str = ''):
+        symbol = order['symbol']
+        position = account.position(symbol)
+        qty = float(order['qty']) - float(order['cumExecQty'])
+        if order['reduceOnly']:
+            if position['size'] == 0 or position['side'] == order['side']:
+                order['orderStatus'] = 'Deactivated'
+                order['updatedTime'] = str(_now_ms())
+                return
+            qty = min(qty, position['size'])
+
+        fee = qty * price * (MAKER_FEE if maker else TAKER_FEE)
+        closed_size = 0.0
+        realised = 0.0
+        if position['size'] == 0 or position['side'] == order['side']:
+            total = position['size'] + qty
+            position['avg_price'] = (position['avg_price'] * position['size'] + price * qty) / total
+            position['size'] = total
+            position['side'] = order['side']
+            if order.get('takeProfit'):
+                position['take_profit'] = float(order['takeProfit'])
+            if order.get('stopLoss'):
+                position['stop_loss'] = float(order['stopLoss'])
+        else:
+            direction = 1 if position['side'] == 'Buy' else -1
+            closed_size = min(qty, position['size'])
+            realised = (price - position['avg_price']) * closed_size * direction
+            remaining = qty - closed_size
+            position['size'] -= closed_size
+            if remaining > 0:
+                # Reversal: sisa qty membuka posisi arah baru
+                position.update({'size': remaining, 'side': order['side'], 'avg_price': price,
+                                 'take_profit': float(order.get('takeProfit') or 0),
+                                 'stop_loss': float(order.get('stopLoss') or 0)})
+            elif position['size'] <= 1e-12:
+                position.update({'size': 0.0, 'side': '', 'avg_price': 0.0, 'take_profit': 0.0, 'stop_loss': 0.0})
+
+        account.balance += realised - fee
+        position['realised_pnl'] += realised - fee
+        position['updated_time'] = _now_ms()
+
+        now = _now_ms()
+        order['cumExecQty'] = _fmt(float(order['cumExecQty']) + qty)
+        order['cumExecValue'] = _fmt(float(order['cumExecValue']) + qty * price)
+        order['cumExecFee'] = _fmt(float(order['cumExecFee']) + fee)
+        order['avgPrice'] = _fmt(price)
+        order['orderStatus'] = 'Filled'
+        order['updatedTime'] = str(now)
+        account.executions.append({
+            'symbol': symbol,
+            'orderId': order['orderId'],
+            'orderLinkId': order['orderLinkId'],
+            'side': order['side'],
+            'orderType': order['orderType'],
+            'stopOrderType': stop_order_type,
+            'execId': str(uuid.uuid4()),
+            'execPrice': _fmt(price),
+            'execQty': _fmt(qty),
+            'execValue': _fmt(qty * price),
+            'execFee': _fmt(fee),
+            'feeRate': _fmt(MAKER_FEE if maker else TAKER_FEE),
+            'execType': 'Trade',
+            'isMaker': maker,
+            'closedSize': _fmt(closed_size),
+            'execTime': str(now)
+        })
+
+        if position['size'] == 0:
+            # Posisi tutup -> reduce-only yang tersisa di-deactivate (seperti Bybit)
+            for other in account.orders.values():
+                if other['symbol'] == symbol and other['reduceOnly'] and other['orderStatus'] in OPEN_STATUSES:
+                    other['orderStatus'] = 'Deactivated'
+                    other['updatedTime'] = str(now)
+
+    def _match_limits(self, account: SimAccount, symbol: str, price: float):
+        for order in sorted(account.orders.values(), key=lambda o: o['createdTime']):
+            if order['symbol'] != symbol or order['orderType'] != 'Limit' or order['orderStatus'] not in OPEN_STATUSES:
+                continue
+            limit = float(order['price'])
+            if (order['side'] == 'Buy' and price <= limit) or (order['side'] == 'Sell' and price >= limit):
+                self._fill(account, order, limit, maker=True)
+
+    def _check_tpsl(self, account: SimAccount, symbol: str, price: float):
+        position = account.positions.get(symbol)
+        if not position or position['size'] == 0:
+            return
+        long = position['side'] == 'Buy'
+        tp, sl = position['take_profit'], position['stop_loss']
+        trigger = None
+        if tp and ((long and price >= tp) or (not long and price <= tp)):
+            trigger = 'TakeProfit'
+        elif sl and ((long and price <= sl) or (not long and price >= sl)):
+            trigger = 'StopLoss'
+        if trigger is None:
+            return
+        now = str(_now_ms())
+        order = {
+            'orderId': str(uuid.uuid4()), 'orderLinkId': '', 'symbol': symbol,
+            'side': 'Sell' if long else 'Buy', 'orderType': 'Market', 'price': '0',
+            'qty': _fmt(position['size']), 'cumExecQty': '0', 'cumExecValue': '0', 'cumExecFee': '0',
+            'avgPrice': '', 'orderStatus': 'Untriggered', 'timeInForce': 'IOC', 'reduceOnly': True,
+            'takeProfit': '', 'stopLoss': '', 'stopOrderType': trigger, 'positionIdx': 0,
+            'createdTime': now, 'updatedTime': now
+        }
+        account.orders[order['orderId']] = order
+        self._fill(account, order, price, maker=False, stop_order_type=trigger)
+
+    # ------------------------------------------------------------------ views
+
+    def position_list(self, account: SimAccount, symbol: str = None) -> List[Dict]:
+        symbols = [symbol] if symbol else list(self.prices.keys())
+        rows = []
+        for sym in symbols:
+            self.price(sym)
+            position = account.position(sym)
+            if not symbol and position['size'] == 0:
+                continue
+            leverage = account.leverage.get(sym, self.default_leverage)
+            mark = self.prices[sym]
+            rows.append({
+                'positionIdx': 0,
+                'symbol': sym,
+                'side': position['side'],
+                'size': _fmt(position['size']),
+                'avgPrice': _fmt(position['avg_price']),
+                'positionValue': _fmt(position['size'] * position['avg_price']),
+                'leverage': leverage,
+                'markPrice': _fmt(mark),
+                'unrealisedPnl': _fmt(round(self._unrealised(account, sym), 8)),
+                'cumRealisedPnl': _fmt(round(position['realised_pnl'], 8)),
+                'takeProfit': _fmt(position['take_profit']),
+                'stopLoss': _fmt(position['stop_loss']),
+                'tpslMode': 'Full',
+                'positionStatus': 'Normal',
+                'createdTime': str(position['created_time']),
+                'updatedTime': str(position['updated_time'])
+            })
+        return rows
+
+    def wallet(self, account: SimAccount) -> Dict:
+        upl = self._unrealised(account)
+        available = self._available(account)
+        equity = account.balance + upl
+        return {
+            'accountType': 'UNIFIED',
+            'totalEquity': _fmt(round(equity, 8)),
+            'totalWalletBalance': _fmt(round(account.balance, 8)),
+            'totalMarginBalance': _fmt(round(equity, 8)),
+            'totalAvailableBalance': _fmt(round(available, 8)),
+            'totalPerpUPL': _fmt(round(upl, 8)),
+            'totalInitialMargin': _fmt(round(equity - available, 8)),
+            'coin': [{
+                'coin': 'USDT',
+                'equity': _fmt(round(equity, 8)),
+                'walletBalance': _fmt(round(account.balance, 8)),
+                'availableToWithdraw': _fmt(round(available, 8)),
+                'unrealisedPnl': _fmt(round(upl, 8)),
+                'totalOrderIM': '0',
+                'totalPositionIM': _fmt(round(equity - available, 8))
+            }]
+        }
+
+
+def _paginate(rows: List[Dict], params: Dict, time_field: str) -> Dict:
+    """Filter startTime/endTime (default 7 hari) + cursor offset, terbaru dulu"""
+    end = int(params.get('endTime') or _now_ms())
+    start = int(params.get('startTime') or end - HISTORY_WINDOW_MS)
+    if end - start > HISTORY_WINDOW_MS:
+        raise SimulatorError(10001, 'params error: time range exceeds 7 days')
+    selected = [r for r in rows if start <= int(r[time_field]) <= end]
+    if params.get('symbol'):
+        selected = [r for r in selected if r['symbol'] == params['symbol']]
+    selected.sort(key=lambda r: int(r[time_field]), reverse=True)
+    limit = max(1, min(int(params.get('limit') or 50), 100))
+    offset = int(params.get('cursor') or 0)
+    page = selected[offset:offset + limit]
+    next_cursor = str(offset + limit) if offset + limit < len(selected) else ''
+    return {'category': 'linear', 'list': [dict(r) for r in page], 'nextPageCursor': next_cursor}
+
+
+class _RateWindow:
+    """Fixed window 1 detik per (api_key, endpoint), seperti header X-Bapi-Limit-*"""
+
+    def __init__(self, limits: Dict[str, int]):
+        self.limits = limits
+        self._windows: Dict[Tuple[str, str], List] = {}
+        self._lock = threading.Lock()
+
+    def hit(self, api_key: str, endpoint: str) -> Tuple[bool, Dict[str, str]]:
+        limit = self.limits.get(endpoint, self.limits.get('default', 50))
+        now = _now_ms()
+        with self._lock:
+            window = self._windows.get((api_key, endpoint))
+            if window is None or now >= window[0]:
+                window = [now - now % 1000 + 1000, 0]
+                self._windows[(api_key, endpoint)] = window
+            window[1] += 1
+            allowed = window[1] <= limit
+            remaining = max(0, limit - window[1])
+            reset = window[0]
+        return allowed, {
+            'X-Bapi-Limit': str(limit),
+            'X-Bapi-Limit-Status': str(remaining),
+            'X-Bapi-Limit-Reset-Timestamp': str(reset)
+        }
+
+
+class BybitSimulator:
+    """HTTP front-end simulator: auth, rate limit, latency, routing ke SimulatedExchange"""
+
+    PUBLIC_ENDPOINTS = ('/v5/market/time', '/v5/market/tickers', '/v5/market/kline')
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, api_keys: Dict[str, str] = None,
+                 exchange: SimulatedExchange = None, latency: float = 0.0, jitter: float = 0.0,
+                 rate_limits: Dict[str, int] = None):
+        self.host = host
+        self.port = port
+        self.exchange = exchange or SimulatedExchange()
+        for api_key, secret in (api_keys or {}).items():
+            self.exchange.add_account(api_key, secret)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate = _RateWindow(rate_limits or DEFAULT_RATE_LIMITS)
+        self.requests = 0
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self.trade_ws: Optional[LocalWebSocketServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Start server di background thread; return base URL"""
+        simulator = self
+
+        class Handler(_SimulatorHandler):
+            sim = simulator
+
+        self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        self._server.daemon_threads = True
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, name='bybit-simulator', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def start_trade_ws(self, port: int = 0) -> str:
+        """Start trade websocket (/v5/trade) di atas exchange yang sama; return ws:// URL"""
+        secrets = {api_key: account.secret for api_key, account in self.exchange.accounts.items()}
+        self.trade_ws = LocalWebSocketServer(self.host, port, handler=self._trade_ws_handler, api_secrets=secrets)
+        return self.trade_ws.start()
+
+    def stop(self):
+        if self.trade_ws is not None:
+            self.trade_ws.stop()
+            self.trade_ws = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def set_price(self, symbol: str, price: float):
+        self.exchange.set_price(symbol, price)
+
+    def add_account(self, api_key: str, secret: str, balance: float = None) -> SimAccount:
+        if self.trade_ws is not None:
+            self.trade_ws.api_secrets[api_key] = secret
+        return self.exchange.add_account(api_key, secret, balance)
+
+    # ------------------------------------------------------------------ request pipeline
+
+    def handle(self, method: str, path: str, query: str, body: bytes, headers) -> Tuple[Dict, Dict[str, str]]:
+        """Return (payload JSON, extra headers)"""
+        self.requests += 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        try:
+            if method == 'GET':
+                params = dict(parse_qsl(query, keep_blank_values=True))
+                payload = query
+            else:
+                payload = body.decode('utf-8')
+                params = json.loads(payload) if payload else {}
+        except (ValueError, UnicodeDecodeError):
+            return _error(10001, 'params error: invalid body'), {}
+
+        if path in self.PUBLIC_ENDPOINTS:
+            try:
+                return _ok(self._public(path, params)), {}
+            except SimulatorError as e:
+                return _error(e.ret_code, e.ret_msg), {}
+
+        try:
+            account = self._authenticate(headers, payload)
+        except SimulatorError as e:
+            return _error(e.ret_code, e.ret_msg), {}
+
+        allowed, limit_headers = self.rate.hit(account.api_key, path)
+        if not allowed:
+            return _error(10006, 'Too many visits!'), limit_headers
+        try:
+            result, ext = self._private(method, path, params, account)
+        except SimulatorError as e:
+            return _error(e.ret_code, e.ret_msg), limit_headers
+        return _ok(result, ext), limit_headers
+
+    def _trade_ws_handler(self, connection: StandInConnection, message: Dict):
+        """op order.* di trade websocket; ping/auth ditangani handler stand-in default"""
+        op = message.get('op')
+        path = TRADE_WS_OPS.get(op)
+        if path is None:
+            bybit_op_handler(connection, message)
+            return
+        self.requests += 1
+        if self.latency or self.jitter:
+            time.sleep(self.latency + random.uniform(0, self.jitter))
+        reply = {'reqId': message.get('reqId'), 'op': op, 'connId': 'standin'}
+        account = self.exchange.account(connection.api_key or '') if connection.authenticated else None
+        if account is None:
+            connection.send({**reply, 'retCode': 10003, 'retMsg': 'Request not authorized', 'data': {}})
+            return
+
+        header = message.get('header') or {}
+        try:
+            ts = int(header.get('X-BAPI-TIMESTAMP') or 0)
+            window = int(header.get('X-BAPI-RECV-WINDOW') or 5000)
+        except ValueError:
+            ts, window = 0, 5000
+        now = _now_ms()
+        if ts < now - window or ts >= now + 1000:
+            connection.send({**reply, 'retCode': 10002, 'retMsg': 'invalid timestamp', 'data': {}})
+            return
+
+        allowed, limit_headers = self.rate.hit(account.api_key, path)
+        reply['header'] = {**limit_headers, 'Timenow': str(now)}
+        if not allowed:
+            connection.send({**reply, 'retCode': 10006, 'retMsg': 'Too many visits!', 'data': {}})
+            return
+        args = message.get('args') or [{}]
+        try:
+            result, ext = self._private('POST', path, args[0], account)
+        except SimulatorError as e:
+            connection.send({**reply, 'retCode': e.ret_code, 'retMsg': e.ret_msg, 'data': {}, 'retExtInfo': {}})
+            return
+        connection.send({**reply, 'retCode': 0, 'retMsg': 'OK', 'data': result, 'retExtInfo': ext})
+
+    def _authenticate(self, headers, payload: str) -> SimAccount:
+        api_key = headers.get('X-BAPI-API-KEY')
+        account = self.exchange.account(api_key or '')
+        if account is None:
+            raise SimulatorError(10003, 'API key is invalid.')
+        timestamp = headers.get('X-BAPI-TIMESTAMP') or ''
+        recv_window = headers.get('X-BAPI-RECV-WINDOW') or '5000'
+        try:
+            ts = int(timestamp)
+            window = int(recv_window)
+        except ValueError:
+            raise SimulatorError(10002, 'invalid request, please check your timestamp or recv_window param')
+        now = _now_ms()
+        if ts < now - window or ts >= now + 1000:
+            raise SimulatorError(10002, f'invalid request, please check your server timestamp or recv_window param. '
+                                        f'req_timestamp[{ts}],server_timestamp[{now}],recv_window[{window}]')
+        expected = hmac.new(account.secret.encode('utf-8'),
+                            f"{timestamp}{api_key}{recv_window}{payload}".encode('utf-8'),
+                            hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected, headers.get('X-BAPI-SIGN') or ''):
+            raise SimulatorError(10004, 'error sign! origin_string[' + f"{timestamp}{api_key}{recv_window}{payload}" + ']')
+        return account
+
+    def _public(self, path: str, params: Dict) -> Dict:
+        exchange = self.exchange
+        if path == '/v5/market/time':
+            now_ns = time.time_ns()
+            return {'timeSecond': str(now_ns // 1_000_000_000), 'timeNano': str(now_ns)}
+        if path == '/v5/market/tickers':
+            symbols = [params['symbol']] if params.get('symbol') else list(exchange.prices.keys())
+            with exchange.lock:
+                return {'category': 'linear', 'list': [exchange.ticker(s) for s in symbols]}
+        # /v5/market/kline
+        limit = max(1, min(int(params.get('limit') or 200), 1000))
+        with exchange.lock:
+            rows = exchange.klines(params.get('symbol'), str(params.get('interval', '60')), limit,
+                                   int(params['end']) if params.get('end') else None)
+        return {'category': 'linear', 'symbol': params.get('symbol'), 'list': rows}
+
+    def _private(self, method: str, path: str, params: Dict, account: SimAccount) -> Tuple[Dict, Dict]:
+        exchange = self.exchange
+        if method == 'GET':
+            with exchange.lock:
+                if path == '/v5/account/wallet-balance':
+                    return {'list': [exchange.wallet(account)]}, {}
+                if path == '/v5/position/list':
+                    return {'category': 'linear', 'list': exchange.position_list(account, params.get('symbol')),
+                            'nextPageCursor': ''}, {}
+                if path == '/v5/order/realtime':
+                    # Query per orderId/orderLinkId juga mengembalikan order yang sudah closed (seperti Bybit)
+                    by_id = params.get('orderId') or params.get('orderLinkId')
+                    rows = [dict(o) for o in account.orders.values()
+                            if (by_id or o['orderStatus'] in OPEN_STATUSES)
+                            and (not params.get('symbol') or o['symbol'] == params['symbol'])
+                            and (not params.get('orderId') or o['orderId'] == params['orderId'])
+                            and (not params.get('orderLinkId') or o['orderLinkId'] == params['orderLinkId'])]
+                    rows.sort(key=lambda o: int(o['createdTime']), reverse=True)
+                    return {'category': 'linear', 'list': rows, 'nextPageCursor': ''}, {}
+                if path == '/v5/order/history':
+                    return _paginate(list(account.orders.values()), params, 'createdTime'), {}
+                if path == '/v5/execution/list':
+                    return _paginate(account.executions, params, 'execTime'), {}
+            raise SimulatorError(10001, f'unsupported endpoint {path}')
+
+        if path == '/v5/order/create':
+            return exchange.create_order(account, params), {}
+        if path == '/v5/order/cancel':
+            return exchange.cancel_order(account, params), {}
+        if path == '/v5/order/amend':
+            return exchange.amend_order(account, params), {}
+        if path in ('/v5/order/create-batch', '/v5/order/amend-batch', '/v5/order/cancel-batch'):
+            action = {'/v5/order/create-batch': exchange.create_order,
+                      '/v5/order/amend-batch': exchange.amend_order,
+                      '/v5/order/cancel-batch': exchange.cancel_order}[path]
+            entries = params.get('request') or []
+            if len(entries) > 10:
+                raise SimulatorError(10001, 'params error: batch size exceeds 10')
+            items, infos = [], []
+            for entry in entries:
+                try:
+                    item = action(account, entry)
+                    items.append({'category': 'linear', 'symbol': entry.get('symbol'),
+                                  'createAt': str(_now_ms()), **item})
+                    infos.append({'code': 0, 'msg': 'OK'})
+                except SimulatorError as e:
+                    items.append({'category': 'linear', 'symbol': entry.get('symbol'), 'orderId': '',
+                                  'orderLinkId': entry.get('orderLinkId', '')})
+                    infos.append({'code': e.ret_code, 'msg': e.ret_msg})
+            return {'list': items}, {'list': infos}
+        if path == '/v5/position/set-leverage':
+            exchange.set_leverage(account, params)
+            return {}, {}
+        if path == '/v5/position/trading-stop':
+            exchange.set_trading_stop(account, params)
+            return {}, {}
+        raise SimulatorError(10001, f'unsupported endpoint {path}')
+
+
+def _ok(result: Dict, ext: Dict = None) -> Dict:
+    return {'retCode': 0, 'retMsg': 'OK', 'result': result, 'retExtInfo': ext or {}, 'time': _now_ms()}
+
+
+def _error(ret_code: int, ret_msg: str) -> Dict:
+    return {'retCode': ret_code, 'retMsg': ret_msg, 'result': {}, 'retExtInfo': {}, 'time': _now_ms()}
+
+
+class _SimulatorHandler(BaseHTTPRequestHandler):
+    sim: BybitSimulator = None
+    protocol_version = 'HTTP/1.1'  # keep-alive seperti api.bybit.com
+
+    def _dispatch(self, method: str):
+        parts = urlsplit(self.path)
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        payload, extra_headers = self.sim.handle(method, parts.path, parts.query, body, self.headers)
+        data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for key, value in extra_headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._dispatch('GET')
+
+    def do_POST(self):
+        self._dispatch('POST')
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Bybit V5 simulator')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8900)
+    parser.add_argument('--api-key', action='append', default=[], help='API key (boleh berulang)')
+    parser.add_argument('--api-secret', action='append', default=[], help='Secret pasangan --api-key')
+    parser.add_argument('--balance', type=float, default=1000.0)
+    parser.add_argument('--latency-ms', type=float, default=0.0)
+    parser.add_argument('--jitter-ms', type=float, default=0.0)
+    parser.add_argument('--trade-ws-port', type=int, default=None,
+                        help='Port trade websocket (/v5/trade) untuk order entry; default nonaktif')
+    parser.add_argument('--walk', type=float, default=0.0,
+                        help='Random walk harga tiap detik (fraksi, misal 0.001); 0 = harga statis')
+    args = parser.parse_args()
+
+    exchange = SimulatedExchange(balance=args.balance)
+    simulator = BybitSimulator(args.host, args.port, dict(zip(args.api_key, args.api_secret)), exchange,
+                               latency=args.latency_ms / 1000.0, jitter=args.jitter_ms / 1000.0)
+    print(f"🧪 Bybit V5 simulator running at {simulator.start()} ({len(args.api_key)} accounts)")
+    print(f"   export BYBIT_BASE_URL={simulator.base_url}")
+    if args.trade_ws_port is not None:
+        print(f"   export BYBIT_TRADE_WS_URL={simulator.start_trade_ws(args.trade_ws_port)}")
+    try:
+        while True:
+            time.sleep(1)
+            if args.walk:
+                for symbol, price in list(exchange.prices.items()):
+                    simulator.set_price(symbol, price * (1 + random.gauss(0, args.walk)))
+    except KeyboardInterrupt:
+        simulator.stop()
+
+
+if __name__ == '__main__':
+    main()
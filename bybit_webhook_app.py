@@ -6,9 +6,10 @@ Author: Sniper AI Trading Agent
 
 import os
 import json
+import hashlib
 import logging
 from datetime import datetime, timedelta
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify
 from flask_cors import CORS
 from typing import Dict, Optional
 import threading
@@ -20,17 +21,24 @@ from bybit_client import BybitProductionClient
 from sniper_calculator import SniperCalculator
 from signal_priority_manager import SignalPriorityManager
 from multi_account_executor import MultiAccountExecutor
+from market_data_feed import get_shared_market_feed
+from private_stream import get_private_stream
+from ws_order_entry import get_order_entry
+from connection_keeper import get_connection_keeper
+from symbol_registry import SymbolLanes, get_symbol_registry
+from execution_queue import ExecutionQueue
+from pretrade import PreTradeData, gather_pretrade
+from account_snapshot import AccountSnapshotCache
+from state_store import get_state_store
+from metrics import METRICS_CONTENT_TYPE, render_metrics
+from structured_logging import TRADES_LOGGER, get_logging_pipeline, log_event
+from webhook_schema import SchemaError, SignalSchema, TokenVerifier
 
-# Configure logging - Semua log alert TradingView masuk ke bybit_production.log
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/home/clurut/binance_webhook/bybit_production.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging - QueueHandler; bybit_production.log (teks) + bybit_events.jsonl (event JSON)
+# ditulis satu writer background, bukan di thread request
+logging_pipeline = get_logging_pipeline()
 logger = logging.getLogger(__name__)
+trades_logger = logging.getLogger(TRADES_LOGGER)
 
 class SniperBybitWebhook:
     """Sniper Bybit Webhook Production App"""
@@ -49,10 +57,33 @@ class SniperBybitWebhook:
             logger.error("❌ Bybit API credentials not found in environment variables")
             raise ValueError("Bybit API credentials required")
         
-        self.client = BybitProductionClient(api_key, secret_key, testnet=False)
+        self.client = BybitProductionClient(api_key, secret_key, testnet=False, account_name='apinur')
         
-        # Last alert tracking
-        self.last_alert = {
+        # Basket symbol yang di-trade (contract spec + risk per symbol)
+        self.symbol_registry = get_symbol_registry()
+        
+        # Fast path webhook: schema payload dan token dikompilasi sekali (reject tanpa I/O)
+        self.signal_schema = SignalSchema(self.symbol_registry, self.config.TARGET_SYMBOL)
+        # Menerima token dari TradingView (sniper-bybit-production-2024) atau token dari .env
+        self.token_verifier = TokenVerifier((self.config.AUTH_TOKEN, "sniper-bybit-production-2024"))
+        
+        # Public websocket market feed (price/kline di memori, REST fallback)
+        self.market_feed = get_shared_market_feed(self.symbol_registry.symbols())
+        if self.market_feed is not None:
+            self.client.attach_market_feed(self.market_feed)
+        
+        # Private websocket mirror: position/order/wallet tanpa polling REST
+        self.private_stream = get_private_stream(self.client, account_name='apinur')
+        if self.private_stream is not None:
+            self.client.attach_private_stream(self.private_stream)
+        
+        # Trade websocket: order create/amend/cancel tanpa HTTP per order (REST fallback)
+        self.order_entry = get_order_entry(self.client, account_name='apinur')
+        if self.order_entry is not None:
+            self.client.attach_order_entry(self.order_entry)
+        
+        # Last alert tracking (default; alert terbaru disimpan di state store, lihat property last_alert)
+        self._default_alert = {
             'timestamp': None,
             'data': None,
             'status': 'none',  # none, executed, failed
@@ -84,25 +115,121 @@ class SniperBybitWebhook:
 
             if len(accounts) >= 2:  # minimal 2 akun agar meaningful
                 self.multi_executor = MultiAccountExecutor(accounts)
+                if self.market_feed is not None:
+                    self.multi_executor.attach_market_feed(self.market_feed)
+                self.multi_executor.attach_private_streams()
+                self.multi_executor.attach_order_entry()
                 logger.info(f"🔁 Multi-Account mode ENABLED. Accounts: {[a['name'] for a in accounts]}")
             else:
                 logger.warning("⚠️ Multi-Account enabled but insufficient credentials. Falling back to single account mode.")
                 self.multi_enabled = False
         
+        # Warm-up + keep-alive koneksi setiap akun, jam server untuk signing
+        self.connection_keeper = get_connection_keeper()
+        self.connection_keeper.register('apinur', self.client)
+        if self.multi_executor:
+            for name, client in self.multi_executor.clients.items():
+                if name != 'apinur':
+                    self.connection_keeper.register(name, client)
+        
         # Initialize Signal Priority Manager
         self.signal_manager = SignalPriorityManager(cooldown_seconds=30)
         
-        # Trading state
-        self.last_trade_time = None
-        self.daily_trades = 0
-        self.daily_pnl = 0.0
-        self.emergency_stop = False
+        # Trading state persisten (SQLite WAL): daily limit, cooldown dan emergency stop bertahan saat restart
+        self.state = get_state_store()
+        # Cooldown signal per symbol dibaca dari state store saat precheck: berlaku lintas restart dan
+        # lintas worker (signal manager per proses tidak melihat signal worker lain)
+        self.signal_cooldown = timedelta(seconds=self.config.STATE_STORE_CONFIG.get('signal_cooldown_seconds', 30))
+        # Lane berjalan paralel: signal manager (memori) dijaga lock; daily limit via reservasi di state store
+        self._state_lock = threading.Lock()
+        
+        # Execution lane per symbol: webhook membalas 202 segera; symbol berbeda dieksekusi paralel,
+        # symbol yang sama tetap berurutan (antar worker gunicorn via symbol_lock). Status signal
+        # disimpan ke state store agar /api/signal/<id> bisa dijawab worker mana pun.
+        self.execution_lanes = SymbolLanes(self.execute_queued_signal, registry=self.symbol_registry,
+                                           on_update=self.state.save_signal)
+        self.execution_lanes.start()
+        
+        # Snapshot akun ter-cache: /pine_data dan /pine_script_inputs tanpa request exchange per poll
+        self.pine_snapshot = AccountSnapshotCache(self._build_pine_data, self._format_for_pine_script,
+                                                  name='pine-snapshot')
+        self.pine_snapshot.start()
         
         # Setup routes
         self.setup_routes()
         
         logger.info("🎯 Sniper Bybit Webhook initialized for PRODUCTION trading")
     
+    # Trading state dibaca dari state store (cache memori, O(1))
+    @property
+    def daily_trades(self) -> int:
+        return self.state.daily_trades
+    
+    @property
+    def daily_pnl(self) -> float:
+        return self.state.daily_pnl
+    
+    @property
+    def last_trade_time(self) -> Optional[datetime]:
+        return self.state.last_trade_time
+    
+    @property
+    def emergency_stop(self) -> bool:
+        return self.state.emergency_stop
+    
+    @emergency_stop.setter
+    def emergency_stop(self, active: bool):
+        self.state.set_emergency_stop(active)
+    
+    @property
+    def last_alert(self) -> Dict:
+        return self.state.get('last_alert') or dict(self._default_alert)
+    
+    @last_alert.setter
+    def last_alert(self, alert: Dict):
+        # execution_details bisa berisi datetime/objek; simpan versi JSON-safe
+        self.state.set('last_alert', json.loads(json.dumps(alert, default=str)))
+    
+    def _build_pine_data(self) -> Dict:
+        """Data akun untuk Pine Script (dipanggil thread refresh snapshot, bukan per request)"""
+        # Get account balance
+        balance_info = self.client.get_account_balance()
+        if not balance_info.get('success'):
+            raise RuntimeError(balance_info.get('error', 'Unable to get account balance'))
+        
+        # Get position info
+        position_info = self.client.get_position_info(self.config.TARGET_SYMBOL)
+        if not position_info.get('success'):
+            raise RuntimeError(position_info.get('error', 'Unable to get position'))
+        
+        # Format for Pine Script
+        return {
+            'account_balance': balance_info.get('available_balance', 0),
+            'total_balance': balance_info.get('total_balance', 0),
+            'daily_pnl': getattr(self, 'daily_pnl', 0),
+            'daily_trades': getattr(self, 'daily_trades', 0),
+            'max_daily_trades': getattr(self.config, 'MAX_DAILY_TRADES', 8),
+            'position_symbol': self.config.TARGET_SYMBOL,
+            'position_side': position_info.get('side', 'None'),
+            'position_size': position_info.get('size', 0),
+            'entry_price': position_info.get('entry_price', 0),
+            'current_pnl': position_info.get('unrealized_pnl', 0),
+            'pnl_percentage': position_info.get('percentage', 0),
+            'stop_loss_price': 0,
+            'take_profit_price': 0,
+            'risk_per_trade': self.config.RISK_PER_TRADE * 100,
+            'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            'status': 'active'
+        }
+    
+    @staticmethod
+    def _conditional_response(body, mimetype: str, etag: str) -> Response:
+        """Response dengan ETag; 304 tanpa body jika If-None-Match cocok"""
+        response = Response(body, mimetype=mimetype)
+        response.set_etag(etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+    
     def _format_for_pine_script(self, data):
         """Format data for Pine Script input"""
         return f"""
@@ -151,6 +278,11 @@ risk_per_trade = {data['risk_per_trade']}
         def status():
             return self.get_status()
         
+        @self.app.route('/metrics', methods=['GET'])
+        def metrics():
+            """Prometheus metrics: latency / retCode / timeout per endpoint per akun"""
+            return Response(render_metrics(), content_type=METRICS_CONTENT_TYPE)
+        
         @self.app.route('/balance', methods=['GET'])
         def balance():
             return self.get_balance()
@@ -163,63 +295,23 @@ risk_per_trade = {data['risk_per_trade']}
         def emergency_stop():
             return self.set_emergency_stop()
         
-        # Pine Script data endpoint
+        # Pine Script data endpoint (dari snapshot ter-cache, ETag/If-None-Match)
         @self.app.route('/pine_data', methods=['GET'])
         def get_pine_data():
             """Get formatted data for Pine Script"""
-            try:
-                # Get account balance
-                balance_info = self.client.get_account_balance()
-                
-                # Get position info
-                position_info = self.client.get_position_info(self.config.TARGET_SYMBOL)
-                
-                # Format for Pine Script
-                pine_data = {
-                    'account_balance': balance_info.get('available_balance', 0),
-                    'total_balance': balance_info.get('total_balance', 0),
-                    'daily_pnl': getattr(self, 'daily_pnl', 0),
-                    'daily_trades': getattr(self, 'daily_trades', 0),
-                    'max_daily_trades': getattr(self.config, 'MAX_DAILY_TRADES', 8),
-                    'position_symbol': self.config.TARGET_SYMBOL,
-                    'position_side': position_info.get('side', 'None'),
-                    'position_size': position_info.get('size', 0),
-                    'entry_price': position_info.get('entry_price', 0),
-                    'current_pnl': position_info.get('unrealized_pnl', 0),
-                    'pnl_percentage': position_info.get('percentage', 0),
-                    'stop_loss_price': 0,
-                    'take_profit_price': 0,
-                    'risk_per_trade': self.config.RISK_PER_TRADE * 100,
-                    'last_update': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                    'status': 'active'
-                }
-                
-                return jsonify({
-                    'success': True,
-                    'data': pine_data,
-                    'pine_script_format': self._format_for_pine_script(pine_data)
-                })
-                
-            except Exception as e:
-                logger.error(f"Pine data error: {e}")
-                return jsonify({'success': False, 'error': str(e)}), 500
+            snapshot = self.pine_snapshot.get()
+            if snapshot is None:
+                return jsonify({'success': False, 'error': self.pine_snapshot.last_error or 'Snapshot not ready'}), 503
+            return self._conditional_response(snapshot.json_body, 'application/json', snapshot.etag_for('json'))
         
         # Pine Script formatted text endpoint
         @self.app.route('/pine_script_inputs', methods=['GET'])
         def get_pine_script_inputs():
             """Get Pine Script input format as plain text"""
-            try:
-                response = self.app.test_client().get('/pine_data')
-                data = json.loads(response.data)
-                
-                if data['success']:
-                    return data['pine_script_format'], 200, {'Content-Type': 'text/plain'}
-                else:
-                    return "Error getting Pine Script data", 500, {'Content-Type': 'text/plain'}
-                    
-            except Exception as e:
-                logger.error(f"Pine script inputs error: {e}")
-                return f"Error: {str(e)}", 500, {'Content-Type': 'text/plain'}
+            snapshot = self.pine_snapshot.get()
+            if snapshot is None:
+                return "Error getting Pine Script data", 503, {'Content-Type': 'text/plain'}
+            return self._conditional_response(snapshot.text, 'text/plain', snapshot.etag_for('text'))
         
         @self.app.route('/orders', methods=['GET'])
         def orders():
@@ -256,68 +348,90 @@ risk_per_trade = {data['risk_per_trade']}
         def get_last_alert():
             """Get last alert data for HTML dashboard"""
             return self.get_last_alert_api()
+        
+        @self.app.route('/api/signal/<signal_id>', methods=['GET'])
+        def get_signal(signal_id):
+            """Status + hasil eksekusi satu signal (signal_id dari respon 202 webhook)"""
+            return self.get_signal_api(signal_id)
     
     def authenticate_request(self, request_data: Dict) -> bool:
-        """Authenticate incoming webhook request"""
+        """Authenticate incoming webhook request (constant-time; token tidak pernah di-log)"""
         try:
-            token = request_data.get('token') or request_data.get('auth_token') or request.headers.get('Authorization')
+            token = TokenVerifier.extract(request_data, request.headers.get('Authorization'))
             
             if not token:
                 logger.warning("⚠️ No authentication token provided")
                 return False
             
-            # Remove 'Bearer ' prefix if present
-            if token.startswith('Bearer '):
-                token = token[7:]
-            
-            # Menerima token dari TradingView (sniper-bybit-production-2024) atau token dari .env
-            if token != self.config.AUTH_TOKEN and token != "sniper-bybit-production-2024":
-                logger.warning(f"⚠️ Invalid authentication token: {token}")
+            if not self.token_verifier.verify(token):
+                logger.warning(f"⚠️ Invalid authentication token from {request.remote_addr}")
                 return False
             
-            logger.info(f"✅ Autentikasi berhasil dengan token: {token}")
-            
             return True
             
         except Exception as e:
             logger.error(f"❌ Authentication error: {e}")
             return False
     
-    def validate_trading_conditions(self) -> Dict:
-        """Validate current trading conditions"""
-        try:
-            # Check emergency stop
-            if self.emergency_stop:
-                return {'valid': False, 'reason': 'Emergency stop activated'}
-            
-            # Check daily trade limit
-            if self.daily_trades >= self.config.SNIPER_CONFIG['max_trades_per_day']:
-                return {'valid': False, 'reason': f'Daily trade limit reached: {self.daily_trades}'}
-            
-            # Check cooldown period
-            if self.last_trade_time:
-                time_since_last = datetime.now() - self.last_trade_time
-                cooldown = timedelta(seconds=self.config.COOLDOWN_SECONDS)
-                
-                if time_since_last < cooldown:
-                    remaining = cooldown - time_since_last
-                    return {'valid': False, 'reason': f'Cooldown active: {remaining.seconds}s remaining'}
+    def precheck_trading_conditions(self, symbol: str = None) -> Dict:
+        """Validasi murah tanpa request exchange (dipakai webhook sebelum enqueue)"""
+        # Check emergency stop
+        if self.emergency_stop:
+            return {'valid': False, 'reason': 'Emergency stop activated'}
+        
+        # Check daily trade limit (termasuk signal yang sedang dieksekusi lane/worker lain)
+        if self.daily_trades + self.state.inflight_count() >= self.config.SNIPER_CONFIG['max_trades_per_day']:
+            return {'valid': False, 'reason': f'Daily trade limit reached: {self.daily_trades}'}
+        
+        # Check cooldown period (per symbol)
+        last_trade_time = self.state.last_trade_for(symbol) if symbol else self.last_trade_time
+        if last_trade_time:
+            time_since_last = datetime.now() - last_trade_time
+            cooldown = timedelta(seconds=self.config.COOLDOWN_SECONDS)
             
-            # Check daily loss limit
-            if self.daily_pnl <= -self.config.MAX_DAILY_LOSS * self.config.ACCOUNT_BALANCE:
-                return {'valid': False, 'reason': f'Daily loss limit reached: ${abs(self.daily_pnl):.2f}'}
+            if time_since_last < cooldown:
+                remaining = cooldown - time_since_last
+                return {'valid': False, 'reason': f'Cooldown active: {remaining.seconds}s remaining'}
+        
+        # Cooldown signal per symbol (state store bersama: signal sebelum restart dan dari worker lain)
+        last_signal_time = self.state.last_signal_for(symbol) if symbol else None
+        if last_signal_time and datetime.now() - last_signal_time < self.signal_cooldown:
+            remaining = self.signal_cooldown - (datetime.now() - last_signal_time)
+            return {'valid': False, 'reason': f'Signal cooldown active: {remaining.seconds}s remaining'}
+        
+        # Check daily loss limit
+        if self.daily_pnl <= -self.config.MAX_DAILY_LOSS * self.config.ACCOUNT_BALANCE:
+            return {'valid': False, 'reason': f'Daily loss limit reached: ${abs(self.daily_pnl):.2f}'}
+        
+        return {'valid': True, 'reason': 'Precheck passed'}
+    
+    def gather_pretrade(self, symbol: str) -> PreTradeData:
+        """Price/ATR + wallet (semua akun di multi mode) paralel dengan satu deadline"""
+        if self.multi_enabled and self.multi_executor:
+            return self.multi_executor.gather_pretrade(symbol, market_client=self.client)
+        return gather_pretrade(symbol, self.client, {self.client.account_name: self.client})
+    
+    def validate_trading_conditions(self, pretrade: Optional[PreTradeData] = None, run_precheck: bool = True) -> Dict:
+        """Validate current trading conditions (precheck + balance; dijalankan worker)"""
+        try:
+            if run_precheck:
+                precheck = self.precheck_trading_conditions(pretrade.symbol if pretrade is not None else None)
+                if not precheck['valid']:
+                    return precheck
             
             # Check account balance (single-account mode only)
             if self.multi_enabled and self.multi_executor:
                 logger.info("🔁 Multi-account mode: skip single-account balance pre-check; per-account balance will be validated during execution")
                 return {'valid': True, 'reason': 'Multi-account mode active'}
             else:
-                balance_info = self.client.get_account_balance()
-                if not balance_info['success']:
+                wallet = pretrade.wallet(self.client.account_name) if pretrade is not None else None
+                if wallet is None:
+                    wallet = self.client.get_wallet()
+                if wallet is None:
                     return {'valid': False, 'reason': 'Unable to verify account balance'}
                 
-                if balance_info['available_balance'] < 5.0:  # Minimum $5 required
-                    return {'valid': False, 'reason': f'Insufficient balance: ${balance_info["available_balance"]:.2f}'}
+                if wallet.total_available_balance < 5.0:  # Minimum $5 required
+                    return {'valid': False, 'reason': f'Insufficient balance: ${wallet.total_available_balance:.2f}'}
                 
                 return {'valid': True, 'reason': 'All conditions met'}
             
@@ -325,10 +439,13 @@ risk_per_trade = {data['risk_per_trade']}
             logger.error(f"❌ Validation error: {e}")
             return {'valid': False, 'reason': f'Validation error: {str(e)}'}
     
-    def process_tradingview_signal(self, signal_data: Dict) -> Dict:
+    def process_tradingview_signal(self, signal_data: Dict, pretrade: Optional[PreTradeData] = None) -> Dict:
         """Process TradingView signal with Professional Signal Priority Manager"""
         try:
-            logger.info(f"📊 Processing TradingView signal: {signal_data}")
+            log_event(logger, 'signal_processing', f"📊 Processing TradingView signal: "
+                      f"{signal_data.get('action')} {signal_data.get('symbol')}",
+                      action=signal_data.get('action'), symbol=signal_data.get('symbol'),
+                      price=signal_data.get('price'))
             
             # Extract signal information
             symbol = signal_data.get('symbol', self.config.TARGET_SYMBOL)
@@ -336,22 +453,24 @@ risk_per_trade = {data['risk_per_trade']}
             timestamp = signal_data.get('timestamp', int(time.time() * 1000))
             confidence_value = float(signal_data.get('confidence', 0))
             
-            # Use Signal Priority Manager to handle conflicts
-            priority_result = self.signal_manager.add_signal(signal_data)
+            # Use Signal Priority Manager to handle conflicts (dipakai bersama semua lane)
+            with self._state_lock:
+                priority_result = self.signal_manager.add_signal(signal_data)
             
             if not priority_result['success']:
                 logger.warning(f"⚠️ Signal rejected by Priority Manager: {priority_result['error']}")
                 return priority_result
+            self.state.record_signal(symbol)
             
             # BYPASS: Selalu set confidence ke 100% untuk melewati validasi
             confidence = 100.0
             signal_data['confidence'] = 100.0
             
             # Validate symbol
-            if symbol != self.config.TARGET_SYMBOL:
+            if not self.symbol_registry.is_supported(symbol):
                 return {
                     'success': False,
-                    'error': f'Invalid symbol: {symbol}. Only {self.config.TARGET_SYMBOL} supported.'
+                    'error': f'Invalid symbol: {symbol}. Supported: {", ".join(self.symbol_registry.symbols())}.'
                 }
             
             # Validate action
@@ -361,12 +480,15 @@ risk_per_trade = {data['risk_per_trade']}
                     'error': f'Invalid action: {action}. Must be BUY or SELL.'
                 }
             
-            # Get current market data
-            current_price = self.client.get_current_price(symbol)
+            # Market data + wallet dari fan-out pre-trade (satu round trip paralel)
+            if pretrade is None or pretrade.symbol != symbol:
+                pretrade = self.gather_pretrade(symbol)
+            
+            current_price = pretrade.price
             if not current_price:
                 return {'success': False, 'error': 'Unable to get current price'}
             
-            atr_value = self.client.calculate_atr(symbol)
+            atr_value = pretrade.atr
             
             # Calculate complete trade plan using Sniper Method
             trade_plan = self.calculator.calculate_complete_trade_plan(
@@ -385,33 +507,39 @@ risk_per_trade = {data['risk_per_trade']}
             
             # Execute the trade
             if self.multi_enabled and self.multi_executor:
-                execution_result = self.multi_executor.execute_signal(signal_data)
+                execution_result = self.multi_executor.execute_signal(signal_data, pretrade)
             else:
-                execution_result = self.client.execute_sniper_trade(signal_data)
+                execution_result = self.client.execute_sniper_trade(signal_data, pretrade)
             
             if execution_result['success']:
                 # Update trading state
-                self.last_trade_time = datetime.now()
-                self.daily_trades += 1
+                self.state.record_trade(symbol)
+                self.pine_snapshot.request_refresh()
                 
                 # Log successful trade (single-account only)
                 if not self.multi_enabled:
                     self.log_trade(trade_plan, execution_result)
                 
-                logger.info(f"🎯 TRADE EXECUTED SUCCESSFULLY!")
-                logger.info(f"📊 Symbol: {symbol} | Action: {action} | Confidence: {confidence:.1%}")
-                logger.info(f"💰 Position: {trade_plan['position_size']} | Entry: ${current_price}")
-                logger.info(f"🛑 SL: ${trade_plan['stop_loss']} | 🎯 TP: ${trade_plan['take_profit_1']}")
+                log_event(logger, 'trade_executed',
+                          f"🎯 Trade executed: {action} {symbol} | Position: {trade_plan['position_size']} "
+                          f"| Entry: ${current_price} | SL: ${trade_plan['stop_loss']} | TP: ${trade_plan['take_profit_1']}",
+                          symbol=symbol, action=action, confidence=confidence,
+                          position_size=trade_plan['position_size'], entry_price=current_price,
+                          stop_loss=trade_plan['stop_loss'], take_profit=trade_plan['take_profit_1'],
+                          success_count=execution_result.get('success_count'),
+                          fail_count=execution_result.get('fail_count'))
                 
                 return {
                     'success': True,
                     'message': 'Trade executed successfully',
                     'trade_plan': trade_plan,
                     'execution': execution_result,
+                    'pretrade': pretrade.to_dict(),
                     'daily_trades': self.daily_trades
                 }
             else:
-                logger.error(f"❌ Trade execution failed: {execution_result.get('error')}")
+                log_event(logger, 'trade_failed', f"❌ Trade failed: {execution_result.get('error')}",
+                          level=logging.ERROR, symbol=symbol, action=action, error=execution_result.get('error'))
                 return execution_result
             
         except Exception as e:
@@ -436,23 +564,41 @@ risk_per_trade = {data['risk_per_trade']}
                 'daily_trade_count': self.daily_trades
             }
             
-            # Write to trade log file
-            with open('bybit_trades.log', 'a') as f:
-                f.write(json.dumps(trade_log) + '\\n')
+            # Satu baris JSON di bybit_trades.log (ditulis writer logging background)
+            trades_logger.info(json.dumps(trade_log))
             
         except Exception as e:
             logger.error(f"❌ Trade logging error: {e}")
     
     def handle_webhook(self) -> Dict:
-        """Main webhook handler"""
+        """
+        Main webhook handler: fast path tanpa I/O jaringan
+        ukuran body -> parse -> token (constant-time) -> schema -> dedupe -> precheck lokal -> enqueue (202)
+        """
+        # Klaim dedupe yang belum berujung enqueue dilepas lagi (retry tidak dianggap duplikat)
+        claim = None
         try:
-            # Get request data
-            if request.content_type == 'application/json':
-                data = request.get_json()
-            else:
+            # Body terlalu besar ditolak sebelum di-parse
+            if (request.content_length or 0) > self.signal_schema.max_body_bytes:
+                return jsonify({
+                    'success': False,
+                    'error': 'Payload too large'
+                }), 413
+            
+            # Get request data (alert TradingView bisa dikirim sebagai text/plain berisi JSON)
+            if request.content_type and request.content_type.startswith(('application/x-www-form-urlencoded',
+                                                                         'multipart/form-data')):
                 data = request.form.to_dict()
+            else:
+                data = request.get_json(force=True, silent=True)
+            if not isinstance(data, dict):
+                return jsonify({
+                    'success': False,
+                    'error': 'Invalid payload: expected a JSON object'
+                }), 400
             
-            logger.info(f"📨 Webhook received: {data}")
+            log_event(logger, 'webhook_received', f"📨 Webhook received: {data.get('action')} {data.get('symbol')}",
+                      action=data.get('action'), symbol=data.get('symbol'), price=data.get('price'))
             
             # Authenticate request
             if not self.authenticate_request(data):
@@ -461,10 +607,40 @@ risk_per_trade = {data['risk_per_trade']}
                     'error': 'Authentication failed'
                 }), 401
             
-            # Validate trading conditions
-            validation = self.validate_trading_conditions()
+            # Schema: action BUY/SELL, symbol ada di registry (ETHUSDT.P -> ETHUSDT), angka valid;
+            # token dibuang sehingga tidak ikut disimpan (last_alert, status signal, state store)
+            try:
+                data = self.signal_schema.validate(data)
+            except SchemaError as e:
+                log_event(logger, 'signal_rejected', f"⚠️ Invalid payload: {e}", level=logging.WARNING,
+                          action=data.get('action'), symbol=data.get('symbol'), reason=str(e))
+                return jsonify({
+                    'success': False,
+                    'error': str(e)
+                }), 400
+            action = data['action']
+            symbol = data['symbol']
+            
+            # Dedupe antar worker: alert yang sama (retry TradingView / load balancer) hanya dieksekusi sekali
+            fingerprint = hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+            signal_id = ExecutionQueue.new_signal_id()
+            owner = self.state.claim_signal(fingerprint, signal_id)
+            if owner is not None:
+                log_event(logger, 'signal_duplicate', f"🔁 Duplicate signal ignored (owner {owner})",
+                          signal_id=owner, action=action, symbol=symbol, price=data.get('price'))
+                return jsonify({
+                    'success': True,
+                    'status': 'duplicate',
+                    'signal_id': owner,
+                    'status_url': f'/api/signal/{owner}'
+                }), 200
+            claim = (fingerprint, signal_id)
+            
+            validation = self.precheck_trading_conditions(symbol)
             if not validation['valid']:
-                logger.warning(f"⚠️ Trading conditions not met: {validation['reason']}")
+                log_event(logger, 'signal_rejected', f"⚠️ Trading conditions not met: {validation['reason']}",
+                          level=logging.WARNING, action=action, symbol=data.get('symbol'),
+                          price=data.get('price'), reason=validation['reason'])
                 
                 # Update alert status for failed validation
                 self.last_alert = {
@@ -475,41 +651,116 @@ risk_per_trade = {data['risk_per_trade']}
                     'execution_details': None
                 }
                 
+                self.state.release_claim(*claim)
                 return jsonify({
                     'success': False,
                     'error': validation['reason']
                 }), 400
             
-            # Store alert data
+            # Alert ditulis sebelum submit: worker lane bisa selesai sebelum handler ini lanjut,
+            # dan update 'processing'/'executed' dari worker tidak boleh ditimpa 'queued'
+            previous_alert = self.last_alert
             self.last_alert = {
                 'timestamp': datetime.now().isoformat(),
+                'signal_id': signal_id,
                 'data': data,
-                'status': 'processing',
+                'status': 'queued',
                 'reason': None,
                 'execution_details': None
             }
             
-            # Process the signal
-            result = self.process_tradingview_signal(data)
+            if self.execution_lanes.submit(symbol, data, signal_id=signal_id) is None:
+                log_event(logger, 'signal_rejected', f"❌ Execution lane {symbol} full - signal rejected",
+                          level=logging.ERROR, action=action, symbol=data.get('symbol'),
+                          price=data.get('price'), reason='Execution queue full')
+                self.state.release_claim(*claim)
+                # Signal tidak pernah masuk antrian -> kembalikan alert sebelumnya (jika belum diganti signal lain)
+                if self.last_alert.get('signal_id') == signal_id:
+                    self.last_alert = previous_alert
+                return jsonify({
+                    'success': False,
+                    'error': 'Execution queue full, retry later'
+                }), 503
             
-            # Update alert status
-            if result['success']:
-                self.last_alert['status'] = 'executed'
-                self.last_alert['execution_details'] = result
-                self.last_alert['reason'] = 'Trade executed successfully'
-                return jsonify(result), 200
-            else:
-                self.last_alert['status'] = 'failed'
-                self.last_alert['reason'] = result.get('error', 'Unknown error')
-                return jsonify(result), 400
+            log_event(logger, 'signal_queued', f"📥 Signal {signal_id} queued ({action})",
+                      signal_id=signal_id, action=action, symbol=data.get('symbol'), price=data.get('price'))
+            return jsonify({
+                'success': True,
+                'status': 'queued',
+                'signal_id': signal_id,
+                'status_url': f'/api/signal/{signal_id}'
+            }), 202
             
         except Exception as e:
             logger.error(f"❌ Webhook handler error: {e}")
+            if claim is not None:
+                try:
+                    self.state.release_claim(*claim)
+                except Exception as release_error:
+                    logger.error(f"❌ Release dedupe claim error: {release_error}")
             return jsonify({
                 'success': False,
                 'error': f'Webhook error: {str(e)}'
             }), 500
     
+    def _update_last_alert(self, signal_id: str, **fields):
+        """Update last_alert hanya jika masih milik signal ini (signal baru tidak tertimpa)"""
+        alert = self.last_alert
+        if alert.get('signal_id') == signal_id:
+            alert.update(fields)
+            self.last_alert = alert
+    
+    def execute_queued_signal(self, signal_id: str, data: Dict) -> Dict:
+        """Worker execution queue: validasi penuh lalu eksekusi signal"""
+        self._update_last_alert(signal_id, status='processing')
+        result = self._execute_signal(signal_id, data)
+        
+        # Update alert status
+        if result['success']:
+            self._update_last_alert(signal_id, status='executed', execution_details=result,
+                                    reason='Trade executed successfully')
+        else:
+            self._update_last_alert(signal_id, status='failed', reason=result.get('error', 'Unknown error'))
+        
+        trade_plan = result.get('trade_plan') or {}
+        log_event(logger, 'signal_finished',
+                  f"{'✅' if result['success'] else '❌'} Signal {signal_id} "
+                  f"{'executed' if result['success'] else 'failed'}",
+                  level=logging.INFO if result['success'] else logging.WARNING,
+                  signal_id=signal_id, status='executed' if result['success'] else 'failed',
+                  action=str(data.get('action', '')).upper(), symbol=data.get('symbol'),
+                  error=None if result['success'] else result.get('error', 'Unknown error'),
+                  position_size=trade_plan.get('position_size'), entry_price=trade_plan.get('entry_price'),
+                  stop_loss=trade_plan.get('stop_loss'), take_profit=trade_plan.get('take_profit_1'))
+        return result
+    
+    def _execute_signal(self, signal_id: str, data: Dict) -> Dict:
+        symbol = data.get('symbol', self.config.TARGET_SYMBOL)
+        # Satu eksekusi per symbol di semua worker (cooldown per symbol tetap berlaku)
+        with self.state.symbol_lock(symbol):
+            precheck = self.precheck_trading_conditions(symbol)
+            if not precheck['valid']:
+                logger.warning(f"⚠️ Signal {signal_id}: trading conditions not met: {precheck['reason']}")
+                return {'success': False, 'error': precheck['reason']}
+            
+            # Reservasi slot daily limit secara atomik (lane dan worker lain berjalan paralel)
+            if not self.state.reserve_trade_slot(signal_id, self.config.SNIPER_CONFIG['max_trades_per_day']):
+                logger.warning(f"⚠️ Signal {signal_id}: daily trade limit reached")
+                return {'success': False, 'error': f'Daily trade limit reached: {self.daily_trades}'}
+            
+            try:
+                # Semua read pre-trade dikirim bersamaan lalu dipakai ulang oleh validasi dan eksekusi
+                pretrade = self.gather_pretrade(symbol)
+                
+                validation = self.validate_trading_conditions(pretrade, run_precheck=False)
+                if not validation['valid']:
+                    logger.warning(f"⚠️ Signal {signal_id}: trading conditions not met: {validation['reason']}")
+                    return {'success': False, 'error': validation['reason']}
+                
+                return self.process_tradingview_signal(data, pretrade)
+            finally:
+                self.state.release_trade_slot(signal_id)
+    
     def get_status(self) -> Dict:
         """Get bot status"""
         try:
@@ -525,8 +776,18 @@ risk_per_trade = {data['risk_per_trade']}
                 'last_trade': self.last_trade_time.isoformat() if self.last_trade_time else None,
                 'position': position_info,
                 'target_symbol': self.config.TARGET_SYMBOL,
+                'symbols': self.symbol_registry.symbols(),
                 'risk_per_trade': f"{self.config.RISK_PER_TRADE:.1%}",
-                'max_daily_trades': self.config.SNIPER_CONFIG['max_trades_per_day']
+                'max_daily_trades': self.config.SNIPER_CONFIG['max_trades_per_day'],
+                'market_feed': self.market_feed.get_status() if self.market_feed else None,
+                'private_stream': self.private_stream.get_status() if self.private_stream else None,
+                'order_entry': self.order_entry.get_status() if self.order_entry else None,
+                'connections': self.connection_keeper.get_status(),
+                'endpoints': self.client.guard.get_status(),
+                'execution_lanes': self.execution_lanes.get_status(),
+                'state_store': self.state.get_status(),
+                'logging': logging_pipeline.get_status(),
+                'pine_snapshot': self.pine_snapshot.get_status()
             })
             
         except Exception as e:
@@ -560,6 +821,7 @@ risk_per_trade = {data['risk_per_trade']}
         """Close open position"""
         try:
             result = self.client.close_position(self.config.TARGET_SYMBOL)
+            self.pine_snapshot.request_refresh()
             return jsonify(result)
         except Exception as e:
             return jsonify({'success': False, 'error': str(e)})
@@ -699,12 +961,28 @@ risk_per_trade = {data['risk_per_trade']}
             logger.error(f"❌ API last alert error: {e}")
             return jsonify({'success': False, 'error': str(e)})
     
+    def get_signal_api(self, signal_id: str) -> Dict:
+        """Status eksekusi satu signal (lane worker ini, lalu state store untuk worker lain)"""
+        record = self.execution_lanes.get(signal_id) or self.state.get_signal(signal_id)
+        if record is None:
+            return jsonify({'success': False, 'error': f'Signal {signal_id} not found'}), 404
+        
+        # Token autentikasi tidak ikut dikembalikan
+        record['data'] = {k: v for k, v in (record.get('data') or {}).items() if k not in ('token', 'auth_token')}
+        return jsonify({'success': True, 'signal': record})
+    
+    def start_background(self) -> bool:
+        """Warm-up semua koneksi akun sebelum menerima signal pertama (dipanggil run() dan wsgi.py)"""
+        return self.connection_keeper.start()
+    
     def run(self, host='0.0.0.0', port=5001, debug=False):
         """Run the webhook app"""
         logger.info(f"🚀 Starting Sniper Bybit Webhook on {host}:{port}")
         logger.info("🎯 Production Mode - Real Trading Active")
         logger.info(f"💰 Modal: ${self.config.ACCOUNT_BALANCE} | Symbol: {self.config.TARGET_SYMBOL}")
         
+        self.start_background()
+        
         # Production mode: disable reloader to prevent duplicate processes
         self.app.run(host=host, port=port, debug=debug, use_reloader=False)
 
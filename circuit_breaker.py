@@ -0,0 +1,216 @@
+"""
+⚡ SNIPER CIRCUIT BREAKER - Adaptive Timeout & Fail-fast per Endpoint
+- Timeout per endpoint class diturunkan dari persentil latency yang teramati
+  (p99 x multiplier, di-clamp min/max); order punya budget sendiri yang lebih ketat
+- Circuit breaker per endpoint: setelah N kegagalan beruntun (timeout / koneksi / 5xx)
+  call langsung gagal (atau memakai respon market data terakhir) sampai cooldown lewat,
+  lalu satu call percobaan (half-open) menentukan apakah circuit ditutup lagi
+Author: Sniper AI Trading Agent
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, Optional, Tuple
+
+from bybit_config import BybitProductionConfig
+from rate_limiter import endpoint_class
+
+CIRCUIT_OPEN_RET_CODE = -2  # retCode lokal: request tidak dikirim karena circuit open
+
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+
+def budget_for(method: str, endpoint: str) -> str:
+    """'order' untuk write ke order/posisi (budget ketat), selain itu 'read'"""
+    if method.upper() != 'GET' and (endpoint.startswith('/v5/order') or endpoint.startswith('/v5/position')):
+        return 'order'
+    return 'read'
+
+
+class LatencyTracker:
+    """Ring buffer latency (detik) untuk menghitung persentil"""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+class CircuitBreaker:
+    """closed -> open (N gagal beruntun) -> half_open (setelah reset_timeout) -> closed/open"""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 5.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.opens = 0
+        self._trial_in_flight = False
+
+    def allow(self, now: float) -> bool:
+        if self.state == STATE_CLOSED:
+            return True
+        if self.state == STATE_OPEN and now - self.opened_at >= self.reset_timeout:
+            self.state = STATE_HALF_OPEN
+            self._trial_in_flight = False
+        if self.state == STATE_HALF_OPEN and not self._trial_in_flight:
+            # Satu call percobaan; caller lain tetap fail-fast
+            self._trial_in_flight = True
+            return True
+        return False
+
+    def release(self):
+        """Call percobaan tidak jadi dikirim ke exchange -> slot trial dikembalikan"""
+        if self.state == STATE_HALF_OPEN:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self._trial_in_flight = False
+
+    def record_failure(self, now: float):
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.state == STATE_HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != STATE_OPEN:
+                self.opens += 1
+            self.state = STATE_OPEN
+            self.opened_at = now
+
+
+class EndpointGuard:
+    """Adaptive timeout + circuit breaker + cache market data terakhir untuk satu base URL"""
+
+    def __init__(self, config: Dict = None):
+        config = config or BybitProductionConfig.RESILIENCE_CONFIG
+        self.timeouts = config['timeouts']
+        self.percentile = config.get('percentile', 0.99)
+        self.multiplier = config.get('multiplier', 3.0)
+        self.min_samples = config.get('min_samples', 20)
+        self.failure_threshold = config.get('failure_threshold', 5)
+        self.reset_timeout = config.get('reset_timeout', 5.0)
+        self.stale_market_ttl = config.get('stale_market_ttl', 30.0)
+
+        self._latency: Dict[str, LatencyTracker] = {}
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._market_cache: Dict[Tuple, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+
+    def _breaker(self, key: str) -> CircuitBreaker:
+        breaker = self._breakers.get(key)
+        if breaker is None:
+            breaker = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._breakers[key] = breaker
+        return breaker
+
+    def timeout_for(self, method: str, endpoint: str) -> float:
+        """Timeout (detik) = p99 latency x multiplier, di-clamp ke budget read/order"""
+        budget = self.timeouts[budget_for(method, endpoint)]
+        with self._lock:
+            tracker = self._latency.get(endpoint_class(method, endpoint))
+            if tracker is None or len(tracker.samples) < self.min_samples:
+                return budget['default']
+            observed = tracker.percentile(self.percentile)
+        return min(budget['max'], max(budget['min'], observed * self.multiplier))
+
+    def allow(self, method: str, endpoint: str) -> bool:
+        with self._lock:
+            return self._breaker(endpoint_class(method, endpoint)).allow(time.monotonic())
+
+    def release(self, method: str, endpoint: str):
+        """Wajib dipanggil (try/finally) setelah allow(); no-op jika hasil sudah dicatat"""
+        with self._lock:
+            self._breaker(endpoint_class(method, endpoint)).release()
+
+    def record_success(self, method: str, endpoint: str, seconds: float):
+        key = endpoint_class(method, endpoint)
+        with self._lock:
+            tracker = self._latency.get(key)
+            if tracker is None:
+                tracker = self._latency[key] = LatencyTracker()
+            tracker.add(seconds)
+            self._breaker(key).record_success()
+
+    def record_failure(self, method: str, endpoint: str):
+        key = endpoint_class(method, endpoint)
+        with self._lock:
+            breaker = self._breaker(key)
+            was_open = breaker.state == STATE_OPEN
+            breaker.record_failure(time.monotonic())
+            opened = breaker.state == STATE_OPEN and not was_open
+        if opened:
+            print(f"⚡ Circuit OPEN: {key} ({breaker.failures} failures, retry in {self.reset_timeout:.0f}s)")
+
+    # ------------------------------------------------------------------ market data fallback
+
+    @staticmethod
+    def _market_key(endpoint: str, params: Dict) -> Optional[Tuple]:
+        if not endpoint.startswith('/v5/market/'):
+            return None
+        return (endpoint, tuple(sorted((str(k), str(v)) for k, v in (params or {}).items())))
+
+    def remember(self, endpoint: str, params: Dict, response: Dict):
+        """Simpan respon market data sukses terakhir untuk fallback saat circuit open"""
+        key = self._market_key(endpoint, params)
+        if key is not None and response.get('retCode') == 0:
+            with self._lock:
+                self._market_cache[key] = (time.monotonic(), response)
+
+    def fallback(self, method: str, endpoint: str, params: Dict) -> Dict:
+        """Respon saat circuit open: market data terakhir (ditandai stale) atau error fail-fast"""
+        key = self._market_key(endpoint, params)
+        if key is not None:
+            with self._lock:
+                cached = self._market_cache.get(key)
+            if cached is not None and time.monotonic() - cached[0] <= self.stale_market_ttl:
+                return {**cached[1], 'stale': True}
+        return {
+            'retCode': CIRCUIT_OPEN_RET_CODE,
+            'retMsg': f'Circuit open: {endpoint_class(method, endpoint)} failing, request not sent',
+            'circuit_open': True
+        }
+
+    def get_status(self) -> Dict:
+        with self._lock:
+            status = {}
+            for key in set(self._latency) | set(self._breakers):
+                tracker = self._latency.get(key)
+                breaker = self._breakers.get(key)
+                p99 = tracker.percentile(0.99) if tracker else None
+                status[key] = {
+                    'state': breaker.state if breaker else STATE_CLOSED,
+                    'failures': breaker.failures if breaker else 0,
+                    'opens': breaker.opens if breaker else 0,
+                    'samples': len(tracker.samples) if tracker else 0,
+                    'p99_ms': round(p99 * 1000, 1) if p99 is not None else None
+                }
+            return status
+
+
+_guards: Dict[str, EndpointGuard] = {}
+_guards_lock = threading.Lock()
+
+
+def get_endpoint_guard(base_url: str) -> EndpointGuard:
+    """EndpointGuard process-wide per base URL (kesehatan endpoint sama untuk semua akun)"""
+    guard = _guards.get(base_url)
+    if guard is None:
+        with _guards_lock:
+            guard = _guards.get(base_url)
+            if guard is None:
+                guard = EndpointGuard()
+                _guards[base_url] = guard
+    return guard
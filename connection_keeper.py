@@ -0,0 +1,178 @@
+"""
+🔥 SNIPER CONNECTION KEEPER - Warm-up, Keep-alive & Clock Sync
+- Warm-up koneksi (DNS + TCP + TLS) setiap akun saat startup
+- Keep-alive ringan berkala agar koneksi pool tidak idle-timeout sebelum signal masuk
+- Offset waktu server dari /v5/market/time dipakai saat signing (X-BAPI-TIMESTAMP)
+Author: Sniper AI Trading Agent
+"""
+
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+import requests
+
+from bybit_config import BybitProductionConfig
+from http_pool import get_pool_status
+
+logger = logging.getLogger(__name__)
+
+SERVER_TIME_ENDPOINT = "/v5/market/time"
+
+
+class ExchangeClock:
+    """Offset jam lokal terhadap server Bybit (ms), diukur dengan koreksi RTT"""
+
+    def __init__(self):
+        self.offset_ms = 0.0
+        self.rtt_ms: Optional[float] = None
+        self.synced_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def now_ms(self) -> int:
+        """Timestamp ms yang sudah dikoreksi ke jam server"""
+        return int(time.time() * 1000 + self.offset_ms)
+
+    @staticmethod
+    def _server_ms(payload: Dict) -> Optional[float]:
+        result = payload.get('result') or {}
+        if result.get('timeNano'):
+            return int(result['timeNano']) / 1_000_000
+        if payload.get('time'):
+            return float(payload['time'])
+        if result.get('timeSecond'):
+            return float(result['timeSecond']) * 1000
+        return None
+
+    def sync(self, session: requests.Session, base_url: str, samples: int = None) -> Dict:
+        """
+        Ukur offset beberapa kali dan ambil sampel dengan RTT terkecil
+        (offset = server_time - titik tengah request).
+        """
+        samples = samples or BybitProductionConfig.CONNECTION_CONFIG.get('clock_samples', 5)
+        best = None
+        for _ in range(samples):
+            try:
+                t0 = time.time() * 1000
+                response = session.get(f"{base_url}{SERVER_TIME_ENDPOINT}", timeout=5)
+                t1 = time.time() * 1000
+                server_ms = self._server_ms(response.json())
+            except (requests.exceptions.RequestException, ValueError) as e:
+                logger.warning(f"⚠️ Clock sync sample failed: {e}")
+                continue
+            if server_ms is None:
+                continue
+            rtt = t1 - t0
+            if best is None or rtt < best[0]:
+                best = (rtt, server_ms - (t0 + t1) / 2)
+        return self.apply(best)
+
+    def apply(self, best: Optional[tuple]) -> Dict:
+        """Pakai sampel (rtt_ms, offset_ms) terbaik; dipakai sync() dan client async"""
+        if best is None:
+            return {'success': False, 'error': 'No valid server time sample'}
+
+        with self._lock:
+            self.rtt_ms, self.offset_ms = best
+            self.synced_at = time.time()
+        logger.info(f"🕒 Exchange clock synced: offset {self.offset_ms:+.1f}ms, rtt {self.rtt_ms:.1f}ms")
+        return {'success': True, 'offset_ms': round(self.offset_ms, 1), 'rtt_ms': round(self.rtt_ms, 1)}
+
+    def is_stale(self, max_age: float = None) -> bool:
+        max_age = max_age or BybitProductionConfig.CONNECTION_CONFIG.get('clock_sync_interval', 300)
+        return self.synced_at is None or time.time() - self.synced_at > max_age
+
+
+_clock = ExchangeClock()
+
+
+def get_exchange_clock() -> ExchangeClock:
+    """Clock process-wide (jam server sama untuk semua akun)"""
+    return _clock
+
+
+class ConnectionKeeper:
+    """Warm-up + keep-alive berkala untuk semua client terdaftar"""
+
+    def __init__(self, keepalive_interval: float = None, clock_sync_interval: float = None):
+        config = BybitProductionConfig.CONNECTION_CONFIG
+        self.keepalive_interval = keepalive_interval or config.get('keepalive_interval', 30)
+        self.clock_sync_interval = clock_sync_interval or config.get('clock_sync_interval', 300)
+        self.clock = get_exchange_clock()
+        self.clients: Dict[str, object] = {}
+        self._running = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_warmup: Dict[str, Dict] = {}
+
+    def register(self, name: str, client):
+        """Daftarkan client akun untuk warm-up dan keep-alive"""
+        self.clients[name] = client
+
+    def warm_up_all(self) -> Dict[str, Dict]:
+        """Warm-up semua akun secara paralel (clock sync sekali di awal)"""
+        if not self.clients:
+            return {}
+        if self.clock.is_stale(self.clock_sync_interval):
+            first = next(iter(self.clients.values()))
+            self.clock.sync(first.session, first.base_url)
+
+        names: List[str] = list(self.clients.keys())
+        with ThreadPoolExecutor(max_workers=len(names)) as executor:
+            results = list(executor.map(lambda n: self.clients[n].warm_up(), names))
+        self.last_warmup = dict(zip(names, results))
+        for name, result in self.last_warmup.items():
+            if result.get('success'):
+                logger.info(f"🔥 {name} connection warm ({result['latency_ms']}ms)")
+            else:
+                logger.warning(f"⚠️ {name} warm-up failed: {result.get('error')}")
+        return self.last_warmup
+
+    def start(self) -> bool:
+        """Warm-up sekarang lalu jalankan keep-alive di background thread"""
+        if self._running:
+            return True
+        self.warm_up_all()
+        self._running = True
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='connection-keeper', daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        self._running = False
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.wait(self.keepalive_interval):
+            try:
+                self.warm_up_all()
+            except Exception as e:
+                logger.error(f"❌ Keep-alive error: {e}")
+
+    def get_status(self) -> Dict:
+        return {
+            'running': self._running,
+            'accounts': list(self.clients.keys()),
+            'clock_offset_ms': round(self.clock.offset_ms, 1),
+            'clock_rtt_ms': round(self.clock.rtt_ms, 1) if self.clock.rtt_ms is not None else None,
+            'clock_synced_at': self.clock.synced_at,
+            'last_warmup': self.last_warmup,
+            'http_pool': get_pool_status()
+        }
+
+
+_keeper: Optional[ConnectionKeeper] = None
+_keeper_lock = threading.Lock()
+
+
+def get_connection_keeper() -> ConnectionKeeper:
+    """ConnectionKeeper process-wide"""
+    global _keeper
+    if _keeper is None:
+        with _keeper_lock:
+            if _keeper is None:
+                _keeper = ConnectionKeeper()
+    return _keeper
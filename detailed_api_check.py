@@ -9,14 +9,21 @@ import hmac
 import hashlib
 import time
 import json
+import os
 from urllib.parse import urlencode
 from datetime import datetime
+from rate_limiter import PRIORITY_LOW, get_rate_limiter, rate_limited_response
+from metrics import observe_rate_limited, observe_request
+from pagination import iter_executions, iter_order_history
+from http_pool import get_http_session
 
 class DetailedBybitChecker:
-    def __init__(self, api_key, api_secret, testnet=False):
+    def __init__(self, api_key, api_secret, testnet=False, account_name=None):
         self.api_key = api_key
+        self.account_name = account_name or 'checker'  # Label metrics
         self.api_secret = api_secret
         self.base_url = "https://api-testnet.bybit.com" if testnet else "https://api.bybit.com"
+        self.base_url = os.environ.get('BYBIT_BASE_URL', self.base_url).rstrip('/')
         
     def _generate_signature(self, params, timestamp):
         """Generate signature for Bybit API"""
@@ -31,6 +38,12 @@ class DetailedBybitChecker:
         """Make authenticated request to Bybit API"""
         if params is None:
             params = {}
+        
+        # Checker/dashboard = prioritas rendah (kuota API key dibagi dengan webhook)
+        rate_limiter = get_rate_limiter(self.api_key)
+        if not rate_limiter.acquire('GET', endpoint, PRIORITY_LOW):
+            observe_rate_limited(self.account_name, 'GET', endpoint)
+            return rate_limited_response(endpoint)
             
         timestamp = str(int(time.time() * 1000))
         signature = self._generate_signature(params, timestamp)
@@ -48,10 +61,19 @@ class DetailedBybitChecker:
         if params:
             url += f"?{urlencode(params)}"
             
+        start = time.perf_counter()
         try:
-            response = requests.get(url, headers=headers, timeout=10)
-            return response.json()
+            response = get_http_session().get(url, headers=headers, timeout=10)
+            result = response.json()
+            observe_request(self.account_name, 'GET', endpoint, time.perf_counter() - start,
+                            ret_code=result.get('retCode'), bytes_received=len(response.content))
+            rate_limiter.update_from_headers('GET', endpoint, response.headers, result.get('retCode'))
+            return result
+        except requests.exceptions.Timeout as e:
+            observe_request(self.account_name, 'GET', endpoint, time.perf_counter() - start, timeout=True)
+            return {"error": str(e)}
         except Exception as e:
+            observe_request(self.account_name, 'GET', endpoint, time.perf_counter() - start, error=type(e).__name__)
             return {"error": str(e)}
     
     def get_detailed_wallet_balance(self):
@@ -61,8 +83,8 @@ class DetailedBybitChecker:
         return result
     
     def get_all_positions(self):
-        """Get all positions (not just ETHUSDT)"""
-        params = {"category": "linear"}
+        """Get all positions (not just ETHUSDT) - satu call settleCoin=USDT"""
+        params = {"category": "linear", "settleCoin": "USDT", "limit": 200}
         result = self._make_request("/v5/position/list", params)
         return result
     
@@ -78,6 +100,14 @@ class DetailedBybitChecker:
         result = self._make_request("/v5/execution/list", params)
         return result
     
+    def iter_order_history(self, start_time=None, end_time=None, symbol=None):
+        """Stream semua order history (semua halaman, per jendela 7 hari)"""
+        return iter_order_history(self._make_request, 'linear', symbol, start_time, end_time)
+    
+    def iter_trade_history(self, start_time=None, end_time=None, symbol=None):
+        """Stream semua execution (semua halaman, per jendela 7 hari)"""
+        return iter_executions(self._make_request, 'linear', symbol, start_time, end_time)
+    
     def run_detailed_check(self, account_name):
         """Run detailed check with comprehensive information"""
         print(f"\n{'='*80}")
@@ -216,7 +246,8 @@ def main():
             checker = DetailedBybitChecker(
                 credentials["api_key"],
                 credentials["api_secret"],
-                testnet=False
+                testnet=False,
+                account_name=account_name
             )
             results[account_name] = checker.run_detailed_check(account_name)
         except Exception as e:
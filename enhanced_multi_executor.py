@@ -14,6 +14,8 @@ from bybit_config import BybitProductionConfig
 from sniper_calculator import SniperCalculator
 from signal_conflict_manager import SignalConflictManager
 from optimized_config_66usd import OptimizedConfig66USD
+from market_data_feed import get_shared_market_feed
+from symbol_registry import get_symbol_registry
 
 logger = logging.getLogger(__name__)
 
@@ -22,14 +24,14 @@ class EnhancedMultiAccountExecutor:
     
     def __init__(self, symbol: str = 'ETHUSDT'):
         self.symbol = symbol
-        self.leverage = BybitProductionConfig.LEVERAGE
+        self.registry = get_symbol_registry()
         self.conflict_manager = SignalConflictManager()
         self.optimized_config = OptimizedConfig66USD()
         
-        # Contract specifications
-        self.qty_step = BybitProductionConfig.CONTRACT_SPECS.get(self.symbol, {}).get('qtyStep', 0.001)
-        self.min_qty = BybitProductionConfig.CONTRACT_SPECS.get(self.symbol, {}).get('minOrderQty', 0.001)
-        self.min_notional = BybitProductionConfig.CONTRACT_SPECS.get(self.symbol, {}).get('minNotionalValue', 1.0)
+        # Public websocket feed: harga untuk P&L check conflict manager dibaca dari memori
+        self.market_feed = get_shared_market_feed([symbol] + self.registry.symbols())
+        
+        # Contract spec + leverage diambil per signal dari symbol registry (self.symbol = default)
         
         logger.info(f"🚀 Enhanced Multi-Account Executor initialized for {symbol}")
         logger.info(f"⚡ Conflict management: ENABLED")
@@ -42,6 +44,7 @@ class EnhancedMultiAccountExecutor:
         successful_accounts = []
         failed_accounts = []
         conflict_resolutions = []
+        symbol = signal_data.get('symbol', self.symbol)
         
         logger.info(f"🎯 Executing enhanced signal for {len(accounts)} accounts")
         logger.info(f"📊 Signal: {signal_data.get('action')} {signal_data.get('symbol')}")
@@ -50,9 +53,12 @@ class EnhancedMultiAccountExecutor:
             try:
                 logger.info(f"🔄 Processing account: {account_name}")
                 
+                if self.market_feed is not None and client.market_feed is None:
+                    client.attach_market_feed(self.market_feed)
+                
                 # Step 1: Analyze signal conflict
                 conflict_analysis = self.conflict_manager.analyze_signal_conflict(
-                    account_name, client, signal_data, self.symbol
+                    account_name, client, signal_data, symbol
                 )
                 
                 logger.info(f"🔍 {account_name} conflict analysis: {conflict_analysis['action']} - {conflict_analysis['reason']}")
@@ -75,7 +81,7 @@ class EnhancedMultiAccountExecutor:
                 elif conflict_analysis['action'] in ['reverse', 'partial_close']:
                     # Execute conflict resolution first
                     resolution_result = self.conflict_manager.execute_conflict_resolution(
-                        account_name, client, conflict_analysis, signal_data, self.symbol
+                        account_name, client, conflict_analysis, signal_data, symbol
                     )
                     
                     logger.info(f"🔄 {account_name} conflict resolution: {resolution_result}")
@@ -149,6 +155,7 @@ class EnhancedMultiAccountExecutor:
         try:
             side = signal_data.get('action', '').upper()
             symbol = signal_data.get('symbol', self.symbol)
+            spec = self.registry.spec(symbol)
             
             # Get market data
             current_price = signal_data.get('current_price')
@@ -163,17 +170,17 @@ class EnhancedMultiAccountExecutor:
                 atr_value = client.calculate_atr(symbol)
             
             # Get account balance
-            balance_info = client.get_account_balance()
-            if not balance_info.get('success'):
+            wallet = client.get_wallet()
+            if wallet is None:
                 return {'success': False, 'account': account_name, 'error': 'Unable to get account balance'}
-            available_balance = float(balance_info.get('available_balance', 0))
+            available_balance = wallet.total_available_balance
             
             if available_balance <= 0:
                 return {'success': False, 'account': account_name, 'error': f'Insufficient balance: ${available_balance:.2f}'}
             
             # Set leverage
             try:
-                leverage_val = int(self.leverage)
+                leverage_val = int(spec.leverage)
                 _ = client._make_request('POST', '/v5/position/set-leverage', {
                     'category': 'linear',
                     'symbol': symbol,
@@ -203,13 +210,13 @@ class EnhancedMultiAccountExecutor:
             
             # Ensure minimum requirements
             notional_value = position_size * current_price
-            if notional_value < self.min_notional:
-                position_size = self.min_notional / current_price
+            if notional_value < spec.min_notional:
+                position_size = spec.min_notional / current_price
             
-            if position_size < self.min_qty:
-                position_size = self.min_qty
+            if position_size < spec.min_qty:
+                position_size = spec.min_qty
             
-            position_size = self._round_to_step(position_size)
+            position_size = spec.round_qty(position_size)
             
             # ENHANCED TP calculation with multiple levels
             tp_levels = self._calculate_enhanced_tp_levels(current_price, stop_loss, side)
@@ -221,25 +228,36 @@ class EnhancedMultiAccountExecutor:
             
             if final_risk_percentage > 6.0:  # Lower risk cap for $66 accounts
                 safe_position_size = (available_balance * 0.06) / price_diff
-                position_size = max(self.min_qty, self._round_to_step(safe_position_size))
+                position_size = max(spec.min_qty, spec.round_qty(safe_position_size))
             
             # Margin check
-            margin_required = (position_size * current_price) / self.leverage
+            margin_required = (position_size * current_price) / spec.leverage
             max_usable = available_balance * 0.8
             if margin_required > max_usable:
-                scaled_position = (max_usable * self.leverage) / current_price
-                position_size = max(self.min_qty, self._round_to_step(scaled_position))
+                scaled_position = (max_usable * spec.leverage) / current_price
+                position_size = max(spec.min_qty, spec.round_qty(scaled_position))
             
-            # Place enhanced order with optimized TP/SL
+            # Place enhanced order: SL ikut entry, TP1-TP3 sebagai ladder reduce-only (1 batch request).
+            # Ladder yang kolaps ke satu order (qty kecil) memakai primary TP di order entry.
+            ladder_levels = [
+                {'price': tp_levels[f'tp{i + 1}'], 'percentage': percentage}
+                for i, percentage in enumerate(tp_levels['percentages'])
+            ]
+            tp_ladder_orders = client.plan_tp_ladder(symbol, side, position_size, ladder_levels)
             order_result = client.place_order(
                 symbol=symbol,
                 side=side,
                 qty=position_size,
                 price=None,  # market order
                 stop_loss=stop_loss,
-                take_profit=primary_tp
+                take_profit=None if tp_ladder_orders else primary_tp
             )
             
+            tp_ladder = None
+            if order_result.get('success') and tp_ladder_orders:
+                tp_ladder = client.place_tp_ladder(symbol, side, position_size, orders=tp_ladder_orders,
+                                                   fallback_take_profit=primary_tp)
+            
             if order_result.get('success'):
                 # Calculate final metrics
                 final_risk_amount = position_size * price_diff
@@ -258,6 +276,7 @@ class EnhancedMultiAccountExecutor:
                         'stop_loss': stop_loss,
                         'take_profit': primary_tp,
                         'tp_levels': tp_levels,
+                        'tp_ladder': tp_ladder,
                         'risk_amount': final_risk_amount,
                         'risk_percentage': final_risk_percentage,
                         'potential_profit': potential_profit,
@@ -308,13 +327,6 @@ class EnhancedMultiAccountExecutor:
             'strategy': 'enhanced_multi_level'
         }
     
-    def _round_to_step(self, qty: float) -> float:
-        """Round quantity to valid step size"""
-        step = self.qty_step or 0.001
-        if step <= 0:
-            return round(qty, 4)
-        return round((qty / step)) * step
-    
     def get_conflict_stats(self, accounts: Dict[str, BybitProductionClient]) -> Dict:
         """Get conflict resolution statistics for all accounts"""
         
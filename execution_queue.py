@@ -0,0 +1,163 @@
+"""
+📥 SNIPER EXECUTION QUEUE - Antrian Eksekusi Signal In-Process
+Webhook hanya melakukan validasi murah lalu memasukkan signal ke antrian dan langsung
+membalas 202 + signal_id. Worker di background menjalankan validasi penuh (balance),
+price/ATR, trade plan dan fan-out order; hasilnya disimpan per signal_id.
+Default 1 worker: signal dieksekusi berurutan sehingga cooldown/daily limit tetap konsisten.
+Author: Sniper AI Trading Agent
+"""
+
+import logging
+import queue
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+from bybit_config import BybitProductionConfig
+
+logger = logging.getLogger(__name__)
+
+STATUS_QUEUED = 'queued'
+STATUS_PROCESSING = 'processing'
+STATUS_EXECUTED = 'executed'
+STATUS_FAILED = 'failed'
+
+
+class ExecutionQueue:
+    """
+    Antrian signal + worker thread; handler(signal_id, payload) -> {'success': ..., ...}
+    on_update(record): dipanggil setiap status berubah (misal simpan ke state store bersama)
+    """
+
+    def __init__(self, handler: Callable[[str, Dict], Dict], workers: int = None,
+                 max_pending: int = None, history: int = None,
+                 on_update: Optional[Callable[[Dict], None]] = None):
+        config = BybitProductionConfig.EXECUTION_QUEUE_CONFIG
+        self.handler = handler
+        self.on_update = on_update
+        self.workers = workers or config.get('workers', 1)
+        self.max_pending = max_pending or config.get('max_pending', 50)
+        self.history = history or config.get('history', 500)
+
+        self._queue: queue.Queue = queue.Queue(maxsize=self.max_pending)
+        self._records: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads = []
+        self._running = False
+        self.stats = {'accepted': 0, 'rejected_full': 0, 'executed': 0, 'failed': 0}
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self) -> bool:
+        """Start worker thread(s) (idempotent)"""
+        if self._running:
+            return True
+        self._running = True
+        for index in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"signal-worker-{index}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        logger.info(f"📥 Execution queue started ({self.workers} worker, max {self.max_pending} pending)")
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        """Stop worker setelah signal yang sedang berjalan selesai"""
+        self._running = False
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+
+    # ------------------------------------------------------------------ submit / query
+
+    @staticmethod
+    def new_signal_id() -> str:
+        return uuid.uuid4().hex[:16]
+
+    def submit(self, payload: Dict, signal_id: str = None) -> Optional[str]:
+        """Masukkan signal ke antrian; return signal_id, atau None jika antrian penuh"""
+        signal_id = signal_id or self.new_signal_id()
+        record = {
+            'signal_id': signal_id,
+            'status': STATUS_QUEUED,
+            'received_at': datetime.now().isoformat(),
+            'started_at': None,
+            'finished_at': None,
+            'queue_ms': None,
+            'execution_ms': None,
+            'data': payload,
+            'result': None
+        }
+        with self._lock:
+            self._records[signal_id] = record
+            while len(self._records) > self.history:
+                self._records.popitem(last=False)
+        try:
+            self._queue.put_nowait((signal_id, payload, time.perf_counter()))
+        except queue.Full:
+            with self._lock:
+                self._records.pop(signal_id, None)
+            self.stats['rejected_full'] += 1
+            return None
+        self.stats['accepted'] += 1
+        self._notify(record)
+        return signal_id
+
+    def get(self, signal_id: str) -> Optional[Dict]:
+        with self._lock:
+            record = self._records.get(signal_id)
+            return dict(record) if record is not None else None
+
+    def get_status(self) -> Dict:
+        return {
+            'running': self._running,
+            'workers': self.workers,
+            'pending': self._queue.qsize(),
+            'max_pending': self.max_pending,
+            **self.stats
+        }
+
+    # ------------------------------------------------------------------ worker
+
+    def _notify(self, record: Dict):
+        if self.on_update is None:
+            return
+        try:
+            self.on_update(dict(record))
+        except Exception as e:
+            logger.warning(f"⚠️ Signal {record.get('signal_id')} status update hook failed: {e}")
+
+    def _update(self, signal_id: str, **fields):
+        with self._lock:
+            record = self._records.get(signal_id)
+            if record is not None:
+                record.update(fields)
+                snapshot = dict(record)
+        if record is not None:
+            self._notify(snapshot)
+
+    def _worker(self):
+        while self._running:
+            item = self._queue.get()
+            if item is None:
+                break
+            signal_id, payload, enqueued_at = item
+            started = time.perf_counter()
+            self._update(signal_id, status=STATUS_PROCESSING, started_at=datetime.now().isoformat(),
+                         queue_ms=round((started - enqueued_at) * 1000, 1))
+            try:
+                result = self.handler(signal_id, payload)
+            except Exception as e:
+                logger.error(f"❌ Signal {signal_id} execution error: {e}")
+                result = {'success': False, 'error': f'Execution error: {str(e)}'}
+
+            success = bool(result.get('success'))
+            self.stats['executed' if success else 'failed'] += 1
+            self._update(signal_id, status=STATUS_EXECUTED if success else STATUS_FAILED, result=result,
+                         finished_at=datetime.now().isoformat(),
+                         execution_ms=round((time.perf_counter() - started) * 1000, 1))
+            self._queue.task_done()
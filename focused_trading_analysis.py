@@ -119,37 +119,22 @@ class FocusedTradingAnalyzer:
     def get_individual_api_data(self, api_name, credentials):
         """Get data untuk satu API saja"""
         try:
-            checker = DetailedBybitChecker(credentials["api_key"], credentials["api_secret"])
+            checker = DetailedBybitChecker(credentials["api_key"], credentials["api_secret"], account_name=api_name)
             
             # Get all data
             wallet = checker.get_detailed_wallet_balance()
             positions = checker.get_all_positions()
-            orders = checker.get_order_history()  # Get order history
-            trades = checker.get_trade_history()  # Get trade history
-            
-            # Filter trades dari 21 Oktober
-            filtered_trades = []
-            if trades.get('retCode') == 0 and trades.get('result', {}).get('list'):
-                for trade in trades['result']['list']:
-                    trade_time = datetime.fromtimestamp(int(trade['execTime']) / 1000)
-                    if trade_time >= self.start_date:
-                        filtered_trades.append(trade)
-            
-            # Filter orders dari 21 Oktober
-            filtered_orders = []
-            if orders.get('retCode') == 0 and orders.get('result', {}).get('list'):
-                for order in orders['result']['list']:
-                    order_time = datetime.fromtimestamp(int(order['updatedTime']) / 1000)
-                    if order_time >= self.start_date:
-                        filtered_orders.append(order)
+            # Stream semua halaman sejak 21 Oktober (agregat langsung, tanpa menyimpan semua row)
+            orders = self.aggregate_orders(checker.iter_order_history(start_time=self.start_date))
+            trades = self.aggregate_trades(checker.iter_trade_history(start_time=self.start_date))
             
             return {
                 'name': credentials['name'],
                 'api_name': api_name,
                 'wallet': wallet,
                 'positions': positions,
-                'orders': filtered_orders,
-                'trades': filtered_trades,
+                'orders': orders,
+                'trades': trades,
                 'status': 'Connected' if wallet.get('retCode') == 0 else 'Error'
             }
             
@@ -161,6 +146,41 @@ class FocusedTradingAnalyzer:
                 'error': str(e)
             }
     
+    @staticmethod
+    def aggregate_orders(orders):
+        """Hitung statistik order dari iterator (streaming)"""
+        stats = {'total_orders': 0, 'filled_orders': 0, 'cancelled_orders': 0}
+        for order in orders:
+            stats['total_orders'] += 1
+            if order.get('orderStatus') == 'Filled':
+                stats['filled_orders'] += 1
+            elif order.get('orderStatus') == 'Cancelled':
+                stats['cancelled_orders'] += 1
+        return stats
+    
+    @staticmethod
+    def aggregate_trades(trades, recent_count=10):
+        """Hitung statistik trade dari iterator (streaming, terbaru lebih dulu)"""
+        stats = {
+            'total_trades': 0,
+            'buy_trades': 0,
+            'sell_trades': 0,
+            'total_volume': 0,
+            'total_fees': 0,
+            'recent': []
+        }
+        for trade in trades:
+            stats['total_trades'] += 1
+            if trade.get('side') == 'Buy':
+                stats['buy_trades'] += 1
+            elif trade.get('side') == 'Sell':
+                stats['sell_trades'] += 1
+            stats['total_volume'] += float(trade.get('execValue', 0) or 0)
+            stats['total_fees'] += float(trade.get('execFee', 0) or 0)
+            if len(stats['recent']) < recent_count:
+                stats['recent'].append(trade)
+        return stats
+    
     def analyze_account_performance(self, api_data):
         """Analisis performa untuk satu akun"""
         if 'error' in api_data:
@@ -198,52 +218,34 @@ class FocusedTradingAnalyzer:
             'total_unrealized_pnl': total_unrealized_pnl
         }
         
-        # Orders analysis (dari 21 Oktober)
-        analysis['orders'] = {
-            'total_orders': len(api_data['orders']),
-            'filled_orders': len([o for o in api_data['orders'] if o.get('orderStatus') == 'Filled']),
-            'cancelled_orders': len([o for o in api_data['orders'] if o.get('orderStatus') == 'Cancelled'])
+        # Orders analysis (dari 21 Oktober, semua halaman)
+        analysis['orders'] = dict(api_data['orders'])
+        
+        # Trades analysis (dari 21 Oktober, semua halaman)
+        trades = api_data['trades']
+        total_trades = trades['total_trades']
+        analysis['trades'] = {
+            'total_trades': total_trades,
+            'buy_trades': trades['buy_trades'],
+            'sell_trades': trades['sell_trades'],
+            'total_volume': trades['total_volume'],
+            'total_fees': trades['total_fees'],
+            'avg_trade_size': trades['total_volume'] / total_trades if total_trades else 0
         }
         
-        # Trades analysis (dari 21 Oktober)
-        if api_data['trades']:
-            total_volume = sum(float(t.get('execValue', 0)) for t in api_data['trades'])
-            total_fees = sum(float(t.get('execFee', 0)) for t in api_data['trades'])
-            buy_trades = len([t for t in api_data['trades'] if t.get('side') == 'Buy'])
-            sell_trades = len([t for t in api_data['trades'] if t.get('side') == 'Sell'])
-            
-            analysis['trades'] = {
-                'total_trades': len(api_data['trades']),
-                'buy_trades': buy_trades,
-                'sell_trades': sell_trades,
-                'total_volume': total_volume,
-                'total_fees': total_fees,
-                'avg_trade_size': total_volume / len(api_data['trades']) if api_data['trades'] else 0
-            }
-            
-            # Recent trades detail
-            analysis['recent_trades'] = []
-            for trade in api_data['trades'][:10]:  # 10 trades terbaru
-                trade_time = datetime.fromtimestamp(int(trade['execTime']) / 1000)
-                analysis['recent_trades'].append({
-                    'symbol': trade.get('symbol'),
-                    'side': trade.get('side'),
-                    'qty': float(trade.get('execQty', 0)),
-                    'price': float(trade.get('execPrice', 0)),
-                    'value': float(trade.get('execValue', 0)),
-                    'fee': float(trade.get('execFee', 0)),
-                    'time': trade_time.strftime('%Y-%m-%d %H:%M:%S')
-                })
-        else:
-            analysis['trades'] = {
-                'total_trades': 0,
-                'buy_trades': 0,
-                'sell_trades': 0,
-                'total_volume': 0,
-                'total_fees': 0,
-                'avg_trade_size': 0
-            }
-            analysis['recent_trades'] = []
+        # Recent trades detail (10 trades terbaru)
+        analysis['recent_trades'] = []
+        for trade in trades['recent']:
+            trade_time = datetime.fromtimestamp(int(trade['execTime']) / 1000)
+            analysis['recent_trades'].append({
+                'symbol': trade.get('symbol'),
+                'side': trade.get('side'),
+                'qty': float(trade.get('execQty', 0)),
+                'price': float(trade.get('execPrice', 0)),
+                'value': float(trade.get('execValue', 0)),
+                'fee': float(trade.get('execFee', 0)),
+                'time': trade_time.strftime('%Y-%m-%d %H:%M:%S')
+            })
         
         return analysis
     
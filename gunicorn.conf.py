@@ -0,0 +1,19 @@
+"""
+🦄 Gunicorn config untuk wsgi:app
+preload_app=False: thread worker, websocket dan koneksi SQLite dibuat per worker
+setelah fork (tidak boleh diwarisi dari master).
+"""
+
+import os
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5001')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+# Worker membaca WEB_CONCURRENCY untuk membagi kuota rate limiter per API key (RATE_LIMIT_CONFIG['workers'])
+os.environ['WEB_CONCURRENCY'] = str(workers)
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '4'))
+preload_app = False
+timeout = 30
+graceful_timeout = 10
+accesslog = '-'
+errorlog = '-'
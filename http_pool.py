@@ -0,0 +1,85 @@
+"""
+🔌 SNIPER HTTP POOL - Connection Pool Bersama untuk Semua Client Bybit
+Satu HTTPAdapter (urllib3 pool per host) per proses. Setiap akun tetap punya Session
+sendiri (header/cookie/signature per akun), tapi socket TLS ke api.bybit.com dipakai
+bersama: jumlah handshake dan socket tidak bertambah per akun, dan warm-up keep-alive
+ConnectionKeeper menghangatkan koneksi untuk semua caller (webhook, dashboard, checker).
+Author: Sniper AI Trading Agent
+"""
+
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from bybit_config import BybitProductionConfig
+
+
+class SharedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter yang tidak ikut ditutup oleh Session.close() (pool milik proses)"""
+
+    def close(self):
+        pass
+
+    def close_pool(self):
+        super().close()
+
+
+_adapter: Optional[SharedHTTPAdapter] = None
+_session: Optional[requests.Session] = None
+_pool_lock = threading.Lock()
+
+
+def get_http_adapter() -> SharedHTTPAdapter:
+    """Adapter process-wide; pool_maxsize koneksi keep-alive per host"""
+    global _adapter
+    if _adapter is None:
+        with _pool_lock:
+            if _adapter is None:
+                config = BybitProductionConfig.CONNECTION_CONFIG
+                _adapter = SharedHTTPAdapter(
+                    pool_connections=config.get('pool_hosts', 4),
+                    pool_maxsize=config.get('pool_maxsize', 32),
+                    max_retries=0  # Retry ditangani client (timestamp, circuit breaker)
+                )
+    return _adapter
+
+
+def create_session(headers: Dict[str, str] = None) -> requests.Session:
+    """Session baru (header/cookie sendiri) di atas connection pool bersama"""
+    session = requests.Session()
+    adapter = get_http_adapter()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    if headers:
+        session.headers.update(headers)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """Session process-wide untuk caller tanpa state per akun (dashboard, checker)"""
+    global _session
+    if _session is None:
+        session = create_session()
+        with _pool_lock:
+            if _session is None:
+                _session = session
+    return _session
+
+
+def get_pool_status() -> Dict:
+    """Koneksi per host di pool bersama"""
+    if _adapter is None:
+        return {'hosts': {}}
+    hosts = {}
+    for key in list(_adapter.poolmanager.pools.keys()):
+        pool = _adapter.poolmanager.pools.get(key)
+        if pool is None:
+            continue
+        hosts[f"{key.key_scheme}://{key.key_host}:{key.key_port}"] = {
+            'connections_opened': pool.num_connections,
+            'requests': pool.num_requests,
+            'idle': sum(1 for conn in list(pool.pool.queue) if conn is not None) if pool.pool is not None else 0
+        }
+    return {'maxsize_per_host': _adapter._pool_maxsize, 'hosts': hosts}
@@ -0,0 +1,244 @@
+"""
+📈 SNIPER INDICATOR ENGINE - Incremental Rolling Indicators
+Kline store per simbol yang meng-update Wilder ATR, EMA dan RSI secara inkremental
+(O(1) per candle). Signal handling cukup membaca nilai terakhir tanpa network call;
+kline baru diambil sebagai delta hanya saat candle baru sudah close.
+Author: Sniper AI Trading Agent
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional
+
+from bybit_config import BybitProductionConfig
+
+# Interval Bybit (menit) -> milidetik
+INTERVAL_MS = {
+    '1': 60_000, '3': 180_000, '5': 300_000, '15': 900_000, '30': 1_800_000,
+    '60': 3_600_000, '120': 7_200_000, '240': 14_400_000, 'D': 86_400_000
+}
+
+
+class IndicatorEngine:
+    """State indikator inkremental untuk satu simbol (hanya candle yang sudah close)"""
+
+    def __init__(self, atr_period: int = 14, ema_fast: int = 20, ema_slow: int = 60, rsi_period: int = 14):
+        self.atr_period = atr_period
+        self.ema_fast_period = ema_fast
+        self.ema_slow_period = ema_slow
+        self.rsi_period = rsi_period
+
+        self.last_start: Optional[int] = None
+        self.last_close: Optional[float] = None
+        self.bars = 0
+
+        # Wilder ATR
+        self.atr: Optional[float] = None
+        self._tr_seed_sum = 0.0
+        self._tr_count = 0
+
+        # EMA (seed dengan SMA)
+        self.ema_fast: Optional[float] = None
+        self.ema_slow: Optional[float] = None
+        self._close_sum_fast = 0.0
+        self._close_sum_slow = 0.0
+
+        # Wilder RSI
+        self.rsi: Optional[float] = None
+        self._avg_gain: Optional[float] = None
+        self._avg_loss: Optional[float] = None
+        self._gain_seed = 0.0
+        self._loss_seed = 0.0
+        self._change_count = 0
+
+    @staticmethod
+    def _ema_step(prev: float, value: float, period: int) -> float:
+        k = 2.0 / (period + 1)
+        return value * k + prev * (1 - k)
+
+    def update(self, start: int, high: float, low: float, close: float):
+        """Masukkan satu candle close (urut naik); candle lama/duplikat diabaikan"""
+        if self.last_start is not None and start <= self.last_start:
+            return
+
+        self.bars += 1
+
+        # --- ATR (Wilder) ---
+        if self.last_close is None:
+            true_range = high - low
+        else:
+            true_range = max(high - low, abs(high - self.last_close), abs(low - self.last_close))
+
+        if self.atr is None:
+            self._tr_seed_sum += true_range
+            self._tr_count += 1
+            if self._tr_count == self.atr_period:
+                self.atr = self._tr_seed_sum / self.atr_period
+        else:
+            self.atr = (self.atr * (self.atr_period - 1) + true_range) / self.atr_period
+
+        # --- EMA ---
+        if self.ema_fast is None:
+            self._close_sum_fast += close
+            if self.bars == self.ema_fast_period:
+                self.ema_fast = self._close_sum_fast / self.ema_fast_period
+        else:
+            self.ema_fast = self._ema_step(self.ema_fast, close, self.ema_fast_period)
+
+        if self.ema_slow is None:
+            self._close_sum_slow += close
+            if self.bars == self.ema_slow_period:
+                self.ema_slow = self._close_sum_slow / self.ema_slow_period
+        else:
+            self.ema_slow = self._ema_step(self.ema_slow, close, self.ema_slow_period)
+
+        # --- RSI (Wilder) ---
+        if self.last_close is not None:
+            change = close - self.last_close
+            gain = change if change > 0 else 0.0
+            loss = -change if change < 0 else 0.0
+
+            if self._avg_gain is None:
+                self._gain_seed += gain
+                self._loss_seed += loss
+                self._change_count += 1
+                if self._change_count == self.rsi_period:
+                    self._avg_gain = self._gain_seed / self.rsi_period
+                    self._avg_loss = self._loss_seed / self.rsi_period
+            else:
+                self._avg_gain = (self._avg_gain * (self.rsi_period - 1) + gain) / self.rsi_period
+                self._avg_loss = (self._avg_loss * (self.rsi_period - 1) + loss) / self.rsi_period
+
+            if self._avg_gain is not None:
+                if self._avg_loss == 0:
+                    self.rsi = 100.0
+                else:
+                    rs = self._avg_gain / self._avg_loss
+                    self.rsi = 100.0 - (100.0 / (1.0 + rs))
+
+        self.last_start = start
+        self.last_close = close
+
+    def snapshot(self) -> Dict:
+        """Nilai indikator terakhir"""
+        return {
+            'atr': self.atr,
+            'ema_fast': self.ema_fast,
+            'ema_slow': self.ema_slow,
+            'rsi': self.rsi,
+            'last_close': self.last_close,
+            'last_start': self.last_start,
+            'bars': self.bars
+        }
+
+
+class KlineStore:
+    """
+    Store kline per simbol dengan indikator inkremental.
+    Dipakai bersama oleh semua akun (data market bersifat publik).
+    """
+
+    def __init__(self, interval: str = '60', history: int = 200, indicators: Dict = None):
+        indicators = indicators or BybitProductionConfig.INDICATORS
+        self.interval = interval
+        self.interval_ms = INTERVAL_MS[interval]
+        self.history = history
+        self.atr_period = indicators.get('atr_period', 14)
+        self._periods = {
+            'atr_period': self.atr_period,
+            'ema_fast': indicators.get('ema_fast', 20),
+            'ema_slow': indicators.get('ema_slow', 60),
+            'rsi_period': indicators.get('rsi_period', 14)
+        }
+        self._engines: Dict[str, IndicatorEngine] = {}
+        self._lock = threading.Lock()
+
+    def _new_engine(self) -> IndicatorEngine:
+        return IndicatorEngine(**self._periods)
+
+    def _now_ms(self) -> int:
+        return int(time.time() * 1000)
+
+    def refresh_limit(self, symbol: str, now_ms: int = None) -> int:
+        """
+        Jumlah kline yang perlu diambil agar store up to date.
+        0 berarti tidak perlu network call sama sekali.
+        """
+        now_ms = now_ms or self._now_ms()
+        engine = self._engines.get(symbol)
+        if engine is None or engine.last_start is None:
+            return self.history
+
+        # Candle close terakhir yang seharusnya tersedia
+        current_start = now_ms - (now_ms % self.interval_ms)
+        latest_closed_start = current_start - self.interval_ms
+        missing = (latest_closed_start - engine.last_start) // self.interval_ms
+        if missing <= 0:
+            return 0
+        if missing >= self.history:
+            return self.history
+        # +1 untuk candle yang masih berjalan (akan diabaikan saat ingest)
+        return int(missing) + 1
+
+    def ingest(self, symbol: str, klines: List, now_ms: int = None, confirmed: bool = False) -> int:
+        """
+        Masukkan kline Bybit ([start, open, high, low, close, ...], urutan bebas).
+        Candle yang belum close dibuang kecuali confirmed=True (dari stream).
+        Candle stream hanya dipakai untuk melanjutkan history yang sudah di-seed.
+        Return jumlah candle baru yang diproses.
+        """
+        now_ms = now_ms or self._now_ms()
+        rows = []
+        for kline in klines:
+            try:
+                start = int(kline[0])
+                if not confirmed and start + self.interval_ms > now_ms:
+                    continue  # candle berjalan
+                rows.append((start, float(kline[2]), float(kline[3]), float(kline[4])))
+            except (IndexError, ValueError, TypeError):
+                continue
+        rows.sort(key=lambda row: row[0])
+
+        with self._lock:
+            engine = self._engines.get(symbol)
+            if engine is not None and engine.last_start is not None:
+                rows = [row for row in rows if row[0] > engine.last_start]
+                # Gap (candle hilang) -> seed ulang dari data baru
+                if rows and rows[0][0] - engine.last_start > self.interval_ms:
+                    if confirmed:
+                        return 0  # candle stream tidak cukup untuk seed; REST delta mengisi gap
+                    engine = None
+            elif confirmed:
+                return 0  # belum di-seed REST; satu candle stream tidak cukup untuk ATR
+            if engine is None:
+                engine = self._new_engine()
+                self._engines[symbol] = engine
+
+            before = engine.bars
+            for start, high, low, close in rows:
+                engine.update(start, high, low, close)
+            return engine.bars - before
+
+    def get_atr(self, symbol: str) -> Optional[float]:
+        """ATR Wilder terakhir (O(1), tanpa network)"""
+        engine = self._engines.get(symbol)
+        return engine.atr if engine else None
+
+    def snapshot(self, symbol: str) -> Optional[Dict]:
+        """Semua indikator terakhir untuk simbol"""
+        engine = self._engines.get(symbol)
+        return engine.snapshot() if engine else None
+
+
+_shared_store: Optional[KlineStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_kline_store() -> KlineStore:
+    """KlineStore process-wide (satu untuk semua akun/client)"""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = KlineStore()
+    return _shared_store
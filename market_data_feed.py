@@ -0,0 +1,335 @@
+"""
+📡 SNIPER MARKET DATA FEED - Bybit V5 Public WebSocket
+Subscriber background untuk tickers + kline semua simbol yang ditradingkan.
+Menyimpan last price / mark price / kline terakhir di memori sehingga price lookup
+saat signal masuk cukup membaca memori (REST hanya fallback saat feed stale).
+Author: Sniper AI Trading Agent
+"""
+
+import hashlib
+import hmac
+import json
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+from bybit_config import BybitProductionConfig
+from indicator_engine import KlineStore, get_shared_kline_store
+
+try:
+    import websocket
+    WEBSOCKET_AVAILABLE = True
+except ImportError:
+    WEBSOCKET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def build_auth_message(api_key: str, secret_key: str, expires_in_ms: int = 10000) -> Dict:
+    """op auth websocket private/trade: signature HMAC-SHA256 atas 'GET/realtime' + expires"""
+    expires = int(time.time() * 1000) + expires_in_ms
+    signature = hmac.new(
+        secret_key.encode('utf-8'),
+        f"GET/realtime{expires}".encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+    return {'op': 'auth', 'args': [api_key, expires, signature]}
+
+
+class BybitStreamConnection:
+    """
+    Koneksi websocket Bybit V5 di background thread: auto reconnect dengan backoff
+    dan heartbeat {"op": "ping"}. Subclass mengisi _on_connected dan _handle_message.
+    """
+
+    name = 'bybit-stream'
+
+    def __init__(self, url: str, ping_interval: float = 20, max_backoff: float = 30.0):
+        self.url = url
+        self.ping_interval = ping_interval
+        self.max_backoff = max_backoff
+
+        self._ws = None
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._connected = threading.Event()
+        self.reconnects = 0
+        self.messages = 0
+        self.last_message_at: Optional[float] = None
+
+    # ------------------------------------------------------------------ lifecycle
+
+    def start(self) -> bool:
+        """Start stream di background thread (idempotent)"""
+        if not WEBSOCKET_AVAILABLE:
+            logger.warning(f"⚠️ websocket-client tidak tersedia - {self.name} nonaktif (REST fallback)")
+            return False
+        if self._running:
+            return True
+        self._running = True
+        self._thread = threading.Thread(target=self._run_loop, name=self.name, daemon=True)
+        self._thread.start()
+        logger.info(f"📡 {self.name} started @ {self.url}")
+        return True
+
+    def stop(self):
+        """Stop stream dan tutup koneksi"""
+        self._running = False
+        self._connected.clear()
+        if self._ws is not None:
+            try:
+                self._ws.close()
+            except Exception:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def wait_connected(self, timeout: float = 5.0) -> bool:
+        """Tunggu sampai koneksi websocket terbuka"""
+        return self._connected.wait(timeout)
+
+    @property
+    def connected(self) -> bool:
+        return self._connected.is_set()
+
+    def _run_loop(self):
+        backoff = 1.0
+        while self._running:
+            self._ws = websocket.WebSocketApp(
+                self.url,
+                on_open=self._on_open,
+                on_message=self._on_message,
+                on_error=self._on_error,
+                on_close=self._on_close
+            )
+            opened_at = time.time()
+            try:
+                self._ws.run_forever()
+            except Exception as e:
+                logger.error(f"❌ {self.name} run error: {e}")
+            self._connected.clear()
+            self._on_disconnected()
+
+            if not self._running:
+                break
+
+            # Koneksi yang sempat stabil -> reset backoff
+            if time.time() - opened_at > 60:
+                backoff = 1.0
+            self.reconnects += 1
+            logger.warning(f"🔄 {self.name} disconnected, reconnect in {backoff:.0f}s")
+            time.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _send(self, message: Dict):
+        try:
+            self._ws.send(json.dumps(message))
+        except Exception as e:
+            logger.warning(f"⚠️ {self.name} send failed: {e}")
+
+    def _heartbeat(self, ws):
+        """Application-level ping {"op": "ping"} agar koneksi tidak diputus server"""
+        while self._running and self._ws is ws and self._connected.is_set():
+            time.sleep(self.ping_interval)
+            if self._ws is ws and self._connected.is_set():
+                self._send({'op': 'ping'})
+
+    # ------------------------------------------------------------------ callbacks
+
+    def _on_open(self, ws):
+        self._connected.set()
+        threading.Thread(target=self._heartbeat, args=(ws,), daemon=True).start()
+        self._on_connected()
+
+    def _on_error(self, ws, error):
+        logger.warning(f"⚠️ {self.name} error: {error}")
+
+    def _on_close(self, ws, status_code=None, message=None):
+        self._connected.clear()
+
+    def _on_message(self, ws, raw: str):
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            return
+
+        self.messages += 1
+        self.last_message_at = time.time()
+        self._handle_message(message)
+
+    def _on_connected(self):
+        """Hook: koneksi baru terbuka (subscribe / auth)"""
+
+    def _on_disconnected(self):
+        """Hook: koneksi terputus"""
+
+    def _handle_message(self, message: Dict):
+        """Hook: satu pesan JSON dari server"""
+
+
+class PublicMarketDataFeed(BybitStreamConnection):
+    """Public stream subscriber (tickers.{symbol} + kline.{interval}.{symbol})"""
+
+    name = 'market-data-feed'
+
+    def __init__(self, symbols: Iterable[str], url: str = None, kline_store: Optional[KlineStore] = None,
+                 kline_interval: str = None, stale_after: float = None, ping_interval: float = None,
+                 max_backoff: float = None):
+        config = BybitProductionConfig.MARKET_FEED_CONFIG
+        super().__init__(
+            url or BybitProductionConfig.get_bybit_public_ws_url(),
+            ping_interval=ping_interval if ping_interval is not None else config.get('ping_interval', 20),
+            max_backoff=max_backoff if max_backoff is not None else config.get('max_backoff', 30.0)
+        )
+        self.symbols: List[str] = list(dict.fromkeys(symbols))
+        self.kline_store = kline_store or get_shared_kline_store()
+        self.kline_interval = kline_interval or config.get('kline_interval', self.kline_store.interval)
+        self.stale_after = stale_after if stale_after is not None else config.get('stale_after', 10.0)
+
+        # State in-memory per simbol
+        self._tickers: Dict[str, Dict] = {}
+        self._ticker_updated: Dict[str, float] = {}
+        self._klines: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def add_symbols(self, symbols: Iterable[str]):
+        """Tambah simbol baru; langsung subscribe jika sudah terkoneksi"""
+        new_symbols = [s for s in symbols if s not in self.symbols]
+        if not new_symbols:
+            return
+        self.symbols.extend(new_symbols)
+        if self._connected.is_set():
+            self._subscribe(new_symbols)
+
+    def _topics(self, symbols: Iterable[str]) -> List[str]:
+        topics = []
+        for symbol in symbols:
+            topics.append(f"tickers.{symbol}")
+            topics.append(f"kline.{self.kline_interval}.{symbol}")
+        return topics
+
+    def _subscribe(self, symbols: Iterable[str]):
+        topics = self._topics(symbols)
+        # Bybit membatasi args per request; kirim per 10 topic
+        for i in range(0, len(topics), 10):
+            self._send({'op': 'subscribe', 'args': topics[i:i + 10]})
+
+    # ------------------------------------------------------------------ callbacks
+
+    def _on_connected(self):
+        logger.info(f"✅ Market feed connected ({len(self.symbols)} symbols)")
+        self._subscribe(self.symbols)
+
+    def _handle_message(self, message: Dict):
+        topic = message.get('topic')
+        if not topic:
+            if message.get('op') == 'subscribe' and not message.get('success', True):
+                logger.error(f"❌ Market feed subscribe failed: {message.get('ret_msg')}")
+            return
+
+        if topic.startswith('tickers.'):
+            self._handle_ticker(topic.split('.', 1)[1], message)
+        elif topic.startswith('kline.'):
+            self._handle_kline(topic.split('.')[-1], message.get('data', []))
+
+    def _handle_ticker(self, symbol: str, message: Dict):
+        data = message.get('data') or {}
+        with self._lock:
+            if message.get('type') == 'snapshot' or symbol not in self._tickers:
+                self._tickers[symbol] = dict(data)
+            else:
+                # Delta hanya berisi field yang berubah
+                self._tickers[symbol].update(data)
+            self._ticker_updated[symbol] = time.time()
+
+    def _handle_kline(self, symbol: str, klines: List[Dict]):
+        for kline in klines:
+            with self._lock:
+                self._klines[symbol] = dict(kline)
+            if kline.get('confirm') and str(kline.get('interval')) == self.kline_store.interval:
+                self.kline_store.ingest(symbol, [[
+                    kline['start'], kline['open'], kline['high'], kline['low'], kline['close']
+                ]], confirmed=True)
+
+    # ------------------------------------------------------------------ readers
+
+    def _ticker_value(self, symbol: str, field: str, max_age: float = None) -> Optional[float]:
+        max_age = self.stale_after if max_age is None else max_age
+        with self._lock:
+            updated = self._ticker_updated.get(symbol)
+            ticker = self._tickers.get(symbol)
+            if ticker is None or updated is None or time.time() - updated > max_age:
+                return None
+            value = ticker.get(field)
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return None
+        return value if value > 0 else None
+
+    def get_last_price(self, symbol: str, max_age: float = None) -> Optional[float]:
+        """Last traded price dari memori; None jika belum ada / stale"""
+        return self._ticker_value(symbol, 'lastPrice', max_age)
+
+    def get_mark_price(self, symbol: str, max_age: float = None) -> Optional[float]:
+        """Mark price dari memori; None jika belum ada / stale"""
+        return self._ticker_value(symbol, 'markPrice', max_age)
+
+    def get_ticker(self, symbol: str) -> Optional[Dict]:
+        """Copy ticker terakhir (tanpa cek staleness)"""
+        with self._lock:
+            ticker = self._tickers.get(symbol)
+            return dict(ticker) if ticker else None
+
+    def get_kline(self, symbol: str) -> Optional[Dict]:
+        """Kline terakhir dari stream (termasuk candle yang masih berjalan)"""
+        with self._lock:
+            kline = self._klines.get(symbol)
+            return dict(kline) if kline else None
+
+    def is_stale(self, symbol: str, max_age: float = None) -> bool:
+        max_age = self.stale_after if max_age is None else max_age
+        updated = self._ticker_updated.get(symbol)
+        return updated is None or time.time() - updated > max_age
+
+    def get_status(self) -> Dict:
+        """Status feed untuk endpoint /status"""
+        now = time.time()
+        with self._lock:
+            ticker_updated = dict(self._ticker_updated)
+        return {
+            'connected': self._connected.is_set(),
+            'url': self.url,
+            'symbols': list(self.symbols),
+            'reconnects': self.reconnects,
+            'messages': self.messages,
+            'ticker_age': {
+                symbol: round(now - updated, 3) for symbol, updated in ticker_updated.items()
+            },
+            'stale': [symbol for symbol in self.symbols if self.is_stale(symbol)]
+        }
+
+
+_shared_feed: Optional[PublicMarketDataFeed] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_market_feed(symbols: Iterable[str] = None, start: bool = True) -> Optional[PublicMarketDataFeed]:
+    """
+    Market feed process-wide (satu koneksi untuk semua akun/client).
+    Return None jika feed dinonaktifkan di config.
+    """
+    global _shared_feed
+    if not BybitProductionConfig.MARKET_FEED_CONFIG.get('enabled', True):
+        return None
+    symbols = list(symbols or [BybitProductionConfig.TARGET_SYMBOL])
+    if _shared_feed is None:
+        with _shared_lock:
+            if _shared_feed is None:
+                _shared_feed = PublicMarketDataFeed(symbols)
+    else:
+        _shared_feed.add_symbols(symbols)
+    if start:
+        _shared_feed.start()
+    return _shared_feed
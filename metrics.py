@@ -0,0 +1,191 @@
+"""
+📊 SNIPER METRICS - Prometheus Text Exposition
+Counter dan histogram ringan (stdlib, thread-safe) untuk latency, retCode, timeout
+dan byte per endpoint Bybit per akun. Di-render dalam format teks Prometheus
+untuk endpoint /metrics di webhook app dan dashboard.
+Author: Sniper AI Trading Agent
+"""
+
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+METRICS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Bucket latency (detik) - REST Bybit biasanya 20ms-500ms
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence, extra: Tuple = ()) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Counter monotonic dengan label"""
+
+    kind = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount: float = 1.0):
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labelvalues) -> float:
+        return self._values.get(tuple(str(v) for v in labelvalues), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+
+class Histogram:
+    """Histogram kumulatif dengan bucket tetap"""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series: Dict[Tuple, List] = {}  # key -> [bucket_counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues):
+        key = tuple(str(v) for v in labelvalues)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = [[0] * len(self.buckets), 0.0, 0]
+                self._series[key] = series
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][index] += 1
+                    break
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, (list(s[0]), s[1], s[2])) for key, s in self._series.items())
+        lines = []
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _format_labels(self.labelnames, key, (('le', _format_value(bound)),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Kumpulan metric yang di-render bersama"""
+
+    def __init__(self):
+        self._metrics: List = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+REQUEST_LATENCY = REGISTRY.register(Histogram(
+    'bybit_request_duration_seconds', 'Latency Bybit REST request per endpoint dan akun',
+    ('account', 'method', 'endpoint')
+))
+REQUESTS_TOTAL = REGISTRY.register(Counter(
+    'bybit_requests_total', 'Jumlah Bybit REST request per retCode',
+    ('account', 'method', 'endpoint', 'ret_code')
+))
+REQUEST_TIMEOUTS = REGISTRY.register(Counter(
+    'bybit_request_timeouts_total', 'Jumlah request Bybit yang timeout',
+    ('account', 'method', 'endpoint')
+))
+REQUEST_ERRORS = REGISTRY.register(Counter(
+    'bybit_request_errors_total', 'Jumlah error transport/HTTP request Bybit',
+    ('account', 'method', 'endpoint', 'error')
+))
+BYTES_SENT = REGISTRY.register(Counter(
+    'bybit_request_bytes_sent_total', 'Byte body/query yang dikirim ke Bybit',
+    ('account', 'endpoint')
+))
+BYTES_RECEIVED = REGISTRY.register(Counter(
+    'bybit_response_bytes_received_total', 'Byte respon yang diterima dari Bybit',
+    ('account', 'endpoint')
+))
+RATE_LIMITED = REGISTRY.register(Counter(
+    'bybit_local_rate_limited_total', 'Request yang ditahan rate limiter lokal (tidak dikirim)',
+    ('account', 'method', 'endpoint')
+))
+COALESCED = REGISTRY.register(Counter(
+    'bybit_coalesced_requests_total', 'GET yang dilayani request in-flight lain atau cache TTL (tidak dikirim)',
+    ('account', 'endpoint', 'source')
+))
+
+
+def observe_request(account: str, method: str, endpoint: str, duration: float,
+                    ret_code=None, bytes_sent: int = 0, bytes_received: int = 0,
+                    timeout: bool = False, error: Optional[str] = None):
+    """Catat satu request Bybit (dipanggil dari _make_request)"""
+    account = account or 'default'
+    method = method.upper()
+    REQUEST_LATENCY.observe(duration, account, method, endpoint)
+    if timeout:
+        REQUEST_TIMEOUTS.inc(account, method, endpoint)
+        ret_code = 'timeout'
+    elif error:
+        REQUEST_ERRORS.inc(account, method, endpoint, error)
+        ret_code = 'error'
+    REQUESTS_TOTAL.inc(account, method, endpoint, ret_code if ret_code is not None else 'unknown')
+    if bytes_sent:
+        BYTES_SENT.inc(account, endpoint, amount=bytes_sent)
+    if bytes_received:
+        BYTES_RECEIVED.inc(account, endpoint, amount=bytes_received)
+
+
+def observe_rate_limited(account: str, method: str, endpoint: str):
+    RATE_LIMITED.inc(account or 'default', method.upper(), endpoint)
+
+
+def observe_coalesced(account: str, endpoint: str, source: str):
+    COALESCED.inc(account or 'default', endpoint, source)
+
+
+def render_metrics() -> str:
+    """Semua metric dalam format teks Prometheus"""
+    return REGISTRY.render()
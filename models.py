@@ -0,0 +1,340 @@
+"""
+🧩 SNIPER MODELS - Compact Typed Models untuk Respon Bybit V5
+Model __slots__ untuk posisi, order, execution, ticker dan wallet yang di-parse SEKALI
+di boundary client (string -> float, ''/None -> default) lalu dipakai bersama oleh
+executor, conflict manager, dashboard dan monitor. JSON di-decode dengan orjson jika ada.
+Author: Sniper AI Trading Agent
+"""
+
+import json
+from typing import Dict, List, Optional, Type, TypeVar, Union
+
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+
+def loads(data: Union[bytes, str]):
+    """Decode JSON respon Bybit (orjson jika tersedia, fallback json stdlib)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def to_float(value, default: float = 0.0) -> float:
+    """String angka Bybit -> float; '', None, 'None' dan nilai rusak -> default"""
+    if value is None or value == '' or value == 'None':
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+
+def to_int(value, default: int = 0) -> int:
+    if value is None or value == '':
+        return default
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
+
+
+class BybitModel:
+    """Basis model: slots + to_dict untuk JSON/log"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__[:4])
+        return f"{type(self).__name__}({fields})"
+
+
+class Position(BybitModel):
+    """Satu entry /v5/position/list (atau topic 'position')"""
+
+    __slots__ = ('symbol', 'side', 'size', 'avg_price', 'mark_price', 'position_value',
+                 'unrealised_pnl', 'leverage', 'take_profit', 'stop_loss', 'position_idx',
+                 'updated_time')
+
+    def __init__(self, symbol: str, side: str = '', size: float = 0.0, avg_price: float = 0.0,
+                 mark_price: float = 0.0, position_value: float = 0.0, unrealised_pnl: float = 0.0,
+                 leverage: str = '1', take_profit: float = 0.0, stop_loss: float = 0.0,
+                 position_idx: int = 0, updated_time: int = 0):
+        self.symbol = symbol
+        self.side = side
+        self.size = size
+        self.avg_price = avg_price
+        self.mark_price = mark_price
+        self.position_value = position_value
+        self.unrealised_pnl = unrealised_pnl
+        self.leverage = leverage
+        self.take_profit = take_profit
+        self.stop_loss = stop_loss
+        self.position_idx = position_idx
+        self.updated_time = updated_time
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'Position':
+        return cls(
+            symbol=data.get('symbol', ''),
+            side=data.get('side') or '',
+            size=to_float(data.get('size')),
+            avg_price=to_float(data.get('avgPrice')),
+            mark_price=to_float(data.get('markPrice')),
+            position_value=to_float(data.get('positionValue')),
+            unrealised_pnl=to_float(data.get('unrealisedPnl')),
+            leverage=data.get('leverage') or '1',
+            take_profit=to_float(data.get('takeProfit')),
+            stop_loss=to_float(data.get('stopLoss')),
+            position_idx=to_int(data.get('positionIdx')),
+            updated_time=to_int(data.get('updatedTime'))
+        )
+
+    @property
+    def is_open(self) -> bool:
+        return self.size > 0
+
+    @property
+    def pnl_percentage(self) -> float:
+        """Unrealized PnL terhadap position value (%)"""
+        return self.unrealised_pnl / self.position_value * 100 if self.position_value > 0 else 0.0
+
+
+class PositionSnapshot:
+    """Semua posisi linear satu akun (satu call settleCoin=USDT), di-index per (symbol, side)"""
+
+    __slots__ = ('positions', 'fetched_at')
+
+    def __init__(self, positions: Optional[List[Position]] = None, fetched_at: float = 0.0):
+        self.positions: Dict[tuple, Position] = {}
+        self.fetched_at = fetched_at
+        for position in positions or []:
+            self.positions[(position.symbol, position.side)] = position
+
+    @classmethod
+    def from_response(cls, response: Dict, fetched_at: float = 0.0) -> Optional['PositionSnapshot']:
+        """Respon /v5/position/list -> snapshot; None jika retCode != 0"""
+        if not response or response.get('retCode') != 0:
+            return None
+        return cls(parse_list(response, Position), fetched_at)
+
+    def get(self, symbol: str, side: str = None) -> Position:
+        """Posisi symbol (side tertentu untuk hedge mode); Position flat jika tidak ada"""
+        if side is not None:
+            return self.positions.get((symbol, side)) or Position(symbol)
+        candidates = [p for (s, _), p in self.positions.items() if s == symbol]
+        if not candidates:
+            return Position(symbol)
+        return max(candidates, key=lambda p: p.size)
+
+    def open_positions(self) -> List[Position]:
+        return [p for p in self.positions.values() if p.is_open]
+
+    def symbols(self) -> List[str]:
+        return sorted({p.symbol for p in self.open_positions()})
+
+    def to_dict(self) -> Dict:
+        return {'fetched_at': self.fetched_at,
+                'positions': [p.to_dict() for p in self.open_positions()]}
+
+
+class Order(BybitModel):
+    """Satu entry /v5/order/realtime atau /v5/order/history"""
+
+    __slots__ = ('order_id', 'order_link_id', 'symbol', 'side', 'order_type', 'qty', 'price',
+                 'cum_exec_qty', 'order_status', 'reduce_only', 'created_time', 'updated_time')
+
+    def __init__(self, order_id: str, order_link_id: str = '', symbol: str = '', side: str = '',
+                 order_type: str = '', qty: float = 0.0, price: float = 0.0, cum_exec_qty: float = 0.0,
+                 order_status: str = '', reduce_only: bool = False, created_time: int = 0,
+                 updated_time: int = 0):
+        self.order_id = order_id
+        self.order_link_id = order_link_id
+        self.symbol = symbol
+        self.side = side
+        self.order_type = order_type
+        self.qty = qty
+        self.price = price
+        self.cum_exec_qty = cum_exec_qty
+        self.order_status = order_status
+        self.reduce_only = reduce_only
+        self.created_time = created_time
+        self.updated_time = updated_time
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'Order':
+        return cls(
+            order_id=data.get('orderId', ''),
+            order_link_id=data.get('orderLinkId') or '',
+            symbol=data.get('symbol', ''),
+            side=data.get('side') or '',
+            order_type=data.get('orderType') or '',
+            qty=to_float(data.get('qty')),
+            price=to_float(data.get('price')),
+            cum_exec_qty=to_float(data.get('cumExecQty')),
+            order_status=data.get('orderStatus') or '',
+            reduce_only=bool(data.get('reduceOnly')),
+            created_time=to_int(data.get('createdTime')),
+            updated_time=to_int(data.get('updatedTime'))
+        )
+
+
+class Execution(BybitModel):
+    """Satu entry /v5/execution/list (fill)"""
+
+    __slots__ = ('exec_id', 'order_id', 'symbol', 'side', 'exec_qty', 'exec_price',
+                 'exec_value', 'exec_fee', 'exec_time')
+
+    def __init__(self, exec_id: str, order_id: str = '', symbol: str = '', side: str = '',
+                 exec_qty: float = 0.0, exec_price: float = 0.0, exec_value: float = 0.0,
+                 exec_fee: float = 0.0, exec_time: int = 0):
+        self.exec_id = exec_id
+        self.order_id = order_id
+        self.symbol = symbol
+        self.side = side
+        self.exec_qty = exec_qty
+        self.exec_price = exec_price
+        self.exec_value = exec_value
+        self.exec_fee = exec_fee
+        self.exec_time = exec_time
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'Execution':
+        return cls(
+            exec_id=data.get('execId', ''),
+            order_id=data.get('orderId', ''),
+            symbol=data.get('symbol', ''),
+            side=data.get('side') or '',
+            exec_qty=to_float(data.get('execQty')),
+            exec_price=to_float(data.get('execPrice')),
+            exec_value=to_float(data.get('execValue')),
+            exec_fee=to_float(data.get('execFee')),
+            exec_time=to_int(data.get('execTime'))
+        )
+
+
+class Ticker(BybitModel):
+    """Satu entry /v5/market/tickers (atau topic tickers.{symbol})"""
+
+    __slots__ = ('symbol', 'last_price', 'mark_price', 'index_price', 'bid1_price',
+                 'ask1_price', 'funding_rate', 'volume_24h')
+
+    def __init__(self, symbol: str, last_price: float = 0.0, mark_price: float = 0.0,
+                 index_price: float = 0.0, bid1_price: float = 0.0, ask1_price: float = 0.0,
+                 funding_rate: float = 0.0, volume_24h: float = 0.0):
+        self.symbol = symbol
+        self.last_price = last_price
+        self.mark_price = mark_price
+        self.index_price = index_price
+        self.bid1_price = bid1_price
+        self.ask1_price = ask1_price
+        self.funding_rate = funding_rate
+        self.volume_24h = volume_24h
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'Ticker':
+        return cls(
+            symbol=data.get('symbol', ''),
+            last_price=to_float(data.get('lastPrice')),
+            mark_price=to_float(data.get('markPrice')),
+            index_price=to_float(data.get('indexPrice')),
+            bid1_price=to_float(data.get('bid1Price')),
+            ask1_price=to_float(data.get('ask1Price')),
+            funding_rate=to_float(data.get('fundingRate')),
+            volume_24h=to_float(data.get('volume24h'))
+        )
+
+
+class CoinBalance(BybitModel):
+    """Saldo satu coin di wallet UNIFIED"""
+
+    __slots__ = ('coin', 'equity', 'wallet_balance', 'available_to_withdraw',
+                 'unrealised_pnl', 'total_order_im')
+
+    def __init__(self, coin: str, equity: float = 0.0, wallet_balance: float = 0.0,
+                 available_to_withdraw: float = 0.0, unrealised_pnl: float = 0.0,
+                 total_order_im: float = 0.0):
+        self.coin = coin
+        self.equity = equity
+        self.wallet_balance = wallet_balance
+        self.available_to_withdraw = available_to_withdraw
+        self.unrealised_pnl = unrealised_pnl
+        self.total_order_im = total_order_im
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'CoinBalance':
+        return cls(
+            coin=data.get('coin', ''),
+            equity=to_float(data.get('equity')),
+            wallet_balance=to_float(data.get('walletBalance')),
+            available_to_withdraw=to_float(data.get('availableToWithdraw')),
+            unrealised_pnl=to_float(data.get('unrealisedPnl')),
+            total_order_im=to_float(data.get('totalOrderIM'))
+        )
+
+
+class WalletSnapshot(BybitModel):
+    """Satu akun dari /v5/account/wallet-balance (atau topic 'wallet')"""
+
+    __slots__ = ('account_type', 'total_equity', 'total_wallet_balance', 'total_available_balance',
+                 'total_margin_balance', 'total_perp_upl', 'coins')
+
+    def __init__(self, account_type: str = 'UNIFIED', total_equity: float = 0.0,
+                 total_wallet_balance: float = 0.0, total_available_balance: float = 0.0,
+                 total_margin_balance: float = 0.0, total_perp_upl: float = 0.0,
+                 coins: Optional[Dict[str, CoinBalance]] = None):
+        self.account_type = account_type
+        self.total_equity = total_equity
+        self.total_wallet_balance = total_wallet_balance
+        self.total_available_balance = total_available_balance
+        self.total_margin_balance = total_margin_balance
+        self.total_perp_upl = total_perp_upl
+        self.coins = coins or {}
+
+    @classmethod
+    def from_api(cls, data: Dict) -> 'WalletSnapshot':
+        coins = {}
+        for coin in data.get('coin') or []:
+            balance = CoinBalance.from_api(coin)
+            coins[balance.coin] = balance
+        return cls(
+            account_type=data.get('accountType') or 'UNIFIED',
+            total_equity=to_float(data.get('totalEquity')),
+            total_wallet_balance=to_float(data.get('totalWalletBalance')),
+            total_available_balance=to_float(data.get('totalAvailableBalance')),
+            total_margin_balance=to_float(data.get('totalMarginBalance')),
+            total_perp_upl=to_float(data.get('totalPerpUPL')),
+            coins=coins
+        )
+
+    def coin(self, name: str = 'USDT') -> Optional[CoinBalance]:
+        return self.coins.get(name)
+
+    def to_dict(self) -> Dict:
+        data = super().to_dict()
+        data['coins'] = {name: coin.to_dict() for name, coin in self.coins.items()}
+        return data
+
+
+ModelT = TypeVar('ModelT', bound=BybitModel)
+
+
+def parse_list(response: Dict, model: Type[ModelT]) -> List[ModelT]:
+    """response['result']['list'] -> list model; kosong jika retCode != 0"""
+    if not response or response.get('retCode') != 0:
+        return []
+    return [model.from_api(item) for item in (response.get('result') or {}).get('list') or []]
+
+
+def parse_first(response: Dict, model: Type[ModelT]) -> Optional[ModelT]:
+    """Entry pertama response['result']['list'] sebagai model (None jika kosong/gagal)"""
+    if not response or response.get('retCode') != 0:
+        return None
+    items = (response.get('result') or {}).get('list') or []
+    return model.from_api(items[0]) if items else None
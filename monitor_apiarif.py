@@ -11,6 +11,7 @@ from datetime import datetime
 from flask import Flask, render_template_string, jsonify
 from pybit.unified_trading import HTTP
 from dotenv import load_dotenv
+from models import Position, WalletSnapshot, parse_first, parse_list
 
 # Load environment variables
 load_dotenv('.env.bybit')
@@ -38,39 +39,29 @@ def get_account_data():
         # Get positions
         positions_response = session.get_positions(category="linear", symbol="ETHUSDT")
         
-        # Process wallet data
-        wallet_data = wallet_response.get('result', {}).get('list', [])
-        total_equity = 0
-        available_balance = 0
-        total_margin_balance = 0
-        
-        if wallet_data:
-            coins = wallet_data[0].get('coin', [])
-            for coin in coins:
-                if coin.get('coin') == 'USDT':
-                    total_equity = float(coin.get('equity', 0))
-                    available_balance = float(coin.get('availableToWithdraw', 0))
-                    total_margin_balance = float(coin.get('walletBalance', 0))
-                    break
+        # Process wallet data (USDT coin)
+        wallet = parse_first(wallet_response, WalletSnapshot)
+        usdt = wallet.coin('USDT') if wallet else None
+        total_equity = usdt.equity if usdt else 0
+        available_balance = usdt.available_to_withdraw if usdt else 0
+        total_margin_balance = usdt.wallet_balance if usdt else 0
         
         # Process position data
-        positions_data = positions_response.get('result', {}).get('list', [])
         open_positions = []
         total_unrealized_pnl = 0
         
-        for position in positions_data:
-            if float(position.get('size', 0)) != 0:
-                unrealized_pnl = float(position.get('unrealisedPnl', 0))
-                total_unrealized_pnl += unrealized_pnl
+        for position in parse_list(positions_response, Position):
+            if position.size != 0:
+                total_unrealized_pnl += position.unrealised_pnl
                 
                 open_positions.append({
-                    'symbol': position.get('symbol'),
-                    'side': position.get('side'),
-                    'size': float(position.get('size', 0)),
-                    'entry_price': float(position.get('avgPrice', 0)),
-                    'mark_price': float(position.get('markPrice', 0)),
-                    'unrealized_pnl': unrealized_pnl,
-                    'pnl_percentage': float(position.get('unrealisedPnl', 0)) / float(position.get('positionValue', 1)) * 100 if float(position.get('positionValue', 0)) > 0 else 0
+                    'symbol': position.symbol,
+                    'side': position.side,
+                    'size': position.size,
+                    'entry_price': position.avg_price,
+                    'mark_price': position.mark_price,
+                    'unrealized_pnl': position.unrealised_pnl,
+                    'pnl_percentage': position.pnl_percentage
                 })
         
         return {
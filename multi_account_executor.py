@@ -6,6 +6,7 @@ Author: Sniper AI Trading Agent
 
 import os
 import math
+import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import Dict, List, Optional
@@ -13,6 +14,12 @@ from typing import Dict, List, Optional
 from bybit_client import BybitProductionClient
 from bybit_config import BybitProductionConfig
 from sniper_calculator import SniperCalculator
+from private_stream import get_private_stream
+from ws_order_entry import get_order_entry
+from pretrade import PreTradeData, gather_pretrade
+from symbol_registry import get_symbol_registry
+
+LEVERAGE_NOT_MODIFIED = 110043  # retCode Bybit: leverage sudah sama
 
 class MultiAccountExecutor:
     """Executor untuk mengeksekusi sinyal ke banyak akun Bybit secara paralel"""
@@ -33,50 +40,92 @@ class MultiAccountExecutor:
             name = acc['name']
             api_key = acc['api_key']
             secret_key = acc['secret_key']
-            self.clients[name] = BybitProductionClient(api_key, secret_key, testnet=False)
+            self.clients[name] = BybitProductionClient(api_key, secret_key, testnet=False, account_name=name)
 
+        # Symbol default; contract spec + leverage/risk diambil per signal dari symbol registry
         self.symbol = BybitProductionConfig.TARGET_SYMBOL
-        self.leverage = BybitProductionConfig.LEVERAGE
-        self.qty_step = BybitProductionConfig.CONTRACT_SPECS.get(self.symbol, {}).get('qtyStep', 0.001)
-        self.min_qty = BybitProductionConfig.CONTRACT_SPECS.get(self.symbol, {}).get('minOrderQty', 0.001)
-        self.min_notional = BybitProductionConfig.CONTRACT_SPECS.get(self.symbol, {}).get('minNotionalValue', 1.0)
-
-    def _round_to_step(self, qty: float) -> float:
-        step = self.qty_step or 0.001
-        if step <= 0:
-            return round(qty, 4)
-        return round((qty / step)) * step
-
-    def _execute_for_account(self, name: str, client: BybitProductionClient, signal_data: Dict) -> Dict:
-        """Eksekusi sinyal untuk satu akun"""
+        self.registry = get_symbol_registry()
+
+        # (akun, simbol) yang leverage-nya sudah ter-set: set-leverage tidak diulang per signal
+        self._leverage_set = set()
+        self._leverage_lock = threading.Lock()
+
+    def attach_market_feed(self, feed):
+        """Pasang public market feed ke semua client akun (price lookup dari memori)"""
+        for client in self.clients.values():
+            client.attach_market_feed(feed)
+
+    def attach_private_streams(self):
+        """Start private stream mirror per akun (position/order/wallet dari memori)"""
+        for name, client in self.clients.items():
+            stream = get_private_stream(client, account_name=name)
+            if stream is not None:
+                client.attach_private_stream(stream)
+
+    def attach_order_entry(self):
+        """Start trade websocket per akun: order fan-out tanpa HTTP request per akun"""
+        for name, client in self.clients.items():
+            entry = get_order_entry(client, account_name=name)
+            if entry is not None:
+                client.attach_order_entry(entry)
+
+    def _partial_tp_levels(self, entry_price: float, stop_loss: float, side: str) -> List[Dict]:
+        """Harga ladder dari TP_SL_CONFIG['partial_tp_levels'] (kosong jika partial TP nonaktif)"""
+        tp_config = BybitProductionConfig.TP_SL_CONFIG
+        if not tp_config.get('partial_tp') or not tp_config.get('partial_tp_levels'):
+            return []
+        risk = abs(entry_price - stop_loss)
+        direction = 1 if side.upper() == 'BUY' else -1
+        return [
+            {'price': entry_price + direction * risk * level['ratio'], 'percentage': level['percentage']}
+            for level in tp_config['partial_tp_levels']
+        ]
+
+    def _ensure_leverage(self, name: str, client: BybitProductionClient, symbol: str):
+        """Set leverage simbol sekali per akun (buy & sell leverage sama)"""
+        if (name, symbol) in self._leverage_set:
+            return
+        try:
+            leverage_val = int(self.registry.spec(symbol).leverage)
+            response = client._make_request('POST', '/v5/position/set-leverage', {
+                'category': 'linear',
+                'symbol': symbol,
+                'buyLeverage': str(leverage_val),
+                'sellLeverage': str(leverage_val),
+            })
+            if response.get('retCode') in (0, LEVERAGE_NOT_MODIFIED):
+                with self._leverage_lock:
+                    self._leverage_set.add((name, symbol))
+        except Exception as _e:
+            pass  # jika gagal, lanjut dengan leverage default akun
+
+    def _execute_for_account(self, name: str, client: BybitProductionClient, signal_data: Dict,
+                             pretrade: Optional[PreTradeData] = None) -> Dict:
+        """Eksekusi sinyal untuk satu akun (price/ATR/wallet dari pretrade jika tersedia)"""
         try:
             side = signal_data.get('action', '').upper()
             symbol = signal_data.get('symbol', self.symbol)
+            spec = self.registry.spec(symbol)
+            if pretrade is not None and pretrade.symbol != symbol:
+                pretrade = None
 
             # Data pasar
-            current_price = client.get_current_price(symbol)
+            current_price = pretrade.price if pretrade is not None else client.get_current_price(symbol)
             if not current_price:
                 return {'success': False, 'account': name, 'error': 'Unable to get current price'}
 
-            atr_value = client.calculate_atr(symbol)
+            atr_value = pretrade.atr if pretrade is not None else client.calculate_atr(symbol, fallback_price=current_price)
 
             # Ambil saldo akun
-            balance_info = client.get_account_balance()
-            if not balance_info.get('success'):
+            wallet = pretrade.wallet(name) if pretrade is not None else None
+            if wallet is None:
+                wallet = client.get_wallet()
+            if wallet is None:
                 return {'success': False, 'account': name, 'error': 'Unable to get account balance'}
-            available_balance = float(balance_info.get('available_balance', 0))
-
-            # Set leverage untuk simbol (buy & sell leverage sama)
-            try:
-                leverage_val = int(BybitProductionConfig.LEVERAGE)
-                _ = client._make_request('POST', '/v5/position/set-leverage', {
-                    'category': 'linear',
-                    'symbol': symbol,
-                    'buyLeverage': str(leverage_val),
-                    'sellLeverage': str(leverage_val),
-                })
-            except Exception as _e:
-                pass  # jika gagal, lanjut dengan leverage default akun
+            available_balance = wallet.total_available_balance
+
+            # Set leverage (biasanya sudah dijalankan paralel di fan-out pre-trade)
+            self._ensure_leverage(name, client, symbol)
 
             # Calculator dengan saldo per akun
             calculator = SniperCalculator(account_balance=available_balance)
@@ -86,34 +135,34 @@ class MultiAccountExecutor:
             stop_loss = calculator.calculate_atr_stop_loss(current_price, atr_value, side, multiplier=sl_multiplier)
 
             # Position sizing per akun berdasarkan saldo (tanpa mengalikan leverage ke qty)
-            risk_amount_usd = available_balance * BybitProductionConfig.RISK_PER_TRADE
+            risk_amount_usd = available_balance * spec.risk_per_trade
             price_diff = abs(current_price - stop_loss)
             if price_diff <= 0:
                 return {'success': False, 'account': name, 'error': 'Invalid price difference'}
 
             base_position_size = risk_amount_usd / price_diff
-            max_position_size = (available_balance * BybitProductionConfig.MAX_POSITION_SIZE) / current_price
+            max_position_size = (available_balance * spec.max_position_size) / current_price
             position_size = min(base_position_size, max_position_size)
 
             # Pastikan memenuhi min notional dan min qty
             notional_value = position_size * current_price
-            if notional_value < self.min_notional:
-                position_size = self.min_notional / current_price
+            if notional_value < spec.min_notional:
+                position_size = spec.min_notional / current_price
 
-            if position_size < self.min_qty:
-                position_size = self.min_qty
+            if position_size < spec.min_qty:
+                position_size = spec.min_qty
 
             # Round ke step
-            position_size = self._round_to_step(position_size)
+            position_size = spec.round_qty(position_size)
 
             # Cek margin dan skala jika perlu (gunakan max 80% balance)
-            margin_required = (position_size * current_price) / self.leverage
+            margin_required = (position_size * current_price) / spec.leverage
             max_usable = available_balance * 0.8
             if margin_required > max_usable and current_price > 0:
                 # Skala turun sesuai margin maksimum yang bisa dipakai
-                scaled_position = (max_usable * self.leverage) / current_price
-                position_size = max(self.min_qty, self._round_to_step(scaled_position))
-                margin_required = (position_size * current_price) / self.leverage
+                scaled_position = (max_usable * spec.leverage) / current_price
+                position_size = max(spec.min_qty, spec.round_qty(scaled_position))
+                margin_required = (position_size * current_price) / spec.leverage
 
             # Hitung TP
             tp_calc = calculator.calculate_take_profit_levels(
@@ -124,6 +173,11 @@ class MultiAccountExecutor:
             )
             take_profit = tp_calc.get('take_profit_1')
 
+            # Partial TP: SL ikut order entry, TP dipasang sebagai ladder reduce-only (1 batch request).
+            # Ladder yang kolaps ke satu order (qty kecil) memakai TP tunggal calculator di order entry.
+            tp_ladder_orders = client.plan_tp_ladder(symbol, side, position_size,
+                                                     self._partial_tp_levels(current_price, stop_loss, side))
+
             # Place order
             order_result = client.place_order(
                 symbol=symbol,
@@ -131,9 +185,14 @@ class MultiAccountExecutor:
                 qty=position_size,
                 price=None,  # market order
                 stop_loss=stop_loss,
-                take_profit=take_profit
+                take_profit=None if tp_ladder_orders else take_profit
             )
 
+            tp_ladder = None
+            if order_result.get('success') and tp_ladder_orders:
+                tp_ladder = client.place_tp_ladder(symbol, side, position_size, orders=tp_ladder_orders,
+                                                   fallback_take_profit=take_profit)
+
             if order_result.get('success'):
                 return {
                     'success': True,
@@ -149,7 +208,8 @@ class MultiAccountExecutor:
                     # Informasi risiko dengan estimasi berbasis posisi aktual
                     'risk_amount': round(position_size * abs(current_price - stop_loss), 2),
                     'reward_amount': round(position_size * abs(take_profit - current_price), 2),
-                    'risk_percentage': round(((position_size * abs(current_price - stop_loss)) / available_balance) * 100, 2)
+                    'risk_percentage': round(((position_size * abs(current_price - stop_loss)) / available_balance) * 100, 2),
+                    'tp_ladder': tp_ladder
                 }
             else:
                 return {
@@ -167,10 +227,25 @@ class MultiAccountExecutor:
         except Exception as e:
             return {'success': False, 'account': name, 'error': f'Execution error: {str(e)}'}
 
-    def execute_signal(self, signal_data: Dict) -> Dict:
+    def gather_pretrade(self, symbol: str, market_client: BybitProductionClient = None) -> PreTradeData:
+        """Price/ATR + wallet semua akun + set-leverage yang belum ter-cache, paralel satu deadline"""
+        market_client = market_client or next(iter(self.clients.values()))
+        extra = {
+            f"leverage:{name}": (lambda name=name, client=client: self._ensure_leverage(name, client, symbol))
+            for name, client in self.clients.items()
+            if (name, symbol) not in self._leverage_set
+        }
+        return gather_pretrade(symbol, market_client, self.clients, extra=extra)
+
+    def execute_signal(self, signal_data: Dict, pretrade: Optional[PreTradeData] = None) -> Dict:
         """
         Menjalankan sinyal secara paralel ke semua akun yang dikonfigurasi
+        pretrade: hasil gather_pretrade (jika None dikumpulkan di sini sekali untuk semua akun)
         """
+        symbol = signal_data.get('symbol', self.symbol)
+        if pretrade is None or pretrade.symbol != symbol:
+            pretrade = self.gather_pretrade(symbol)
+
         results = []
         success_count = 0
         fail_count = 0
@@ -180,7 +255,7 @@ class MultiAccountExecutor:
             for acc in self.accounts:
                 name = acc['name']
                 client = self.clients[name]
-                futures.append(executor.submit(self._execute_for_account, name, client, signal_data))
+                futures.append(executor.submit(self._execute_for_account, name, client, signal_data, pretrade))
 
             for future in as_completed(futures):
                 res = future.result()
@@ -210,37 +285,38 @@ class MultiAccountExecutor:
             client = self.clients[account_name]
             
             # Get account balance
-            balance_info = client.get_account_balance()
-            if not balance_info.get('success'):
+            wallet = client.get_wallet()
+            if wallet is None:
                 return {'success': False, 'error': 'Unable to get account balance'}
             
             # Get position info
-            position_info = client.get_position_info(self.symbol)
+            position = client.get_position(self.symbol)
+            unrealized_pnl = position.unrealised_pnl if position is not None else 0
             
             # Format data for dashboard
             data = {
-                'total_equity': balance_info.get('total_balance', 0),
-                'available_balance': balance_info.get('available_balance', 0),
-                'used_margin': balance_info.get('used_margin', 0),
-                'initial_margin': balance_info.get('initial_margin', 0),
-                'maintenance_margin': balance_info.get('maintenance_margin', 0),
-                'margin_ratio': balance_info.get('margin_ratio', 0),
-                'unrealized_pnl': position_info.get('unrealized_pnl', 0) if position_info.get('success') else 0,
+                'total_equity': wallet.total_equity,
+                'available_balance': wallet.total_available_balance,
+                'used_margin': wallet.total_margin_balance - wallet.total_available_balance,
+                'initial_margin': 0,
+                'maintenance_margin': 0,
+                'margin_ratio': 0,
+                'unrealized_pnl': unrealized_pnl,
                 'realized_pnl': 0,  # Could be enhanced to get from trade history
-                'total_pnl': position_info.get('unrealized_pnl', 0) if position_info.get('success') else 0,
+                'total_pnl': unrealized_pnl,
                 'positions': []
             }
             
             # Add position data if exists
-            if position_info.get('success') and position_info.get('size', 0) > 0:
+            if position is not None and position.is_open:
                 data['positions'].append({
                     'symbol': self.symbol,
-                    'side': position_info.get('side', 'None'),
-                    'size': position_info.get('size', 0),
-                    'entry_price': position_info.get('entry_price', 0),
-                    'mark_price': position_info.get('mark_price', 0),
-                    'unrealized_pnl': position_info.get('unrealized_pnl', 0),
-                    'percentage': position_info.get('percentage', 0)
+                    'side': position.side,
+                    'size': position.size,
+                    'entry_price': position.avg_price,
+                    'mark_price': client.get_mark_price(self.symbol) or position.mark_price,
+                    'unrealized_pnl': position.unrealised_pnl,
+                    'percentage': position.pnl_percentage
                 })
             
             return {'success': True, 'data': data}
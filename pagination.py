@@ -0,0 +1,123 @@
+"""
+📜 SNIPER PAGINATION - Cursor Iterators untuk History Bybit V5
+Generator yang men-stream semua halaman /v5/execution/list dan /v5/order/history
+(nextPageCursor) per jendela waktu startTime/endTime maksimal 7 hari.
+Hanya satu halaman yang ada di memori, jadi analisis berbulan-bulan tetap ringan.
+Author: Sniper AI Trading Agent
+"""
+
+import time
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, Optional, Union
+
+EXECUTION_LIST_ENDPOINT = "/v5/execution/list"
+ORDER_HISTORY_ENDPOINT = "/v5/order/history"
+
+PAGE_LIMIT = 100                       # Maksimum limit per halaman Bybit
+MAX_WINDOW_MS = 7 * 24 * 60 * 60 * 1000  # Range startTime-endTime maksimal 7 hari
+
+TimeLike = Union[int, float, datetime, None]
+RequestFn = Callable[[str, Dict], Dict]
+
+
+class PaginationError(Exception):
+    """Halaman gagal diambil; iterasi dihentikan agar data tidak hilang diam-diam"""
+
+    def __init__(self, endpoint: str, ret_code, ret_msg: str):
+        super().__init__(f"{endpoint} failed (retCode {ret_code}): {ret_msg}")
+        self.endpoint = endpoint
+        self.ret_code = ret_code
+        self.ret_msg = ret_msg
+
+
+def to_ms(value: TimeLike) -> Optional[int]:
+    """datetime / detik / ms -> timestamp ms"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    value = float(value)
+    # Anggap detik jika terlalu kecil untuk ms
+    return int(value * 1000) if value < 1e11 else int(value)
+
+
+def iter_paginated(request_fn: RequestFn, endpoint: str, params: Dict = None,
+                   start_time: TimeLike = None, end_time: TimeLike = None,
+                   limit: int = PAGE_LIMIT, window_ms: int = MAX_WINDOW_MS,
+                   max_pages: int = None) -> Iterator[Dict]:
+    """
+    Stream row dari endpoint history Bybit, terbaru lebih dulu.
+
+    request_fn(endpoint, params) -> respon JSON Bybit (signed GET).
+    Rentang [start_time, end_time] dipecah per window_ms dari yang terbaru; tiap jendela
+    diikuti nextPageCursor sampai habis. Tanpa start_time = satu jendela (7 hari terakhir,
+    sama dengan default Bybit). Raise PaginationError jika ada halaman yang gagal.
+    """
+    end_ms = to_ms(end_time) or int(time.time() * 1000)
+    start_ms = to_ms(start_time)
+    if start_ms is None:
+        start_ms = end_ms - window_ms + 1
+    limit = max(1, min(int(limit), PAGE_LIMIT))
+
+    pages = 0
+    window_end = end_ms
+    while window_end >= start_ms:
+        window_start = max(start_ms, window_end - window_ms + 1)
+        cursor = None
+        while True:
+            page_params = dict(params or {})
+            page_params.update({'startTime': window_start, 'endTime': window_end, 'limit': limit})
+            if cursor:
+                page_params['cursor'] = cursor
+
+            response = request_fn(endpoint, page_params)
+            if response.get('retCode') != 0:
+                raise PaginationError(endpoint, response.get('retCode'),
+                                      response.get('retMsg') or response.get('error', 'Unknown error'))
+
+            result = response.get('result') or {}
+            rows = result.get('list') or []
+            yield from rows
+
+            pages += 1
+            if max_pages is not None and pages >= max_pages:
+                return
+            cursor = result.get('nextPageCursor')
+            if not cursor or not rows:
+                break
+        window_end = window_start - 1
+
+
+def iter_executions(request_fn: RequestFn, category: str = 'linear', symbol: str = None,
+                    start_time: TimeLike = None, end_time: TimeLike = None, **kwargs) -> Iterator[Dict]:
+    """Semua execution (fill) dalam rentang waktu"""
+    params = {'category': category}
+    if symbol:
+        params['symbol'] = symbol
+    return iter_paginated(request_fn, EXECUTION_LIST_ENDPOINT, params, start_time, end_time, **kwargs)
+
+
+def iter_order_history(request_fn: RequestFn, category: str = 'linear', symbol: str = None,
+                       start_time: TimeLike = None, end_time: TimeLike = None, **kwargs) -> Iterator[Dict]:
+    """Semua order history dalam rentang waktu"""
+    params = {'category': category}
+    if symbol:
+        params['symbol'] = symbol
+    return iter_paginated(request_fn, ORDER_HISTORY_ENDPOINT, params, start_time, end_time, **kwargs)
+
+
+def collect_response(rows: Iterable[Dict], max_rows: int = None) -> Dict:
+    """
+    Kumpulkan row iterator ke bentuk respon Bybit {'retCode': 0, 'result': {'list': [...]}}
+    untuk kode lama yang membaca response['result']['list'].
+    """
+    collected = []
+    try:
+        for row in rows:
+            collected.append(row)
+            if max_rows is not None and len(collected) >= max_rows:
+                break
+    except PaginationError as e:
+        ret_code = e.ret_code if e.ret_code is not None else -1
+        return {'retCode': ret_code, 'retMsg': e.ret_msg, 'result': {'list': collected}}
+    return {'retCode': 0, 'retMsg': 'OK', 'result': {'list': collected}}
@@ -0,0 +1,113 @@
+"""
+🚀 SNIPER PRE-TRADE FAN-OUT - Read Paralel Sebelum Order
+Price, ATR dan wallet semua akun (plus tugas persiapan seperti set-leverage) dikirim
+bersamaan dengan satu deadline bersama, lalu hasilnya diteruskan ke validasi,
+trade plan, execute_sniper_trade dan MultiAccountExecutor tanpa di-fetch ulang.
+Critical path signal -> order menjadi kira-kira satu round trip + order.
+Author: Sniper AI Trading Agent
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional
+
+from bybit_config import BybitProductionConfig
+from models import WalletSnapshot
+
+
+class PreTradeData:
+    """Hasil read pre-trade untuk satu signal (None = gagal / lewat deadline)"""
+
+    __slots__ = ('symbol', 'price', 'atr', 'wallets', 'extra', 'errors', 'elapsed_ms')
+
+    def __init__(self, symbol: str):
+        self.symbol = symbol
+        self.price: Optional[float] = None
+        self.atr: float = 0.0
+        self.wallets: Dict[str, Optional[WalletSnapshot]] = {}
+        self.extra: Dict[str, object] = {}
+        self.errors: Dict[str, str] = {}
+        self.elapsed_ms = 0.0
+
+    def wallet(self, account: str) -> Optional[WalletSnapshot]:
+        return self.wallets.get(account)
+
+    def to_dict(self) -> Dict:
+        return {
+            'symbol': self.symbol,
+            'price': self.price,
+            'atr': self.atr,
+            'wallets': {name: w.total_available_balance if w else None for name, w in self.wallets.items()},
+            'errors': self.errors,
+            'elapsed_ms': self.elapsed_ms
+        }
+
+
+_pool: Optional[ThreadPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ThreadPoolExecutor:
+    """Thread pool process-wide untuk fan-out read (tidak dibuat ulang per signal)"""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(
+                    max_workers=BybitProductionConfig.PRETRADE_CONFIG.get('max_workers', 16),
+                    thread_name_prefix='pretrade'
+                )
+    return _pool
+
+
+def gather_pretrade(symbol: str, market_client, wallet_clients: Dict[str, object],
+                    extra: Dict[str, Callable[[], object]] = None, deadline: float = None) -> PreTradeData:
+    """
+    Jalankan read pre-trade secara paralel dengan satu deadline (detik):
+    - price + ATR lewat market_client (ATR tidak memicu price call kedua)
+    - wallet tiap akun di wallet_clients {nama: client}
+    - extra {nama: callable} untuk persiapan lain (misal set-leverage)
+    Task yang lewat deadline dicatat di errors dan hasilnya None.
+    """
+    deadline = deadline if deadline is not None else BybitProductionConfig.PRETRADE_CONFIG.get('deadline', 2.0)
+    data = PreTradeData(symbol)
+    pool = _get_pool()
+    started = time.perf_counter()
+
+    futures = {
+        pool.submit(market_client.get_current_price, symbol): ('price', None),
+        pool.submit(market_client.calculate_atr, symbol, fallback_price=0.0): ('atr', None)
+    }
+    for name, client in wallet_clients.items():
+        futures[pool.submit(client.get_wallet)] = ('wallet', name)
+    for name, task in (extra or {}).items():
+        futures[pool.submit(task)] = ('extra', name)
+
+    done, pending = wait(futures, timeout=deadline)
+    for future in done:
+        kind, name = futures[future]
+        try:
+            result = future.result()
+        except Exception as e:
+            data.errors[name or kind] = str(e)
+            result = None
+        if kind == 'price':
+            data.price = result
+        elif kind == 'atr':
+            data.atr = result or 0.0
+        elif kind == 'wallet':
+            data.wallets[name] = result
+        else:
+            data.extra[name] = result
+    for future in pending:
+        kind, name = futures[future]
+        data.errors[name or kind] = f'deadline {deadline:.1f}s exceeded'
+        if kind == 'wallet':
+            data.wallets[name] = None
+
+    # Fallback ATR 0.5% dari harga yang sudah diambil (tanpa request tambahan)
+    if not data.atr and data.price:
+        data.atr = data.price * 0.005
+    data.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return data
@@ -0,0 +1,341 @@
+"""
+🔐 SNIPER PRIVATE STREAM - Bybit V5 Private WebSocket Mirror
+Mirror lokal per akun untuk position, order (termasuk TP/SL stop order), execution
+dan wallet. Getter client (get_position_info, get_open_orders, get_account_balance)
+dilayani dari memori selama mirror ter-sync; setiap reconnect melakukan resync REST.
+Author: Sniper AI Trading Agent
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional
+
+from bybit_config import BybitProductionConfig
+from bybit_client import BybitProductionClient
+from market_data_feed import BybitStreamConnection, build_auth_message
+
+logger = logging.getLogger(__name__)
+
+# Status order yang masih aktif (Untriggered = conditional / TP/SL belum trigger)
+OPEN_ORDER_STATUSES = {'New', 'PartiallyFilled', 'Untriggered'}
+
+
+def _updated_time(item: Dict) -> int:
+    try:
+        return int(item.get('updatedTime') or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+class PrivateStreamMirror(BybitStreamConnection):
+    """State mirror dari topic private position / order / execution / wallet"""
+
+    name = 'private-stream'
+    TOPICS = ['position', 'order', 'execution', 'wallet']
+
+    def __init__(self, client, account_name: str = None, url: str = None,
+                 ping_interval: float = None, max_backoff: float = None, stale_after: float = None):
+        config = BybitProductionConfig.PRIVATE_STREAM_CONFIG
+        super().__init__(
+            url or BybitProductionConfig.get_bybit_private_ws_url(),
+            ping_interval=ping_interval if ping_interval is not None else config.get('ping_interval', 20),
+            max_backoff=max_backoff if max_backoff is not None else config.get('max_backoff', 30.0)
+        )
+        self.client = client
+        self.account_name = account_name or 'default'
+        self.name = f"private-stream-{self.account_name}"
+        self.auth_expires_ms = config.get('auth_expires_ms', 10000)
+        # Pong heartbeat juga pesan: tanpa pesan selama stale_after, koneksi dianggap half-open
+        self.stale_after = stale_after if stale_after is not None else config.get('stale_after', 45.0)
+
+        self._positions: Dict[tuple, Dict] = {}
+        self._orders: Dict[str, Dict] = {}
+        self._wallets: Dict[str, Dict] = {}
+        self._executions = deque(maxlen=config.get('execution_history', 500))
+        # Order yang ditutup stream selama resync (agar snapshot REST lama tidak menghidupkannya lagi);
+        # urut waktu tutup, dipangkas per closed_order_ttl / closed_order_max
+        self._closed_orders: OrderedDict = OrderedDict()
+        self.closed_order_ttl_ms = int(config.get('closed_order_ttl', 300) * 1000)
+        self.closed_order_max = config.get('closed_order_max', 2000)
+        self._lock = threading.Lock()
+
+        self._authenticated = False
+        self._synced = threading.Event()
+        self.resyncs = 0
+        self.last_resync_at: Optional[float] = None
+
+    # ------------------------------------------------------------------ auth / subscribe
+
+    def _auth_message(self) -> Dict:
+        """op auth untuk private stream akun ini"""
+        return build_auth_message(self.client.api_key, self.client.secret_key, self.auth_expires_ms)
+
+    def _on_connected(self):
+        self._authenticated = False
+        self._synced.clear()
+        self._send(self._auth_message())
+
+    def _on_disconnected(self):
+        # Mirror tidak lagi authoritative sampai resync berikutnya
+        self._authenticated = False
+        self._synced.clear()
+
+    def is_stale(self, max_age: float = None) -> bool:
+        """True jika belum ada pesan (termasuk pong) dalam max_age detik terakhir"""
+        max_age = self.stale_after if max_age is None else max_age
+        last_message_at = self.last_message_at
+        return last_message_at is None or time.time() - last_message_at > max_age
+
+    def is_ready(self) -> bool:
+        """True jika mirror terkoneksi, ter-autentikasi, sudah resync dan tidak stale"""
+        return self.connected and self._authenticated and self._synced.is_set() and not self.is_stale()
+
+    def wait_ready(self, timeout: float = 10.0) -> bool:
+        """Tunggu sampai resync pertama selesai"""
+        return self._synced.wait(timeout) and self.is_ready()
+
+    # ------------------------------------------------------------------ resync
+
+    def _fetch_all(self, endpoint: str, params: Dict) -> Optional[List[Dict]]:
+        """REST list dengan cursor pagination"""
+        items = []
+        params = dict(params)
+        while True:
+            response = self.client._make_request('GET', endpoint, params)
+            if response.get('retCode') != 0:
+                logger.warning(f"⚠️ {self.name} resync {endpoint} failed: {response.get('retMsg')}")
+                return None
+            result = response.get('result', {})
+            items.extend(result.get('list', []))
+            cursor = result.get('nextPageCursor')
+            if not cursor:
+                return items
+            params['cursor'] = cursor
+
+    def resync(self) -> bool:
+        """Ambil snapshot REST dan gabungkan dengan update stream yang lebih baru"""
+        started_ms = int(time.time() * 1000)
+        with self._lock:
+            self._closed_orders = OrderedDict()
+
+        positions = self._fetch_all('/v5/position/list', {'category': 'linear', 'settleCoin': 'USDT', 'limit': 200})
+        orders = self._fetch_all('/v5/order/realtime', {'category': 'linear', 'settleCoin': 'USDT', 'limit': 50})
+        wallet = self.client._make_request('GET', '/v5/account/wallet-balance', {'accountType': 'UNIFIED'})
+        if positions is None or orders is None or wallet.get('retCode') != 0:
+            return False
+
+        with self._lock:
+            merged_positions = {}
+            for position in positions:
+                position = self._normalize_position(position)
+                key = self._position_key(position)
+                current = self._positions.get(key)
+                merged_positions[key] = current if current and _updated_time(current) > _updated_time(position) else position
+            # Update stream yang datang selama resync tetap dipakai
+            for key, current in self._positions.items():
+                if key not in merged_positions and _updated_time(current) >= started_ms:
+                    merged_positions[key] = current
+            self._positions = merged_positions
+
+            merged_orders = {}
+            for order in orders:
+                closed_at = self._closed_orders.get(order.get('orderId'))
+                if closed_at is not None and closed_at >= _updated_time(order):
+                    continue
+                current = self._orders.get(order.get('orderId'))
+                merged_orders[order.get('orderId')] = current if current and _updated_time(current) > _updated_time(order) else order
+            for order_id, current in self._orders.items():
+                if order_id not in merged_orders and _updated_time(current) >= started_ms:
+                    merged_orders[order_id] = current
+            self._orders = {
+                order_id: order for order_id, order in merged_orders.items()
+                if order.get('orderStatus') in OPEN_ORDER_STATUSES
+            }
+
+            for account in wallet.get('result', {}).get('list', []):
+                self._wallets[account.get('accountType', 'UNIFIED')] = account
+
+        self.resyncs += 1
+        self.last_resync_at = time.time()
+        self._synced.set()
+        logger.info(f"✅ {self.name} resynced: {len(self._positions)} positions, {len(self._orders)} open orders")
+        return True
+
+    def _resync_loop(self, ws):
+        attempt = 0
+        while self._running and self._ws is ws and self.connected and not self._synced.is_set():
+            if self.resync():
+                return
+            attempt += 1
+            time.sleep(min(2 ** attempt, self.max_backoff))
+
+    # ------------------------------------------------------------------ messages
+
+    def _handle_message(self, message: Dict):
+        op = message.get('op')
+        if op == 'auth':
+            if message.get('success'):
+                self._authenticated = True
+                logger.info(f"🔐 {self.name} authenticated")
+                self._send({'op': 'subscribe', 'args': self.TOPICS})
+                # Resync di thread terpisah agar callback websocket tidak terblokir REST
+                threading.Thread(target=self._resync_loop, args=(self._ws,), daemon=True).start()
+            else:
+                logger.error(f"❌ {self.name} auth failed: {message.get('ret_msg')}")
+            return
+        if op == 'subscribe' and not message.get('success', True):
+            logger.error(f"❌ {self.name} subscribe failed: {message.get('ret_msg')}")
+            return
+
+        topic = message.get('topic')
+        data = message.get('data') or []
+        if topic == 'position':
+            self._apply_positions(data)
+        elif topic == 'order':
+            self._apply_orders(data)
+        elif topic == 'execution':
+            with self._lock:
+                self._executions.extend(data)
+        elif topic == 'wallet':
+            with self._lock:
+                for account in data:
+                    self._wallets[account.get('accountType', 'UNIFIED')] = account
+
+    @staticmethod
+    def _normalize_position(position: Dict) -> Dict:
+        """Stream memakai entryPrice, REST memakai avgPrice"""
+        position = dict(position)
+        if not position.get('avgPrice'):
+            position['avgPrice'] = position.get('entryPrice') or '0'
+        position.setdefault('unrealisedPnl', '0')
+        return position
+
+    @staticmethod
+    def _position_key(position: Dict) -> tuple:
+        return position.get('symbol'), int(position.get('positionIdx') or 0)
+
+    def _apply_positions(self, positions: List[Dict]):
+        with self._lock:
+            for position in positions:
+                position = self._normalize_position(position)
+                key = self._position_key(position)
+                current = self._positions.get(key)
+                if current is None or _updated_time(position) >= _updated_time(current):
+                    self._positions[key] = position
+
+    def _apply_orders(self, orders: List[Dict]):
+        with self._lock:
+            for order in orders:
+                order_id = order.get('orderId')
+                current = self._orders.get(order_id)
+                if current is not None and _updated_time(order) < _updated_time(current):
+                    continue
+                if order.get('orderStatus') in OPEN_ORDER_STATUSES:
+                    self._orders[order_id] = order
+                else:
+                    # Filled / Cancelled / Deactivated / Triggered / Rejected
+                    self._orders.pop(order_id, None)
+                    self._closed_orders[order_id] = _updated_time(order)
+                    self._closed_orders.move_to_end(order_id)
+            self._prune_closed_orders()
+
+    def _prune_closed_orders(self):
+        """Buang order tertutup yang lebih tua dari closed_order_ttl (dipanggil dengan _lock)"""
+        cutoff = int(time.time() * 1000) - self.closed_order_ttl_ms
+        closed = self._closed_orders
+        while closed and (len(closed) > self.closed_order_max or next(iter(closed.values())) < cutoff):
+            closed.popitem(last=False)
+
+    # ------------------------------------------------------------------ REST-shaped readers
+
+    @staticmethod
+    def _response(items: List[Dict]) -> Dict:
+        return {'retCode': 0, 'retMsg': 'OK', 'result': {'list': items}, 'source': 'private_stream'}
+
+    def position_response(self, symbol: str = None) -> Dict:
+        """Posisi dalam format /v5/position/list (posisi terbuka di urutan depan)"""
+        with self._lock:
+            positions = [dict(p) for p in self._positions.values() if symbol is None or p.get('symbol') == symbol]
+
+        def _size(position):
+            try:
+                return float(position.get('size') or 0)
+            except ValueError:
+                return 0.0
+        positions.sort(key=lambda p: _size(p) <= 0)
+        if symbol is None:
+            positions = [p for p in positions if _size(p) > 0]
+        return self._response(positions)
+
+    def open_orders_response(self, symbol: str = None) -> Dict:
+        """Open order dalam format /v5/order/realtime (terbaru dulu)"""
+        with self._lock:
+            orders = [dict(o) for o in self._orders.values() if symbol is None or o.get('symbol') == symbol]
+        orders.sort(key=lambda o: int(o.get('createdTime') or 0), reverse=True)
+        return self._response(orders)
+
+    def wallet_response(self, account_type: str = 'UNIFIED') -> Dict:
+        """Wallet dalam format /v5/account/wallet-balance"""
+        with self._lock:
+            wallet = self._wallets.get(account_type)
+        return self._response([dict(wallet)] if wallet else [])
+
+    def get_executions(self, symbol: str = None, limit: int = 50) -> List[Dict]:
+        """Execution terbaru dari stream (terbaru dulu)"""
+        with self._lock:
+            executions = [e for e in self._executions if symbol is None or e.get('symbol') == symbol]
+        return list(reversed(executions))[:limit]
+
+    def get_status(self) -> Dict:
+        """Status mirror untuk endpoint /status"""
+        with self._lock:
+            open_positions = len([p for p in self._positions.values() if float(p.get('size') or 0) > 0])
+            open_orders = len(self._orders)
+        return {
+            'account': self.account_name,
+            'connected': self.connected,
+            'authenticated': self._authenticated,
+            'synced': self._synced.is_set(),
+            'stale': self.is_stale(),
+            'reconnects': self.reconnects,
+            'resyncs': self.resyncs,
+            'open_positions': open_positions,
+            'open_orders': open_orders
+        }
+
+
+_streams: Dict[str, PrivateStreamMirror] = {}
+_streams_lock = threading.Lock()
+
+
+def get_private_stream(client, account_name: str = None, start: bool = True) -> Optional[PrivateStreamMirror]:
+    """
+    Private stream mirror per API key (satu koneksi per akun per proses).
+    Return None jika mirror dinonaktifkan di config.
+    """
+    if not BybitProductionConfig.PRIVATE_STREAM_CONFIG.get('enabled', True):
+        return None
+    with _streams_lock:
+        stream = _streams.get(client.api_key)
+        if stream is None:
+            stream = PrivateStreamMirror(client, account_name=account_name)
+            _streams[client.api_key] = stream
+    if start:
+        stream.start()
+    return stream
+
+
+def get_private_stream_for_keys(api_key: str, secret_key: str, account_name: str = None,
+                                start: bool = True) -> Optional[PrivateStreamMirror]:
+    """Seperti get_private_stream, tapi client REST untuk resync dibuat hanya sekali per API key"""
+    if not BybitProductionConfig.PRIVATE_STREAM_CONFIG.get('enabled', True):
+        return None
+    with _streams_lock:
+        stream = _streams.get(api_key)
+    if stream is None:
+        return get_private_stream(BybitProductionClient(api_key, secret_key), account_name=account_name, start=start)
+    if start:
+        stream.start()
+    return stream
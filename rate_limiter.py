@@ -0,0 +1,222 @@
+"""
+🚦 SNIPER RATE LIMITER - Header-aware Token Bucket
+Token bucket per API key dan per endpoint class yang belajar sisa kuota dari header
+Bybit (X-Bapi-Limit, X-Bapi-Limit-Status, X-Bapi-Limit-Reset-Timestamp), ditambah
+budget per key dari RATE_LIMIT_PER_MINUTE. Call prioritas rendah (dashboard) di-pace
+lebih dulu sehingga order webhook selalu punya sisa kuota.
+Author: Sniper AI Trading Agent
+"""
+
+import threading
+import time
+from typing import Dict, Mapping, Optional
+
+from bybit_config import BybitProductionConfig
+
+PRIORITY_HIGH = 'high'      # Order / trading-stop (POST)
+PRIORITY_NORMAL = 'normal'  # Read untuk keputusan trading
+PRIORITY_LOW = 'low'        # Dashboard / monitoring
+
+# Bybit retCode untuk "too many visits"
+RATE_LIMIT_RET_CODE = 10006
+
+
+def endpoint_class(method: str, endpoint: str) -> str:
+    """Kelompokkan endpoint: 'POST /v5/order', 'GET /v5/position', ..."""
+    parts = endpoint.strip('/').split('/')
+    return f"{method.upper()} /{'/'.join(parts[:2])}"
+
+
+def infer_priority(method: str, endpoint: str) -> str:
+    """Default priority: write ke order/position = high, read = normal"""
+    if method.upper() != 'GET' and (endpoint.startswith('/v5/order') or endpoint.startswith('/v5/position')):
+        return PRIORITY_HIGH
+    return PRIORITY_NORMAL
+
+
+class TokenBucket:
+    """Token bucket sederhana; kapasitas dan sisa token bisa dikoreksi dari header exchange"""
+
+    def __init__(self, capacity: float, refill_per_second: float):
+        self.capacity = float(capacity)
+        self.refill_per_second = float(refill_per_second)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # monotonic; kuota exchange habis sampai reset
+
+    def _refill(self, now: float):
+        elapsed = now - self.updated
+        if elapsed > 0:
+            self.tokens = min(self.capacity, self.tokens + elapsed * self.refill_per_second)
+            self.updated = now
+
+    def delay(self, reserve_fraction: float, now: float) -> float:
+        """Detik yang perlu ditunggu sebelum 1 token bisa dipakai di atas reserve"""
+        self._refill(now)
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        needed = 1.0 + self.capacity * reserve_fraction
+        if self.tokens >= needed:
+            return 0.0
+        if self.refill_per_second <= 0:
+            return float('inf')
+        return (needed - self.tokens) / self.refill_per_second
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens = max(0.0, self.tokens - 1.0)
+
+    def sync(self, limit: Optional[int], remaining: Optional[int], reset_in: Optional[float], now: float):
+        """Koreksi state dari header: kuota exchange adalah sumber kebenaran"""
+        self._refill(now)
+        if limit:
+            # Window limit Bybit per endpoint = 1 detik
+            self.capacity = float(limit)
+            self.refill_per_second = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset_in:
+                self.blocked_until = now + reset_in
+
+
+class RateLimiter:
+    """Rate limiter untuk satu API key"""
+
+    def __init__(self, per_minute: int = None, config: Dict = None):
+        config = config or BybitProductionConfig.RATE_LIMIT_CONFIG
+        per_minute = per_minute or BybitProductionConfig.RATE_LIMIT_PER_MINUTE
+        self.reserve = config.get('priority_reserve', {})
+        self.max_wait = config.get('max_wait', {})
+        self.endpoint_limits = config.get('endpoint_limits', {})
+        # Multi-worker: setiap proses hanya memakai bagiannya dari kuota API key
+        self.workers = max(1, int(config.get('workers', 1)))
+
+        # Budget per key (RATE_LIMIT_PER_MINUTE); order prioritas tinggi tidak pernah ditahan budget ini
+        per_minute = per_minute / self.workers
+        self.budget = TokenBucket(per_minute, per_minute / 60.0)
+        self.buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+        self.stats = {'acquired': 0, 'waited': 0, 'rejected': 0, 'exchange_limited': 0}
+
+    def _bucket(self, key: str) -> TokenBucket:
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            limit = self.endpoint_limits.get(key, self.endpoint_limits.get('default', 10)) / self.workers
+            bucket = TokenBucket(limit, limit)
+            self.buckets[key] = bucket
+        return bucket
+
+    def try_acquire(self, method: str, endpoint: str, priority: str = None) -> float:
+        """Ambil 1 token; return 0.0 jika berhasil, selain itu detik yang disarankan untuk menunggu"""
+        priority = priority or infer_priority(method, endpoint)
+        reserve = self.reserve.get(priority, 0.0)
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._bucket(endpoint_class(method, endpoint))
+            delay = bucket.delay(reserve, now)
+            if priority != PRIORITY_HIGH:
+                delay = max(delay, self.budget.delay(reserve, now))
+            if delay > 0:
+                return delay
+            bucket.consume(now)
+            self.budget.consume(now)
+            self.stats['acquired'] += 1
+            return 0.0
+
+    def acquire(self, method: str, endpoint: str, priority: str = None) -> bool:
+        """Blocking acquire sampai max_wait prioritas tersebut; False jika harus ditolak lokal"""
+        priority = priority or infer_priority(method, endpoint)
+        deadline = time.monotonic() + self.max_wait.get(priority, 5.0)
+        waited = False
+        while True:
+            delay = self.try_acquire(method, endpoint, priority)
+            if delay == 0.0:
+                if waited:
+                    self.stats['waited'] += 1
+                return True
+            remaining = deadline - time.monotonic()
+            if delay > remaining:
+                self.stats['rejected'] += 1
+                return False
+            waited = True
+            time.sleep(delay)
+
+    def record_rejected(self):
+        """Hitung call yang ditolak lokal oleh caller non-blocking (client async)"""
+        with self._lock:
+            self.stats['rejected'] += 1
+
+    def max_wait_for(self, method: str, endpoint: str, priority: str = None) -> float:
+        return self.max_wait.get(priority or infer_priority(method, endpoint), 5.0)
+
+    def update_from_headers(self, method: str, endpoint: str, headers: Mapping, ret_code: int = None):
+        """Pelajari sisa kuota dari header respon Bybit"""
+        limit = _int_header(headers, 'X-Bapi-Limit')
+        remaining = _int_header(headers, 'X-Bapi-Limit-Status')
+        reset_ms = _int_header(headers, 'X-Bapi-Limit-Reset-Timestamp')
+        if ret_code == RATE_LIMIT_RET_CODE:
+            remaining = 0
+            self.stats['exchange_limited'] += 1
+        if limit is None and remaining is None:
+            return
+        if limit:
+            limit = max(1, limit // self.workers)  # sisa kuota (remaining) tetap angka global exchange
+        reset_in = None
+        if reset_ms:
+            reset_in = max(0.0, reset_ms / 1000.0 - time.time())
+        elif remaining == 0:
+            reset_in = 1.0
+        with self._lock:
+            self._bucket(endpoint_class(method, endpoint)).sync(limit, remaining, reset_in, time.monotonic())
+
+    def get_status(self) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            buckets = {}
+            for key, bucket in self.buckets.items():
+                bucket._refill(now)
+                buckets[key] = {'tokens': round(bucket.tokens, 2), 'capacity': bucket.capacity}
+            self.budget._refill(now)
+            return {
+                'budget_tokens': round(self.budget.tokens, 2),
+                'budget_per_minute': self.budget.capacity,
+                'workers': self.workers,
+                'buckets': buckets,
+                **self.stats
+            }
+
+
+def _int_header(headers: Mapping, name: str) -> Optional[int]:
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(name.lower())
+    try:
+        return int(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: str) -> RateLimiter:
+    """Rate limiter process-wide per API key (semua client dengan key sama berbagi kuota)"""
+    limiter = _limiters.get(api_key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(api_key)
+            if limiter is None:
+                limiter = RateLimiter()
+                _limiters[api_key] = limiter
+    return limiter
+
+
+def rate_limited_response(endpoint: str) -> Dict:
+    """Respon lokal saat call ditolak sebelum dikirim ke exchange"""
+    return {
+        'retCode': RATE_LIMIT_RET_CODE,
+        'retMsg': f'Local rate limit: {endpoint} deferred to keep quota for orders',
+        'local_rate_limit': True
+    }
@@ -0,0 +1,189 @@
+"""
+🧲 SNIPER REQUEST COALESCER - Single-flight untuk GET Bybit
+Caller yang bersamaan meminta (akun, endpoint, params) yang sama berbagi satu request
+in-flight dan hasilnya. Hasil sukses boleh di-cache sebentar (TTL per endpoint) untuk
+call prioritas rendah (dashboard/monitor), jadi banyak tab browser = satu request exchange.
+Author: Sniper AI Trading Agent
+"""
+
+import asyncio
+import threading
+import time
+import weakref
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from bybit_config import BybitProductionConfig
+from metrics import observe_coalesced
+
+
+def request_key(api_key: str, method: str, endpoint: str, params: Dict = None,
+                priority: str = None) -> Optional[Tuple]:
+    """Key single-flight; None untuk request yang tidak boleh digabung (non-GET)"""
+    if method.upper() != 'GET':
+        return None
+    items = tuple(sorted((str(k), str(v)) for k, v in (params or {}).items()))
+    return (api_key, endpoint, items, priority or '')
+
+
+def coalesce_ttl(endpoint: str, priority: str = None) -> float:
+    """TTL cache hasil: hanya untuk prioritas low (read untuk trading selalu fresh)"""
+    config = BybitProductionConfig.COALESCE_CONFIG
+    if priority != 'low':
+        return 0.0
+    ttl = config.get('ttl', {})
+    return float(ttl.get(endpoint, ttl.get('default', 0.0)))
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Single-flight + TTL cache (thread-safe) untuk client sync"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, _Call] = {}
+        self._cache: Dict[Hashable, Tuple[float, Dict]] = {}
+        self._lock = threading.Lock()
+        self.stats = {'executed': 0, 'shared': 0, 'cached': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Dict], ttl: float = 0.0,
+           account: str = None, endpoint: str = '') -> Dict:
+        """
+        Jalankan fn() sekali untuk semua caller dengan key sama.
+        Hasil dibagi apa adanya (read-only bagi caller). Hanya retCode 0 yang di-cache.
+        """
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                if cached[0] > now:
+                    self.stats['cached'] += 1
+                    observe_coalesced(account, endpoint, 'cache')
+                    return cached[1]
+                del self._cache[key]
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._inflight[key] = call
+
+        if not leader:
+            call.done.wait()
+            self.stats['shared'] += 1
+            observe_coalesced(account, endpoint, 'inflight')
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                # Di-invalidate selama in-flight (ada write) -> hasil lama tidak di-cache
+                current = self._inflight.get(key) is call
+                if current:
+                    del self._inflight[key]
+                self.stats['executed'] += 1
+                if current and ttl > 0 and call.error is None and isinstance(call.result, dict) \
+                        and call.result.get('retCode') == 0:
+                    self._cache[key] = (time.monotonic() + ttl, call.result)
+                    if len(self._cache) > 1024:
+                        self._prune(time.monotonic())
+            call.done.set()
+        return call.result
+
+    def _prune(self, now: float):
+        for key in [k for k, (expires, _) in self._cache.items() if expires <= now]:
+            del self._cache[key]
+
+    def invalidate(self, api_key: str = None):
+        """
+        Buang cache (misal setelah order) untuk satu API key atau semua. Request in-flight
+        dilepas dari key-nya: caller berikutnya memulai request baru, hasil lama tidak di-cache.
+        """
+        with self._lock:
+            for table in (self._cache, self._inflight):
+                for key in [k for k in table if api_key is None or k[0] == api_key]:
+                    del table[key]
+
+
+class AsyncSingleFlight:
+    """Versi asyncio: caller bersamaan meng-await task yang sama (per event loop)"""
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self._cache: Dict[Hashable, Tuple[float, Dict]] = {}
+        self.stats = {'executed': 0, 'shared': 0, 'cached': 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Dict]], ttl: float = 0.0,
+                 account: str = None, endpoint: str = '') -> Dict:
+        now = time.monotonic()
+        cached = self._cache.get(key)
+        if cached is not None:
+            if cached[0] > now:
+                self.stats['cached'] += 1
+                observe_coalesced(account, endpoint, 'cache')
+                return cached[1]
+            del self._cache[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.stats['shared'] += 1
+            observe_coalesced(account, endpoint, 'inflight')
+            return await asyncio.shield(task)
+
+        task = asyncio.ensure_future(fn())
+        self._inflight[key] = task
+        try:
+            result = await asyncio.shield(task)
+        finally:
+            # Di-invalidate selama in-flight (ada write) -> hasil lama tidak di-cache
+            current = self._inflight.get(key) is task
+            if current:
+                del self._inflight[key]
+            self.stats['executed'] += 1
+        if current and ttl > 0 and isinstance(result, dict) and result.get('retCode') == 0:
+            self._cache[key] = (time.monotonic() + ttl, result)
+        return result
+
+    def invalidate(self, api_key: str = None):
+        """Sama dengan SingleFlight.invalidate (cache + request in-flight)"""
+        for table in (self._cache, self._inflight):
+            for key in [k for k in table if api_key is None or k[0] == api_key]:
+                del table[key]
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+_async_single_flights: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncSingleFlight]' = \
+    weakref.WeakKeyDictionary()
+
+
+def get_async_single_flight() -> AsyncSingleFlight:
+    """AsyncSingleFlight per event loop (semua AsyncBybitProductionClient di loop yang sama berbagi)"""
+    loop = asyncio.get_running_loop()
+    single_flight = _async_single_flights.get(loop)
+    if single_flight is None:
+        single_flight = _async_single_flights[loop] = AsyncSingleFlight()
+    return single_flight
+
+
+def get_single_flight() -> SingleFlight:
+    """SingleFlight process-wide (webhook, dashboard dan executor berbagi request)"""
+    global _single_flight
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
@@ -14,6 +14,7 @@ import re
 import os
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qs
+from metrics import METRICS_CONTENT_TYPE, render_metrics
 import mimetypes
 import datetime
 
@@ -21,6 +22,9 @@ import datetime
 sys.path.append('/home/clurut/botoktober')
 try:
     from bybit_client import BybitProductionClient
+    from bybit_config import BybitProductionConfig
+    from market_data_feed import get_shared_market_feed
+    from private_stream import get_private_stream
     from dotenv import load_dotenv
     load_dotenv('/home/clurut/binance_webhook/.env')
     BYBIT_AVAILABLE = True
@@ -69,7 +73,14 @@ class SecureHTTPRequestHandler(BaseHTTPRequestHandler):
                 testnet = os.getenv('BYBIT_TESTNET', 'False').lower() == 'true'
                 
                 if api_key and secret_key:
-                    cls.bybit_client = BybitProductionClient(api_key, secret_key, testnet)
+                    cls.bybit_client = BybitProductionClient(api_key, secret_key, testnet, account_name='dashboard')
+                    cls.bybit_client.default_priority = 'low'  # Dashboard tidak boleh memakan kuota order
+                    market_feed = get_shared_market_feed()
+                    if market_feed is not None:
+                        cls.bybit_client.attach_market_feed(market_feed)
+                    private_stream = get_private_stream(cls.bybit_client)
+                    if private_stream is not None:
+                        cls.bybit_client.attach_private_stream(private_stream)
                     print(f"✅ Bybit client initialized successfully")
                     return True
                 else:
@@ -88,6 +99,8 @@ class SecureHTTPRequestHandler(BaseHTTPRequestHandler):
             self.send_login_page()
         elif path == 'logout':
             self.handle_logout()
+        elif path == 'metrics':
+            self.send_metrics()
         elif path.startswith('api/'):
             # Allow API access without authentication for dashboard AJAX calls
             # In production, you might want to add IP restrictions or other security measures
@@ -292,25 +305,23 @@ class SecureHTTPRequestHandler(BaseHTTPRequestHandler):
         """Get positions data from Bybit API"""
         try:
             if self.bybit_client:
-                # Get real positions data from Bybit API for ETHUSDT (main trading symbol)
+                # Semua posisi linear akun dalam satu request (bukan satu request per symbol)
                 positions_list = []
+                snapshot = self.bybit_client.get_positions_snapshot()
                 
-                # Check ETHUSDT position
-                eth_position = self.bybit_client.get_position_info('ETHUSDT')
-                if eth_position and eth_position.get('success') and eth_position.get('size', 0) > 0:
-                    # Get current price for ETHUSDT
-                    current_price = self.bybit_client.get_current_price('ETHUSDT')
+                for position in (snapshot.open_positions() if snapshot is not None else []):
+                    current_price = self.bybit_client.get_current_price(position.symbol)
                     
                     position_data = {
-                        'symbol': eth_position.get('symbol', 'ETHUSDT'),
-                        'side': 'Long' if eth_position.get('side') == 'Buy' else 'Short',
-                        'size': eth_position.get('size', 0),
-                        'entry_price': eth_position.get('entry_price', 0),
-                        'current_price': current_price or 0,
-                        'unrealized_pnl': eth_position.get('unrealized_pnl', 0),
-                        'unrealized_pnl_percentage': eth_position.get('percentage', 0),
-                        'stop_loss': None,  # Could be added if available in position info
-                        'take_profit': None  # Could be added if available in position info
+                        'symbol': position.symbol,
+                        'side': 'Long' if position.side == 'Buy' else 'Short',
+                        'size': position.size,
+                        'entry_price': position.avg_price,
+                        'current_price': current_price or position.mark_price,
+                        'unrealized_pnl': position.unrealised_pnl,
+                        'unrealized_pnl_percentage': position.unrealised_pnl / BybitProductionConfig.ACCOUNT_BALANCE * 100 if BybitProductionConfig.ACCOUNT_BALANCE > 0 else 0,
+                        'stop_loss': position.stop_loss or None,
+                        'take_profit': position.take_profit or None
                     }
                     positions_list.append(position_data)
                 
@@ -542,6 +553,15 @@ class SecureHTTPRequestHandler(BaseHTTPRequestHandler):
         else:
             return 'INFO'
     
+    def send_metrics(self):
+        """Prometheus metrics (text exposition format)"""
+        body = render_metrics().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', METRICS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
     def send_json_response(self, data, status_code=200):
         """Send JSON response with CORS headers"""
         json_data = json.dumps(data, indent=2)
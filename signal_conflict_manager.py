@@ -19,6 +19,8 @@ class SignalConflictManager:
         self.config = OptimizedConfig66USD()
         self.daily_reversals = {}  # Track daily reversals per account
         self.daily_reversal_limit = 3  # Max 3 reversals per day per account
+        self.reversal_count = {}  # "{account}_{date}" -> jumlah reversal
+        self.last_reversal = {}  # account -> waktu reversal terakhir
         self.last_reset_date = datetime.now().date()
         
         logger.info("🔄 Signal Conflict Manager initialized")
@@ -33,9 +35,9 @@ class SignalConflictManager:
         """
         try:
             # Get current position
-            position_info = client.get_position_info(symbol)
+            position = client.get_position(symbol)
             
-            if not position_info.get('success') or position_info.get('size', 0) == 0:
+            if position is None or not position.is_open:
                 # No position exists, execute normally
                 return {
                     'action': 'execute',
@@ -43,10 +45,10 @@ class SignalConflictManager:
                     'recommendation': 'Execute new signal normally'
                 }
             
-            current_side = position_info.get('side', '').upper()
-            current_size = position_info.get('size', 0)
-            current_pnl = position_info.get('unrealised_pnl', 0)
-            entry_price = position_info.get('entry_price', 0)
+            current_side = position.side.upper()
+            current_size = position.size
+            current_pnl = position.unrealised_pnl
+            entry_price = position.avg_price
             
             new_side = new_signal.get('action', '').upper()
             
@@ -113,7 +115,7 @@ class SignalConflictManager:
         
         # Decision based on P&L
         if pnl_pct >= 1.0:  # Profit >= 1%
-            return {
+            decision = {
                 'action': 'partial_close',
                 'reason': f'In profit {pnl_pct:.2f}% - take partial profit before reversal',
                 'recommendation': 'Close 50% position, then reverse remaining',
@@ -121,7 +123,7 @@ class SignalConflictManager:
             }
         
         elif pnl_pct >= -0.5:  # Small loss or breakeven
-            return {
+            decision = {
                 'action': 'reverse',
                 'reason': f'Small loss {pnl_pct:.2f}% - safe to reverse',
                 'recommendation': 'Close current position and open opposite',
@@ -129,7 +131,7 @@ class SignalConflictManager:
             }
         
         elif pnl_pct >= -2.0:  # Medium loss
-            return {
+            decision = {
                 'action': 'partial_close',
                 'reason': f'Medium loss {pnl_pct:.2f}% - reduce exposure',
                 'recommendation': 'Close 50% to reduce risk, keep 50%',
@@ -137,11 +139,17 @@ class SignalConflictManager:
             }
         
         else:  # Large loss > 2%
-            return {
+            decision = {
                 'action': 'ignore',
                 'reason': f'Large loss {pnl_pct:.2f}% - hold position',
                 'recommendation': 'Ignore signal - loss too large for reversal'
             }
+        
+        # Unrealised PnL (USD) dari model Position ikut dibawa ke keputusan & log
+        decision['unrealised_pnl'] = current_pnl
+        logger.info(f"🔄 {account_name} {current_side}->{new_side}: {decision['action']} "
+                    f"(PnL {pnl_pct:.2f}% / ${current_pnl:.2f})")
+        return decision
     
     def execute_conflict_resolution(self, account_name: str, client: BybitProductionClient,
                                   decision: Dict, new_signal: Dict, symbol: str = 'ETHUSDT') -> Dict:
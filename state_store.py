@@ -0,0 +1,304 @@
+"""
+💾 SNIPER STATE STORE - State Trading Persisten (SQLite WAL)
+daily_trades, daily_pnl, last trade per symbol, emergency stop dan waktu signal terakhir
+disimpan di SQLite mode WAL sehingga restart (systemd Restart=on-failure) tidak mereset
+daily limit dan cooldown. Read dilayani dari cache di memori (O(1)); cache dimuat ulang
+hanya jika proses lain commit (PRAGMA data_version). Rollover harian di UTC+7.
+Multi-worker (gunicorn): reservasi slot daily limit, claim signal (dedupe), record status
+signal dan lock per symbol dibagi semua worker lewat database dan file lock yang sama.
+Author: Sniper AI Trading Agent
+"""
+
+import fcntl
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from bybit_config import BybitProductionConfig
+from datetime_utils import now_utc7
+
+logger = logging.getLogger(__name__)
+
+# Key state
+TRADING_DAY = 'trading_day'
+DAILY_TRADES = 'daily_trades'
+DAILY_PNL = 'daily_pnl'
+LAST_TRADE_TIME = 'last_trade_time'
+EMERGENCY_STOP = 'emergency_stop'
+LAST_TRADE_PREFIX = 'last_trade:'
+LAST_SIGNAL_PREFIX = 'last_signal:'
+
+# Di-reset saat hari trading (UTC+7) berganti
+DAILY_DEFAULTS = {DAILY_TRADES: 0, DAILY_PNL: 0.0}
+
+
+def trading_day() -> str:
+    """Tanggal trading saat ini (UTC+7)"""
+    return now_utc7().date().isoformat()
+
+
+class TradingStateStore:
+    """Key-value state trading di SQLite WAL dengan cache baca di memori"""
+
+    def __init__(self, path: str = None):
+        self.path = path or BybitProductionConfig.STATE_STORE_CONFIG.get('path', 'bybit_state.db')
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+
+        started = time.perf_counter()
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None,
+                                     timeout=BybitProductionConfig.STATE_STORE_CONFIG.get('busy_timeout', 5.0))
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL, updated_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS reservations (signal_id TEXT PRIMARY KEY, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS claims (key TEXT PRIMARY KEY, signal_id TEXT NOT NULL, expires_at REAL NOT NULL);
+            CREATE TABLE IF NOT EXISTS signals (signal_id TEXT PRIMARY KEY, record TEXT NOT NULL, updated_at REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS signals_updated_at ON signals (updated_at);
+        ''')
+        self.lock_dir = os.path.join(directory, BybitProductionConfig.STATE_STORE_CONFIG.get('lock_dir', '.locks'))
+        os.makedirs(self.lock_dir, exist_ok=True)
+        self._cache: Dict[str, object] = {}
+        self._version: Optional[int] = None
+        self._reload()
+        self._rollover()
+        self.restore_ms = round((time.perf_counter() - started) * 1000, 2)
+        logger.info(f"💾 Trading state restored from {self.path} in {self.restore_ms}ms "
+                    f"(day {self._cache.get(TRADING_DAY)}, trades {self._cache.get(DAILY_TRADES, 0)})")
+
+    # ------------------------------------------------------------------ cache
+
+    def _data_version(self) -> int:
+        return self._conn.execute('PRAGMA data_version').fetchone()[0]
+
+    def _reload(self):
+        rows = self._conn.execute('SELECT key, value FROM state').fetchall()
+        self._cache = {key: json.loads(value) for key, value in rows}
+        self._version = self._data_version()
+
+    def _sync(self):
+        """Muat ulang cache hanya jika koneksi lain (worker lain) sudah commit"""
+        if self._data_version() != self._version:
+            self._reload()
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield self._conn
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def _write(self, values: Dict[str, object]):
+        now = time.time()
+        self._conn.executemany(
+            'INSERT INTO state (key, value, updated_at) VALUES (?, ?, ?) '
+            'ON CONFLICT(key) DO UPDATE SET value = excluded.value, updated_at = excluded.updated_at',
+            [(key, json.dumps(value), now) for key, value in values.items()]
+        )
+        self._cache.update(values)
+
+    def _rollover(self) -> bool:
+        """Reset counter harian jika hari trading UTC+7 sudah berganti"""
+        today = trading_day()
+        if self._cache.get(TRADING_DAY) == today:
+            return False
+        with self._transaction():
+            self._sync()
+            previous = self._cache.get(TRADING_DAY)
+            if previous == today:
+                return False
+            self._write({TRADING_DAY: today, **DAILY_DEFAULTS})
+        if previous:
+            logger.info(f"🌅 Trading day rollover {previous} -> {today}: daily counters reset")
+        return True
+
+    # ------------------------------------------------------------------ generic API
+
+    def get(self, key: str, default=None):
+        with self._lock:
+            self._sync()
+            if key in DAILY_DEFAULTS:
+                self._rollover()
+            return self._cache.get(key, default)
+
+    def set(self, key: str, value):
+        self.set_many({key: value})
+
+    def set_many(self, values: Dict[str, object]):
+        """Tulis beberapa key dalam satu transaksi"""
+        with self._transaction():
+            self._sync()  # write lock dipegang: cache sinkron sebelum ditulis
+            self._write(values)
+
+    def incr(self, key: str, amount=1, extra: Dict[str, object] = None):
+        """Tambah nilai numerik secara atomik (aman antar worker); return nilai baru"""
+        self._rollover()
+        with self._transaction():
+            self._sync()
+            value = self._cache.get(key, DAILY_DEFAULTS.get(key, 0)) + amount
+            self._write({key: value, **(extra or {})})
+        return value
+
+    # ------------------------------------------------------------------ trading state
+
+    @staticmethod
+    def _to_datetime(value) -> Optional[datetime]:
+        return datetime.fromtimestamp(value) if value else None
+
+    @property
+    def daily_trades(self) -> int:
+        return int(self.get(DAILY_TRADES, 0))
+
+    @property
+    def daily_pnl(self) -> float:
+        return float(self.get(DAILY_PNL, 0.0))
+
+    @property
+    def emergency_stop(self) -> bool:
+        return bool(self.get(EMERGENCY_STOP, False))
+
+    @property
+    def last_trade_time(self) -> Optional[datetime]:
+        return self._to_datetime(self.get(LAST_TRADE_TIME))
+
+    def last_trade_for(self, symbol: str) -> Optional[datetime]:
+        return self._to_datetime(self.get(f"{LAST_TRADE_PREFIX}{symbol}"))
+
+    def last_signal_for(self, symbol: str) -> Optional[datetime]:
+        return self._to_datetime(self.get(f"{LAST_SIGNAL_PREFIX}{symbol}"))
+
+    def record_trade(self, symbol: str, when: datetime = None) -> int:
+        """Trade tereksekusi: daily_trades + 1 dan waktu trade (global + per symbol); return daily_trades"""
+        timestamp = (when or datetime.now()).timestamp()
+        return self.incr(DAILY_TRADES, 1, extra={LAST_TRADE_TIME: timestamp, f"{LAST_TRADE_PREFIX}{symbol}": timestamp})
+
+    def record_signal(self, symbol: str, when: datetime = None):
+        """Signal diterima signal manager (cooldown signal tetap berlaku setelah restart)"""
+        self.set(f"{LAST_SIGNAL_PREFIX}{symbol}", (when or datetime.now()).timestamp())
+
+    def add_pnl(self, amount: float) -> float:
+        return self.incr(DAILY_PNL, amount)
+
+    def set_emergency_stop(self, active: bool = True):
+        self.set(EMERGENCY_STOP, bool(active))
+
+    # ------------------------------------------------------------------ multi-worker coordination
+
+    def inflight_count(self) -> int:
+        """Signal yang sedang dieksekusi (semua worker), belum tercatat di daily_trades"""
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM reservations WHERE expires_at > ?',
+                                      (time.time(),)).fetchone()[0]
+
+    def reserve_trade_slot(self, signal_id: str, daily_limit: int, ttl: float = None) -> bool:
+        """
+        Reservasi satu slot daily limit secara atomik antar worker.
+        False jika daily_trades + reservasi aktif sudah mencapai limit.
+        Reservasi kedaluwarsa sendiri (ttl) jika worker mati sebelum release.
+        """
+        ttl = ttl or BybitProductionConfig.STATE_STORE_CONFIG.get('reservation_ttl', 120)
+        self._rollover()
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM reservations WHERE expires_at <= ?', (now,))
+            self._sync()
+            active = conn.execute('SELECT COUNT(*) FROM reservations').fetchone()[0]
+            if int(self._cache.get(DAILY_TRADES, 0)) + active >= daily_limit:
+                return False
+            conn.execute('INSERT OR REPLACE INTO reservations (signal_id, expires_at) VALUES (?, ?)',
+                         (signal_id, now + ttl))
+        return True
+
+    def release_trade_slot(self, signal_id: str):
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM reservations WHERE signal_id = ?', (signal_id,))
+
+    def claim_signal(self, key: str, signal_id: str, ttl: float = None) -> Optional[str]:
+        """
+        Klaim signal (fingerprint payload) untuk satu worker selama ttl detik.
+        Return None jika berhasil di-klaim, atau signal_id pemilik jika duplikat.
+        """
+        ttl = ttl or BybitProductionConfig.STATE_STORE_CONFIG.get('dedupe_window', 10)
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM claims WHERE expires_at <= ?', (now,))
+            row = conn.execute('SELECT signal_id FROM claims WHERE key = ?', (key,)).fetchone()
+            if row:
+                return row[0]
+            conn.execute('INSERT INTO claims (key, signal_id, expires_at) VALUES (?, ?, ?)',
+                         (key, signal_id, now + ttl))
+        return None
+
+    def release_claim(self, key: str, signal_id: str):
+        """Lepas klaim signal yang tidak jadi di-enqueue (hanya jika masih milik signal_id ini)"""
+        with self._transaction() as conn:
+            conn.execute('DELETE FROM claims WHERE key = ? AND signal_id = ?', (key, signal_id))
+
+    def save_signal(self, record: Dict):
+        """Simpan status signal agar bisa di-query dari worker mana pun"""
+        now = time.time()
+        history = BybitProductionConfig.STATE_STORE_CONFIG.get('signal_history_seconds', 86400)
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO signals (signal_id, record, updated_at) VALUES (?, ?, ?) '
+                'ON CONFLICT(signal_id) DO UPDATE SET record = excluded.record, updated_at = excluded.updated_at',
+                (record['signal_id'], json.dumps(record, default=str), now)
+            )
+            conn.execute('DELETE FROM signals WHERE updated_at < ?', (now - history,))
+
+    def get_signal(self, signal_id: str) -> Optional[Dict]:
+        with self._lock:
+            row = self._conn.execute('SELECT record FROM signals WHERE signal_id = ?', (signal_id,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    @contextmanager
+    def symbol_lock(self, symbol: str):
+        """Lock eksklusif per symbol antar proses (flock; otomatis lepas jika worker mati)"""
+        path = os.path.join(self.lock_dir, f"lane-{symbol}.lock")
+        with open(path, 'a') as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def get_status(self) -> Dict:
+        return {
+            'path': self.path,
+            'trading_day': self.get(TRADING_DAY),
+            'daily_trades': self.daily_trades,
+            'daily_pnl': self.daily_pnl,
+            'emergency_stop': self.emergency_stop,
+            'inflight': self.inflight_count(),
+            'restore_ms': self.restore_ms
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[TradingStateStore] = None
+_store_lock = threading.Lock()
+
+
+def get_state_store() -> TradingStateStore:
+    """State store process-wide (satu koneksi SQLite per proses)"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = TradingStateStore()
+    return _store
@@ -0,0 +1,195 @@
+"""
+📝 SNIPER STRUCTURED LOGGING - Logging Non-Blocking via Queue
+Thread request/worker hanya memasukkan LogRecord ke antrian (QueueHandler); satu
+QueueListener di background menulis ke terminal, log teks produksi, file event JSON
+(satu objek per baris, schema tetap) dan bybit_trades.log. Tidak ada I/O disk atau
+terminal di jalur order.
+Author: Sniper AI Trading Agent
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from bybit_config import BybitProductionConfig
+
+# Schema event JSON (urutan kunci tetap): ts, level, logger, event, message, fields
+EVENT_SCHEMA = ('ts', 'level', 'logger', 'event', 'message', 'fields')
+TRADES_LOGGER = 'sniper.trades'
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+
+class JsonEventFormatter(logging.Formatter):
+    """Format LogRecord menjadi satu baris JSON dengan schema EVENT_SCHEMA"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        fields = getattr(record, 'fields', None) or {}
+        if record.exc_info and 'exception' not in fields:
+            fields = {**fields, 'exception': self.formatException(record.exc_info)}
+        event = {
+            'ts': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'event': getattr(record, 'event', None) or 'log',
+            'message': record.getMessage(),
+            'fields': fields
+        }
+        return json.dumps(event, ensure_ascii=False, default=str, separators=(',', ':'))
+
+
+class _EventOnlyFilter(logging.Filter):
+    """Hanya record yang membawa event terstruktur (log_event) yang masuk file event"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return getattr(record, 'event', None) is not None
+
+
+def log_event(logger: logging.Logger, event: str, message: str = '', level: int = logging.INFO, **fields):
+    """
+    Emit event terstruktur: teks `message` untuk terminal/log produksi, dan
+    {event, fields} untuk file event JSON. Nilai fields harus JSON-serializable.
+    """
+    if logger.isEnabledFor(level):
+        logger.log(level, message or event, extra={'event': event, 'fields': fields})
+
+
+class LoggingPipeline:
+    """QueueHandler di root logger + satu QueueListener (writer background)"""
+
+    def __init__(self, log_file: str = None, events_file: str = None, trades_file: str = None,
+                 level: str = None, console: bool = None):
+        config = BybitProductionConfig.LOGGING_CONFIG
+        self.log_file = log_file or config.get('log_file')
+        self.events_file = events_file or config.get('events_file')
+        self.trades_file = trades_file or config.get('trades_file')
+        self.level = getattr(logging, (level or config.get('level', 'INFO')).upper(), logging.INFO)
+        self.console = config.get('console', True) if console is None else console
+
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._listener: Optional[logging.handlers.QueueListener] = None
+        self._queue_handler: Optional[logging.handlers.QueueHandler] = None
+        self._trades_handler: Optional[logging.handlers.QueueHandler] = None
+
+    def _build_handlers(self):
+        """Handler tujuan; hanya dipakai oleh thread listener"""
+        text_formatter = logging.Formatter(TEXT_FORMAT)
+        handlers = []
+        if self.console:
+            console = logging.StreamHandler()
+            console.setFormatter(text_formatter)
+            handlers.append(console)
+        if self.log_file:
+            production = logging.FileHandler(self.log_file)
+            production.setFormatter(text_formatter)
+            handlers.append(production)
+        if self.events_file:
+            events = logging.FileHandler(self.events_file)
+            events.setFormatter(JsonEventFormatter())
+            events.addFilter(_EventOnlyFilter())
+            handlers.append(events)
+        return handlers
+
+    def start(self) -> bool:
+        """Pasang QueueHandler di root logger dan start writer (idempotent)"""
+        if self._listener is not None:
+            return True
+
+        handlers = self._build_handlers()
+        trades = None
+        if self.trades_file:
+            # bybit_trades.log: satu baris JSON per trade, ditulis writer yang sama
+            trades = logging.FileHandler(self.trades_file)
+            trades.setFormatter(logging.Formatter('%(message)s'))
+            trades.addFilter(lambda record: record.name == TRADES_LOGGER)
+            for handler in handlers:
+                handler.addFilter(lambda record: record.name != TRADES_LOGGER)
+            handlers.append(trades)
+
+        self._listener = logging.handlers.QueueListener(self._queue, *handlers, respect_handler_level=True)
+        self._listener.start()
+
+        root = logging.getLogger()
+        root.setLevel(self.level)
+        self._queue_handler = logging.handlers.QueueHandler(self._queue)
+        root.addHandler(self._queue_handler)
+
+        trades_logger = logging.getLogger(TRADES_LOGGER)
+        trades_logger.propagate = False
+        trades_logger.setLevel(logging.INFO)
+        if trades is not None:
+            self._trades_handler = logging.handlers.QueueHandler(self._queue)
+            trades_logger.addHandler(self._trades_handler)
+
+        atexit.register(self.stop)
+        return True
+
+    def stop(self):
+        """Flush antrian lalu stop writer"""
+        if self._listener is None:
+            return
+        root = logging.getLogger()
+        if self._queue_handler is not None:
+            root.removeHandler(self._queue_handler)
+        if self._trades_handler is not None:
+            logging.getLogger(TRADES_LOGGER).removeHandler(self._trades_handler)
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
+        self._listener = None
+
+    def get_status(self) -> Dict:
+        return {
+            'running': self._listener is not None,
+            'pending': self._queue.qsize(),
+            'log_file': self.log_file,
+            'events_file': self.events_file,
+            'trades_file': self.trades_file
+        }
+
+
+_pipeline: Optional[LoggingPipeline] = None
+_pipeline_lock = threading.Lock()
+
+
+def get_logging_pipeline(start: bool = True) -> LoggingPipeline:
+    """Logging pipeline process-wide (dibuat sekali)"""
+    global _pipeline
+    if _pipeline is None:
+        with _pipeline_lock:
+            if _pipeline is None:
+                _pipeline = LoggingPipeline()
+    if start:
+        _pipeline.start()
+    return _pipeline
+
+
+def read_events(path: str = None, events=None, since: datetime = None, limit: int = 2000):
+    """
+    Baca event JSON terakhir dari file event (tanpa regex).
+    events: filter nama event (iterable), since: datetime UTC-aware minimum.
+    """
+    path = path or BybitProductionConfig.LOGGING_CONFIG.get('events_file')
+    wanted = set(events) if events else None
+    results = []
+    try:
+        with open(path, 'r') as f:
+            lines = f.readlines()[-limit:]
+    except OSError:
+        return results
+    for line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if wanted and record.get('event') not in wanted:
+            continue
+        if since is not None and datetime.fromisoformat(record['ts']) < since:
+            continue
+        results.append(record)
+    return results
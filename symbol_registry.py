@@ -0,0 +1,156 @@
+"""
+🗂️ SNIPER SYMBOL REGISTRY - Basket Perpetual & Execution Lane per Symbol
+- SymbolSpec: contract spec (CONTRACT_SPECS) + parameter risiko per symbol (SYMBOL_CONFIG)
+- SymbolRegistry: symbol yang diterima webhook, normalisasi ticker TradingView (ETHUSDT.P, ETHUSDT-PERP)
+- SymbolLanes: satu ExecutionQueue (antrian + worker) per symbol; signal beda symbol
+  dieksekusi paralel, signal symbol yang sama tetap berurutan
+Author: Sniper AI Trading Agent
+"""
+
+import threading
+from typing import Callable, Dict, List, Optional
+
+from bybit_config import BybitProductionConfig
+from execution_queue import ExecutionQueue
+
+# Suffix ticker TradingView untuk perpetual
+TRADINGVIEW_SUFFIXES = ('.P', '-PERP', 'PERP')
+
+
+class SymbolSpec:
+    """Contract spec + risk parameter satu symbol"""
+
+    __slots__ = ('symbol', 'min_qty', 'max_qty', 'qty_step', 'min_notional', 'tick_size',
+                 'leverage', 'risk_per_trade', 'max_position_size')
+
+    def __init__(self, symbol: str, contract: Dict = None, overrides: Dict = None):
+        contract = contract or {}
+        overrides = overrides or {}
+        self.symbol = symbol
+        self.qty_step = contract.get('qtyStep', 0.001)
+        self.min_qty = contract.get('minOrderQty', self.qty_step)
+        self.max_qty = contract.get('maxOrderQty')
+        self.min_notional = contract.get('minNotionalValue', 1.0)
+        self.tick_size = contract.get('tickSize', 0.01)
+        self.leverage = overrides.get('leverage', BybitProductionConfig.LEVERAGE)
+        self.risk_per_trade = overrides.get('risk_per_trade', BybitProductionConfig.RISK_PER_TRADE)
+        self.max_position_size = overrides.get('max_position_size', BybitProductionConfig.MAX_POSITION_SIZE)
+
+    def round_qty(self, qty: float) -> float:
+        step = self.qty_step or 0.001
+        if step <= 0:
+            return round(qty, 4)
+        return round((qty / step)) * step
+
+    def to_dict(self) -> Dict:
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+
+class SymbolRegistry:
+    """Symbol yang aktif untuk trading (SYMBOL_CONFIG['symbols'] yang punya CONTRACT_SPECS)"""
+
+    def __init__(self, symbols: List[str] = None, overrides: Dict[str, Dict] = None):
+        config = BybitProductionConfig.SYMBOL_CONFIG
+        overrides = overrides if overrides is not None else config.get('overrides', {})
+        self._specs: Dict[str, SymbolSpec] = {}
+        for symbol in symbols or config.get('symbols') or [BybitProductionConfig.TARGET_SYMBOL]:
+            contract = BybitProductionConfig.CONTRACT_SPECS.get(symbol)
+            if contract is None:
+                continue  # tanpa contract spec tidak bisa sizing/rounding dengan benar
+            self._specs[symbol] = SymbolSpec(symbol, contract, overrides.get(symbol))
+
+    @staticmethod
+    def normalize(symbol: Optional[str]) -> str:
+        """'ethusdt.p' / 'ETHUSDT-PERP' -> 'ETHUSDT'"""
+        symbol = str(symbol or '').strip().upper()
+        for suffix in TRADINGVIEW_SUFFIXES:
+            if symbol.endswith(suffix):
+                return symbol[:-len(suffix)]
+        return symbol
+
+    def get(self, symbol: str) -> Optional[SymbolSpec]:
+        """Spec symbol aktif (None jika symbol tidak di-trade)"""
+        return self._specs.get(self.normalize(symbol))
+
+    def spec(self, symbol: str) -> SymbolSpec:
+        """Spec symbol aktif, atau spec dari CONTRACT_SPECS/default untuk symbol lain"""
+        symbol = self.normalize(symbol)
+        spec = self._specs.get(symbol)
+        if spec is None:
+            spec = SymbolSpec(symbol, BybitProductionConfig.CONTRACT_SPECS.get(symbol),
+                              BybitProductionConfig.SYMBOL_CONFIG.get('overrides', {}).get(symbol))
+        return spec
+
+    def is_supported(self, symbol: str) -> bool:
+        return self.get(symbol) is not None
+
+    def symbols(self) -> List[str]:
+        return list(self._specs)
+
+
+_registry: Optional[SymbolRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_symbol_registry() -> SymbolRegistry:
+    """Registry process-wide (dibuat sekali dari config)"""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = SymbolRegistry()
+    return _registry
+
+
+class SymbolLanes:
+    """Satu ExecutionQueue per symbol; handler(signal_id, payload) sama untuk semua lane"""
+
+    def __init__(self, handler: Callable[[str, Dict], Dict], registry: SymbolRegistry = None,
+                 workers: int = None, max_pending: int = None,
+                 on_update: Optional[Callable[[Dict], None]] = None):
+        config = BybitProductionConfig.SYMBOL_CONFIG
+        self.handler = handler
+        self.on_update = on_update
+        self.registry = registry or get_symbol_registry()
+        self.workers = workers or config.get('lane_workers', 1)
+        self.max_pending = max_pending or config.get('lane_max_pending', 20)
+        self._lanes: Dict[str, ExecutionQueue] = {}
+        self._lock = threading.Lock()
+
+    def lane(self, symbol: str) -> ExecutionQueue:
+        """Lane symbol (dibuat dan di-start saat pertama dipakai)"""
+        symbol = self.registry.normalize(symbol)
+        lane = self._lanes.get(symbol)
+        if lane is None:
+            with self._lock:
+                lane = self._lanes.get(symbol)
+                if lane is None:
+                    lane = ExecutionQueue(self.handler, workers=self.workers, max_pending=self.max_pending,
+                                          on_update=self.on_update)
+                    lane.start()
+                    self._lanes[symbol] = lane
+        return lane
+
+    def start(self) -> bool:
+        """Start lane untuk semua symbol aktif"""
+        for symbol in self.registry.symbols():
+            self.lane(symbol)
+        return True
+
+    def stop(self, timeout: float = 5.0):
+        for lane in list(self._lanes.values()):
+            lane.stop(timeout=timeout)
+
+    def submit(self, symbol: str, payload: Dict, signal_id: str = None) -> Optional[str]:
+        """Masukkan signal ke lane symbol; return signal_id, atau None jika lane penuh"""
+        return self.lane(symbol).submit(payload, signal_id=signal_id)
+
+    def get(self, signal_id: str) -> Optional[Dict]:
+        for lane in list(self._lanes.values()):
+            record = lane.get(signal_id)
+            if record is not None:
+                return record
+        return None
+
+    def get_status(self) -> Dict:
+        return {symbol: lane.get_status() for symbol, lane in list(self._lanes.items())}
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Modul repo berada di root (flat layout)
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from datetime import timedelta
+
+import pytest
+
+
+@pytest.fixture
+def make_webhook(tmp_path, tmp_path_factory):
+    """
+    SniperBybitWebhook tanpa __init__ (tanpa API key / websocket / exchange):
+    state store SQLite di tmp_path, schema + token asli, lane dan eksekusi diisi test.
+    """
+    flask = pytest.importorskip('flask')
+    from bybit_config import BybitProductionConfig
+    # Logging pipeline dibuat saat import modul webhook: arahkan file log ke tmp, bukan path produksi
+    logs = tmp_path_factory.getbasetemp()
+    BybitProductionConfig.LOGGING_CONFIG.update(console=False, log_file=str(logs / 'production.log'),
+                                                events_file=str(logs / 'events.jsonl'),
+                                                trades_file=str(logs / 'trades.log'))
+    webhook_app = pytest.importorskip('bybit_webhook_app')
+    from state_store import TradingStateStore
+    from symbol_registry import get_symbol_registry
+    from webhook_schema import SignalSchema, TokenVerifier
+
+    def build(db_name: str = 'state.db'):
+        webhook = object.__new__(webhook_app.SniperBybitWebhook)
+        webhook.config = BybitProductionConfig
+        webhook.app = flask.Flask('sniper-test')
+        webhook.state = TradingStateStore(str(tmp_path / db_name))
+        webhook.symbol_registry = get_symbol_registry()
+        webhook.signal_schema = SignalSchema(webhook.symbol_registry)
+        webhook.token_verifier = TokenVerifier([BybitProductionConfig.AUTH_TOKEN])
+        webhook.signal_cooldown = timedelta(seconds=30)
+        webhook._default_alert = {'timestamp': None, 'data': None, 'status': 'none',
+                                  'reason': None, 'execution_details': None}
+        return webhook
+
+    return build
@@ -0,0 +1,92 @@
+import asyncio
+import json
+
+from async_bybit_client import AsyncBybitProductionClient
+from bybit_client import TIMESTAMP_ERROR_RET_CODE
+from rate_limiter import RateLimiter
+
+
+class FakeResponse:
+    status = 200
+    headers = {}
+
+    def __init__(self, payload):
+        self.payload = payload
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def read(self):
+        return json.dumps(self.payload).encode()
+
+
+class FakeSession:
+    closed = False
+
+    def __init__(self, payloads):
+        self.payloads = list(payloads)
+        self.sent = 0
+
+    def request(self, method, url, **kwargs):
+        self.sent += 1
+        return FakeResponse(self.payloads.pop(0))
+
+
+def make_client(payloads):
+    client = AsyncBybitProductionClient('key', 'secret', base_url='https://async.test')
+    client.rate_limiter = RateLimiter(per_minute=6000)
+    session = FakeSession(payloads)
+    client._session = session
+    client._owns_session = False
+    return client, session
+
+
+def test_timestamp_error_resyncs_clock_and_retries_once():
+    client, session = make_client([
+        {'retCode': TIMESTAMP_ERROR_RET_CODE, 'retMsg': 'invalid request, please check your timestamp'},
+        {'retCode': 0, 'retMsg': 'OK', 'result': {}},
+    ])
+    syncs = []
+
+    async def sync_clock(samples=None):
+        syncs.append(True)
+        return {'success': True}
+
+    client.sync_clock = sync_clock
+    result = asyncio.run(client._send_request('GET', '/v5/account/wallet-balance', {'accountType': 'UNIFIED'}))
+
+    assert result['retCode'] == 0
+    assert session.sent == 2
+    assert syncs == [True]
+
+
+def test_timestamp_error_is_not_retried_twice():
+    client, session = make_client([{'retCode': TIMESTAMP_ERROR_RET_CODE, 'retMsg': 'timestamp'}] * 2)
+
+    async def sync_clock(samples=None):
+        return {'success': True}
+
+    client.sync_clock = sync_clock
+    result = asyncio.run(client._send_request('GET', '/v5/account/wallet-balance', {'accountType': 'UNIFIED'}))
+
+    assert result['retCode'] == TIMESTAMP_ERROR_RET_CODE
+    assert session.sent == 2
+
+
+def test_async_rejection_is_counted_on_limiter():
+    client, _ = make_client([])
+    limiter = RateLimiter(per_minute=60, config={'max_wait': {'normal': 0.0}, 'endpoint_limits': {'default': 1}})
+    client.rate_limiter = limiter
+
+    async def scenario():
+        assert await client._acquire('GET', '/v5/market/tickers')
+        assert not await client._acquire('GET', '/v5/market/tickers')
+
+    asyncio.run(scenario())
+    assert limiter.get_status()['rejected'] == 1
@@ -0,0 +1,87 @@
+import json
+import time
+
+from bybit_client import BybitProductionClient
+from bybit_config import BybitProductionConfig
+from circuit_breaker import CIRCUIT_OPEN_RET_CODE, STATE_HALF_OPEN, EndpointGuard
+
+ORDER = ('POST', '/v5/order/create')
+
+
+class FakeLimiter:
+    def __init__(self):
+        self.allow = True
+
+    def acquire(self, method, endpoint, priority=None):
+        return self.allow
+
+    def update_from_headers(self, *args, **kwargs):
+        pass
+
+
+class FakeResponse:
+    status_code = 200
+    headers = {}
+    content = json.dumps({'retCode': 0, 'retMsg': 'OK', 'result': {}}).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.calls = 0
+
+    def post(self, *args, **kwargs):
+        self.calls += 1
+        return FakeResponse()
+
+    get = post
+
+
+def make_client():
+    client = BybitProductionClient('key', 'secret', base_url='https://breaker.test')
+    client.guard = EndpointGuard({**BybitProductionConfig.RESILIENCE_CONFIG,
+                                  'failure_threshold': 1, 'reset_timeout': 0.01})
+    client.rate_limiter = FakeLimiter()
+    client.session = FakeSession()
+    return client
+
+
+def open_breaker(guard):
+    guard.record_failure(*ORDER)
+    time.sleep(0.02)  # reset_timeout lewat -> call berikutnya boleh jadi percobaan half-open
+
+
+def test_rate_limited_call_does_not_consume_half_open_trial():
+    client = make_client()
+    open_breaker(client.guard)
+
+    client.rate_limiter.allow = False
+    rejected = client._send_request(*ORDER, params={'symbol': 'ETHUSDT'})
+    assert rejected['retCode'] != CIRCUIT_OPEN_RET_CODE
+    assert client.session.calls == 0
+
+    client.rate_limiter.allow = True
+    result = client._send_request(*ORDER, params={'symbol': 'ETHUSDT'})
+    assert result['retCode'] == 0
+    assert client.session.calls == 1
+    assert client.guard.get_status()['POST /v5/order']['state'] == 'closed'
+
+
+def test_exception_before_response_releases_trial():
+    client = make_client()
+    open_breaker(client.guard)
+
+    def boom(*args, **kwargs):
+        raise RuntimeError('unexpected')
+
+    client.session.post = boom
+    try:
+        client._send_request(*ORDER, params={'symbol': 'ETHUSDT'})
+    except RuntimeError:
+        pass
+
+    # Trial dilepas: call berikutnya tetap mendapat slot percobaan (bukan fail-fast selamanya)
+    assert client.guard._breakers['POST /v5/order'].state == STATE_HALF_OPEN
+    assert client.guard.allow(*ORDER)
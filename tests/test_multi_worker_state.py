@@ -0,0 +1,41 @@
+from bybit_config import BybitProductionConfig
+
+PAYLOAD = {'action': 'SELL', 'symbol': 'ETHUSDT', 'price': 2500.0,
+           'token': BybitProductionConfig.AUTH_TOKEN}
+
+
+class RecordingLanes:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, symbol, payload, signal_id=None):
+        self.submitted.append(signal_id)
+        return signal_id
+
+
+def test_cooldown_is_shared_between_workers(make_webhook):
+    # Dua worker gunicorn = dua instance app dengan koneksi sendiri ke file SQLite yang sama
+    worker_a = make_webhook('shared.db')
+    worker_b = make_webhook('shared.db')
+    assert worker_b.precheck_trading_conditions('ETHUSDT')['valid']
+
+    worker_a.state.record_signal('ETHUSDT')
+
+    result = worker_b.precheck_trading_conditions('ETHUSDT')
+    assert not result['valid']
+    assert 'Signal cooldown' in result['reason']
+
+
+def test_webhook_on_other_worker_rejected_during_cooldown(make_webhook):
+    worker_a = make_webhook('shared.db')
+    worker_b = make_webhook('shared.db')
+    worker_b.execution_lanes = RecordingLanes()
+
+    worker_a.state.record_signal('ETHUSDT')
+
+    with worker_b.app.test_request_context('/webhook', method='POST', json=PAYLOAD):
+        response, status = worker_b.handle_webhook()
+
+    assert status == 400
+    assert 'Signal cooldown' in response.get_json()['error']
+    assert worker_b.execution_lanes.submitted == []
@@ -0,0 +1,39 @@
+import time
+from types import SimpleNamespace
+
+from bybit_client import BybitProductionClient
+from private_stream import PrivateStreamMirror
+
+
+def make_synced_mirror(stale_after=45.0):
+    client = SimpleNamespace(api_key='key', secret_key='secret')
+    mirror = PrivateStreamMirror(client, 'test', url='ws://stream.test', stale_after=stale_after)
+    mirror._connected.set()
+    mirror._authenticated = True
+    mirror._synced.set()
+    return mirror
+
+
+def test_mirror_without_recent_message_is_not_ready():
+    mirror = make_synced_mirror()
+    holder = SimpleNamespace(private_stream=mirror)
+
+    mirror.last_message_at = time.time()
+    assert mirror.is_ready()
+    assert BybitProductionClient._private_mirror(holder) is mirror
+
+    # Koneksi half-open: socket masih "connected" tapi pong tidak pernah datang
+    mirror.last_message_at = time.time() - 60
+    assert mirror.is_stale()
+    assert not mirror.is_ready()
+    assert BybitProductionClient._private_mirror(holder) is None
+    assert mirror.get_status()['stale'] is True
+
+
+def test_pong_refreshes_readiness():
+    mirror = make_synced_mirror(stale_after=5.0)
+    mirror.last_message_at = time.time() - 10
+    assert not mirror.is_ready()
+
+    mirror._on_message(None, '{"op": "pong", "success": true}')
+    assert mirror.is_ready()
@@ -0,0 +1,74 @@
+import asyncio
+import threading
+
+from async_bybit_client import AsyncBybitProductionClient
+from request_coalescer import SingleFlight, request_key
+
+BALANCE = ('GET', '/v5/account/wallet-balance', {'accountType': 'UNIFIED'})
+
+
+def make_async_client(calls, release):
+    client = AsyncBybitProductionClient('shared-key', 'secret', base_url='https://coalesce.test')
+
+    async def send(method, endpoint, params=None, priority=None):
+        calls.append(endpoint)
+        if method == 'GET':
+            await release.wait()
+        return {'retCode': 0, 'result': {'n': len(calls)}}
+
+    client._send_request = send
+    return client
+
+
+def test_async_clients_share_in_flight_reads():
+    async def scenario():
+        calls, release = [], asyncio.Event()
+        first, second = make_async_client(calls, release), make_async_client(calls, release)
+        reads = [asyncio.ensure_future(client._make_request(*BALANCE)) for client in (first, second)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*reads)
+        assert calls == ['/v5/account/wallet-balance']
+        assert results[0] is results[1]
+
+    asyncio.run(scenario())
+
+
+def test_async_write_detaches_reads_in_flight_on_other_client():
+    async def scenario():
+        calls, release = [], asyncio.Event()
+        reader, writer = make_async_client(calls, release), make_async_client(calls, release)
+        stale = asyncio.ensure_future(reader._make_request(*BALANCE))
+        await asyncio.sleep(0)
+
+        await writer._make_request('POST', '/v5/order/create', {'symbol': 'ETHUSDT'})
+        fresh = asyncio.ensure_future(reader._make_request(*BALANCE))
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(stale, fresh)
+
+        # Read setelah write tidak ikut menunggu request lama
+        assert calls.count('/v5/account/wallet-balance') == 2
+
+    asyncio.run(scenario())
+
+
+def test_sync_invalidate_drops_in_flight_result_from_cache():
+    single_flight = SingleFlight()
+    key = request_key('key', *BALANCE, priority='low')
+    started, release = threading.Event(), threading.Event()
+
+    def slow_read():
+        started.set()
+        release.wait()
+        return {'retCode': 0, 'result': 'before-write'}
+
+    reader = threading.Thread(target=single_flight.do, args=(key, slow_read), kwargs={'ttl': 60})
+    reader.start()
+    started.wait()
+    single_flight.invalidate('key')
+    release.set()
+    reader.join()
+
+    result = single_flight.do(key, lambda: {'retCode': 0, 'result': 'after-write'}, ttl=60)
+    assert result['result'] == 'after-write'
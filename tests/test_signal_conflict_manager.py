@@ -0,0 +1,35 @@
+from models import Position
+from signal_conflict_manager import SignalConflictManager
+
+
+class FakeClient:
+    def __init__(self, position, price):
+        self.position = position
+        self.price = price
+
+    def get_position(self, symbol):
+        return self.position
+
+    def get_current_price(self, symbol):
+        return self.price
+
+
+def test_reversal_decision_carries_unrealised_pnl():
+    manager = SignalConflictManager()
+
+    decision = manager._make_reversal_decision('acc', 1.5, 12.34, 'BUY', 'SELL')
+
+    assert decision['action'] == 'partial_close'
+    assert decision['unrealised_pnl'] == 12.34
+
+
+def test_analyze_reads_unrealised_pnl_from_position():
+    position = Position.from_api({'symbol': 'ETHUSDT', 'side': 'Buy', 'size': '0.5',
+                                  'avgPrice': '2000', 'unrealisedPnl': '-4.5'})
+    manager = SignalConflictManager()
+
+    decision = manager.analyze_signal_conflict('acc', FakeClient(position, 1980.0),
+                                               {'action': 'SELL'}, 'ETHUSDT')
+
+    assert decision['action'] == 'partial_close'
+    assert decision['unrealised_pnl'] == -4.5
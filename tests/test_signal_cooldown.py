@@ -0,0 +1,19 @@
+from datetime import datetime, timedelta
+
+
+def test_signal_recorded_after_startup_starts_cooldown(make_webhook):
+    webhook = make_webhook()
+    assert webhook.precheck_trading_conditions('ETHUSDT')['valid']
+
+    webhook.state.record_signal('ETHUSDT')
+
+    result = webhook.precheck_trading_conditions('ETHUSDT')
+    assert not result['valid']
+    assert 'Signal cooldown' in result['reason']
+
+
+def test_cooldown_expires(make_webhook):
+    webhook = make_webhook()
+    webhook.state.record_signal('ETHUSDT', when=datetime.now() - timedelta(seconds=31))
+
+    assert webhook.precheck_trading_conditions('ETHUSDT')['valid']
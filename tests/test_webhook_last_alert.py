@@ -0,0 +1,51 @@
+from bybit_config import BybitProductionConfig
+
+PAYLOAD = {'action': 'BUY', 'symbol': 'ETHUSDT.P', 'price': 2500.0,
+           'token': BybitProductionConfig.AUTH_TOKEN}
+
+
+class InlineLanes:
+    """Lane yang mengeksekusi signal langsung di dalam submit (worker lebih cepat dari handler)"""
+
+    def __init__(self, webhook):
+        self.webhook = webhook
+
+    def submit(self, symbol, payload, signal_id=None):
+        self.webhook.execute_queued_signal(signal_id, payload)
+        return signal_id
+
+
+class FullLanes:
+    def submit(self, symbol, payload, signal_id=None):
+        return None
+
+
+def post(webhook, payload):
+    with webhook.app.test_request_context('/webhook', method='POST', json=payload):
+        response, status = webhook.handle_webhook()
+        return response.get_json(), status
+
+
+def test_inline_execution_is_not_overwritten_by_queued(make_webhook):
+    webhook = make_webhook()
+    webhook.execution_lanes = InlineLanes(webhook)
+    webhook._execute_signal = lambda signal_id, data: {'success': True, 'trade_plan': {}}
+
+    body, status = post(webhook, PAYLOAD)
+
+    assert status == 202
+    assert webhook.last_alert['signal_id'] == body['signal_id']
+    assert webhook.last_alert['status'] == 'executed'
+
+
+def test_full_lane_restores_previous_alert(make_webhook):
+    webhook = make_webhook()
+    previous = {'timestamp': 'earlier', 'signal_id': 'sig-previous', 'data': None,
+                'status': 'executed', 'reason': None, 'execution_details': None}
+    webhook.last_alert = previous
+    webhook.execution_lanes = FullLanes()
+
+    body, status = post(webhook, PAYLOAD)
+
+    assert status == 503
+    assert webhook.last_alert == previous
@@ -57,14 +57,14 @@ class WebhookEnhancedPatch:
             apifan_key = os.getenv('BYBIT_APIFAN_API_KEY')
             apifan_secret = os.getenv('BYBIT_APIFAN_SECRET_KEY')
             if apifan_key and apifan_secret:
-                accounts['apifan'] = BybitProductionClient(apifan_key, apifan_secret)
+                accounts['apifan'] = BybitProductionClient(apifan_key, apifan_secret, account_name='apifan')
                 logger.info("✅ APIFAN client initialized")
             
             # APIARIF account
             apiarif_key = os.getenv('BYBIT_APIARIF_API_KEY')
             apiarif_secret = os.getenv('BYBIT_APIARIF_SECRET_KEY')
             if apiarif_key and apiarif_secret:
-                accounts['apiarif'] = BybitProductionClient(apiarif_key, apiarif_secret)
+                accounts['apiarif'] = BybitProductionClient(apiarif_key, apiarif_secret, account_name='apiarif')
                 logger.info("✅ APIARIF client initialized")
             
             if not accounts:
@@ -0,0 +1,137 @@
+"""
+🧾 SNIPER WEBHOOK SCHEMA - Validasi Payload Alert TradingView (Fast Path)
+Schema dikompilasi sekali saat startup: setiap field punya satu fungsi validator,
+pilihan action berupa frozenset dan pola symbol regex yang sudah di-compile.
+Payload rusak ditolak dalam mikrodetik sebelum menyentuh state store atau exchange.
+Token diverifikasi constant-time (hmac.compare_digest) dan tidak pernah di-log.
+Author: Sniper AI Trading Agent
+"""
+
+import hmac
+import math
+import re
+from typing import Callable, Dict, Iterable, Optional
+
+from bybit_config import BybitProductionConfig
+from symbol_registry import SymbolRegistry, get_symbol_registry
+
+ACTIONS = frozenset(('BUY', 'SELL'))
+TOKEN_FIELDS = ('token', 'auth_token')
+SYMBOL_PATTERN = re.compile(r'^[A-Z0-9]{2,24}(?:\.P|-PERP|PERP)?$')
+
+
+class SchemaError(ValueError):
+    """Payload tidak sesuai schema (pesan aman dikembalikan ke client)"""
+
+
+def _number(name: str, positive: bool = False) -> Callable:
+    def validate(value):
+        if isinstance(value, bool):
+            raise SchemaError(f'Invalid {name}: must be a number')
+        try:
+            number = float(value)
+        except (TypeError, ValueError):
+            raise SchemaError(f'Invalid {name}: must be a number')
+        if not math.isfinite(number) or (positive and number <= 0):
+            raise SchemaError(f'Invalid {name}: {value}')
+        return number
+    return validate
+
+
+def _string(default_name: str, max_length: int) -> Callable:
+    def validate(value, name: str = default_name):
+        if not isinstance(value, (str, int, float)) or isinstance(value, bool):
+            raise SchemaError(f'Invalid {name}: must be a string')
+        value = str(value)
+        if len(value) > max_length:
+            raise SchemaError(f'Invalid {name}: longer than {max_length} characters')
+        return value
+    return validate
+
+
+def _action(value):
+    action = str(value or '').strip().upper()
+    if action not in ACTIONS:
+        raise SchemaError(f'Invalid action: {action}. Must be BUY or SELL.')
+    return action
+
+
+class SignalSchema:
+    """
+    validate(data) -> payload bersih (action/symbol ter-normalisasi, angka sudah float, token dibuang).
+    Raise SchemaError jika payload tidak valid.
+    """
+
+    def __init__(self, registry: SymbolRegistry = None, default_symbol: str = None, config: Dict = None):
+        config = config or BybitProductionConfig.WEBHOOK_SCHEMA_CONFIG
+        self.registry = registry or get_symbol_registry()
+        self.default_symbol = default_symbol or BybitProductionConfig.TARGET_SYMBOL
+        self.max_body_bytes = config.get('max_body_bytes', 4096)
+        self.max_fields = config.get('max_fields', 32)
+        max_length = config.get('max_string_length', 128)
+        # Field opsional: key -> validator; field lain diteruskan apa adanya (dengan batas panjang)
+        self._validators: Dict[str, Callable] = {
+            'price': _number('price', positive=True),
+            'confidence': _number('confidence'),
+            'timestamp': _string('timestamp', max_length),
+            'exchange': _string('exchange', max_length),
+            'strategy': _string('strategy', max_length),
+            'timeframe': _string('timeframe', max_length),
+        }
+        self._passthrough = _string('field', max_length)  # dipanggil dengan nama key
+        self._supported = ', '.join(self.registry.symbols())
+
+    def _symbol(self, value) -> str:
+        raw = str(value or self.default_symbol).strip().upper()
+        if not SYMBOL_PATTERN.match(raw):
+            raise SchemaError(f'Invalid symbol: {raw[:32]}. Supported: {self._supported}.')
+        symbol = self.registry.normalize(raw)
+        if not self.registry.is_supported(symbol):
+            raise SchemaError(f'Invalid symbol: {symbol}. Supported: {self._supported}.')
+        return symbol
+
+    def validate(self, data) -> Dict:
+        if not isinstance(data, dict):
+            raise SchemaError('Invalid payload: expected a JSON object')
+        if len(data) > self.max_fields:
+            raise SchemaError(f'Invalid payload: more than {self.max_fields} fields')
+
+        payload = {'action': _action(data.get('action')), 'symbol': self._symbol(data.get('symbol'))}
+        for key, value in data.items():
+            if key in payload or key in TOKEN_FIELDS or value is None:
+                continue
+            validator = self._validators.get(key)
+            if validator is not None:
+                payload[key] = validator(value)
+            elif isinstance(key, str) and len(key) <= 64:
+                payload[key] = self._passthrough(value, key)
+            else:
+                raise SchemaError('Invalid payload: bad field name')
+        return payload
+
+
+class TokenVerifier:
+    """Bandingkan token constant-time terhadap semua token yang diterima"""
+
+    def __init__(self, tokens: Iterable[str]):
+        self._tokens = tuple({token.encode() for token in tokens if token})
+
+    @staticmethod
+    def extract(data: Dict, authorization: Optional[str] = None) -> Optional[str]:
+        """Token dari payload (token / auth_token) atau header Authorization (Bearer)"""
+        token = None
+        if isinstance(data, dict):
+            token = data.get('token') or data.get('auth_token')
+        token = token or authorization
+        if not token or not isinstance(token, str):
+            return None
+        return token[7:] if token.startswith('Bearer ') else token
+
+    def verify(self, token: Optional[str]) -> bool:
+        if not token:
+            return False
+        candidate = token.encode()
+        # Semua token dibandingkan (tanpa short-circuit) agar waktu respons tidak bocor
+        matches = [hmac.compare_digest(candidate, expected) for expected in self._tokens]
+        return any(matches)
+
@@ -0,0 +1,201 @@
+"""
+⚡ SNIPER WS ORDER ENTRY - Bybit V5 Trade WebSocket
+Satu koneksi trade websocket ter-autentikasi per akun untuk order create/amend/cancel
+(termasuk batch). Order dikirim sebagai frame JSON tanpa HTTP request dan signature
+per order; ack dicocokkan lewat reqId. Jika stream belum siap, request dikirim via REST.
+Jika ack tidak datang, client mengonfirmasi ulang via REST memakai orderLinkId yang sama.
+Author: Sniper AI Trading Agent
+"""
+
+import json
+import logging
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+from bybit_config import BybitProductionConfig
+from market_data_feed import BybitStreamConnection, build_auth_message
+
+logger = logging.getLogger(__name__)
+
+# Endpoint REST -> op trade websocket
+WS_ORDER_OPS = {
+    '/v5/order/create': 'order.create',
+    '/v5/order/amend': 'order.amend',
+    '/v5/order/cancel': 'order.cancel',
+    '/v5/order/create-batch': 'order.create-batch',
+    '/v5/order/amend-batch': 'order.amend-batch',
+    '/v5/order/cancel-batch': 'order.cancel-batch'
+}
+
+DUPLICATE_ORDER_LINK_ID = 110072  # retCode Bybit: orderLinkId sudah dipakai
+
+
+def new_order_link_id() -> str:
+    """orderLinkId unik (maks 36 karakter) agar retry REST tidak membuat order ganda"""
+    return f"sniper-{uuid.uuid4().hex[:24]}"
+
+
+class _PendingRequest:
+    __slots__ = ('done', 'response')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.response: Optional[Dict] = None
+
+
+class WebSocketOrderEntry(BybitStreamConnection):
+    """Transport order via /v5/trade: submit() blocking sampai ack atau timeout"""
+
+    name = 'order-entry'
+
+    def __init__(self, client, account_name: str = None, url: str = None,
+                 ping_interval: float = None, max_backoff: float = None, response_timeout: float = None):
+        config = BybitProductionConfig.ORDER_ENTRY_CONFIG
+        super().__init__(
+            url or BybitProductionConfig.get_bybit_trade_ws_url(),
+            ping_interval=ping_interval if ping_interval is not None else config.get('ping_interval', 20),
+            max_backoff=max_backoff if max_backoff is not None else config.get('max_backoff', 30.0)
+        )
+        self.client = client
+        self.account_name = account_name or 'default'
+        self.name = f"order-entry-{self.account_name}"
+        self.auth_expires_ms = config.get('auth_expires_ms', 10000)
+        self.response_timeout = response_timeout if response_timeout is not None \
+            else config.get('response_timeout', 2.0)
+
+        self._pending: Dict[str, _PendingRequest] = {}
+        self._lock = threading.Lock()
+        self._authenticated = threading.Event()
+        self.stats = {'sent': 0, 'acked': 0, 'unconfirmed': 0, 'auth_failures': 0}
+
+    # ------------------------------------------------------------------ auth / lifecycle
+
+    def _on_connected(self):
+        self._authenticated.clear()
+        self._send(build_auth_message(self.client.api_key, self.client.secret_key, self.auth_expires_ms))
+
+    def _on_disconnected(self):
+        self._authenticated.clear()
+        # Request yang sudah terkirim tanpa ack: status order tidak diketahui
+        with self._lock:
+            pending = list(self._pending.values())
+            self._pending.clear()
+        for request in pending:
+            request.done.set()
+
+    def is_ready(self) -> bool:
+        """True jika terkoneksi dan ter-autentikasi"""
+        return self.connected and self._authenticated.is_set()
+
+    def wait_ready(self, timeout: float = 5.0) -> bool:
+        return self._authenticated.wait(timeout) and self.is_ready()
+
+    @staticmethod
+    def supports(endpoint: str) -> bool:
+        return endpoint in WS_ORDER_OPS
+
+    # ------------------------------------------------------------------ submit
+
+    def submit(self, endpoint: str, params: Dict, timeout: float = None) -> Optional[Dict]:
+        """
+        Kirim request order via websocket. Return:
+        - None jika tidak terkirim (stream belum siap) -> caller pakai REST
+        - respon berbentuk REST ({'retCode', 'retMsg', 'result', ...}) jika ack diterima
+        - {'retCode': -1, 'unconfirmed': True} jika terkirim tapi ack tidak datang
+        """
+        op = WS_ORDER_OPS.get(endpoint)
+        if op is None or not self.is_ready():
+            return None
+
+        req_id = uuid.uuid4().hex
+        message = {
+            'reqId': req_id,
+            'header': {
+                'X-BAPI-TIMESTAMP': str(self.client.clock.now_ms()),
+                'X-BAPI-RECV-WINDOW': str(self.client.signer.recv_window)
+            },
+            'op': op,
+            'args': [params]
+        }
+        request = _PendingRequest()
+        with self._lock:
+            self._pending[req_id] = request
+        try:
+            self._ws.send(json.dumps(message, separators=(',', ':')))
+        except Exception as e:
+            with self._lock:
+                self._pending.pop(req_id, None)
+            logger.warning(f"⚠️ {self.name} send failed, REST fallback: {e}")
+            return None
+        self.stats['sent'] += 1
+
+        request.done.wait(timeout if timeout is not None else self.response_timeout)
+        with self._lock:
+            self._pending.pop(req_id, None)
+        if request.response is None:
+            self.stats['unconfirmed'] += 1
+            return {'retCode': -1, 'retMsg': f'{op} ack not received', 'unconfirmed': True}
+        self.stats['acked'] += 1
+        return request.response
+
+    # ------------------------------------------------------------------ messages
+
+    def _handle_message(self, message: Dict):
+        op = message.get('op')
+        if op == 'auth':
+            if message.get('success') or message.get('retCode') == 0:
+                self._authenticated.set()
+                logger.info(f"🔐 {self.name} authenticated")
+            else:
+                self.stats['auth_failures'] += 1
+                logger.error(f"❌ {self.name} auth failed: {message.get('retMsg') or message.get('ret_msg')}")
+            return
+
+        req_id = message.get('reqId')
+        if not req_id:
+            return
+        with self._lock:
+            request = self._pending.get(req_id)
+        if request is None:
+            return
+        request.response = {
+            'retCode': message.get('retCode'),
+            'retMsg': message.get('retMsg', ''),
+            'result': message.get('data') or {},
+            'retExtInfo': message.get('retExtInfo') or {},
+            'header': message.get('header') or {},
+            'time': int(time.time() * 1000)
+        }
+        request.done.set()
+
+    def get_status(self) -> Dict:
+        return {
+            'connected': self.connected,
+            'authenticated': self._authenticated.is_set(),
+            'reconnects': self.reconnects,
+            'pending': len(self._pending),
+            **self.stats
+        }
+
+
+_entries: Dict[str, WebSocketOrderEntry] = {}
+_entries_lock = threading.Lock()
+
+
+def get_order_entry(client, account_name: str = None, start: bool = True) -> Optional[WebSocketOrderEntry]:
+    """
+    Trade websocket per API key (satu koneksi per akun per proses).
+    Return None jika order entry websocket dinonaktifkan di config.
+    """
+    if not BybitProductionConfig.ORDER_ENTRY_CONFIG.get('enabled', True):
+        return None
+    with _entries_lock:
+        entry = _entries.get(client.api_key)
+        if entry is None:
+            entry = WebSocketOrderEntry(client, account_name=account_name)
+            _entries[client.api_key] = entry
+    if start:
+        entry.start()
+    return entry
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+🧪 LOCAL WEBSOCKET STAND-IN - Bybit V5 stream lokal
+Server websocket minimal (stdlib, RFC 6455) untuk menguji feed public/private
+tanpa koneksi ke exchange. Meniru perilaku dasar stream Bybit:
+ping/pong, subscribe, auth (private stream), dan push pesan topic dari sisi "exchange".
+
+Contoh:
+    server = LocalWebSocketServer()
+    url = server.start()                      # ws://127.0.0.1:<port>
+    feed = PublicMarketDataFeed(['ETHUSDT'], url=url)
+    feed.start()
+    server.broadcast({'topic': 'tickers.ETHUSDT', 'type': 'snapshot',
+                      'data': {'symbol': 'ETHUSDT', 'lastPrice': '3000.5'}})
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+WS_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONT = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class StandInConnection:
+    """Satu koneksi client di stand-in server"""
+
+    def __init__(self, server: 'LocalWebSocketServer', sock: socket.socket, path: str):
+        self.server = server
+        self.sock = sock
+        self.path = path
+        self.subscriptions: List[str] = []
+        self.authenticated = False
+        self.api_key: Optional[str] = None
+        self.closed = False
+        self._send_lock = threading.Lock()
+
+    def send(self, message):
+        """Kirim text frame (dict otomatis di-JSON-kan)"""
+        if not isinstance(message, str):
+            message = json.dumps(message)
+        self._send_frame(OP_TEXT, message.encode('utf-8'))
+
+    def _send_frame(self, opcode: int, payload: bytes):
+        header = bytes([0x80 | opcode])
+        length = len(payload)
+        if length < 126:
+            header += bytes([length])
+        elif length < 65536:
+            header += bytes([126]) + struct.pack('!H', length)
+        else:
+            header += bytes([127]) + struct.pack('!Q', length)
+        try:
+            with self._send_lock:
+                self.sock.sendall(header + payload)
+        except OSError:
+            self.closed = True
+
+    def close(self):
+        """Tutup koneksi dari sisi server (untuk uji reconnect)"""
+        if not self.closed:
+            self._send_frame(OP_CLOSE, struct.pack('!H', 1000))
+            self.closed = True
+            try:
+                self.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+            self.sock.close()
+
+    def _recv_exact(self, size: int) -> bytes:
+        data = b''
+        while len(data) < size:
+            chunk = self.sock.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError('socket closed')
+            data += chunk
+        return data
+
+    def read_frame(self):
+        """Baca satu frame dari client (client frame selalu ter-mask)"""
+        first, second = self._recv_exact(2)
+        opcode = first & 0x0F
+        masked = second & 0x80
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack('!H', self._recv_exact(2))[0]
+        elif length == 127:
+            length = struct.unpack('!Q', self._recv_exact(8))[0]
+        mask = self._recv_exact(4) if masked else b'\x00\x00\x00\x00'
+        payload = bytearray(self._recv_exact(length))
+        for i in range(length):
+            payload[i] ^= mask[i % 4]
+        return opcode, bytes(payload)
+
+
+def bybit_op_handler(connection: StandInConnection, message: dict):
+    """Handler default yang meniru respon op Bybit V5 (ping, subscribe, auth)"""
+    op = message.get('op')
+    req_id = message.get('req_id')
+    if op == 'ping':
+        connection.send({'success': True, 'ret_msg': 'pong', 'op': 'ping', 'req_id': req_id, 'conn_id': 'standin'})
+    elif op == 'subscribe':
+        connection.subscriptions.extend(message.get('args', []))
+        connection.send({'success': True, 'ret_msg': '', 'op': 'subscribe', 'req_id': req_id, 'conn_id': 'standin'})
+    elif op == 'unsubscribe':
+        for topic in message.get('args', []):
+            if topic in connection.subscriptions:
+                connection.subscriptions.remove(topic)
+        connection.send({'success': True, 'ret_msg': '', 'op': 'unsubscribe', 'req_id': req_id, 'conn_id': 'standin'})
+    elif op == 'auth':
+        args = message.get('args') or []
+        if _verify_auth(connection.server.api_secrets, args):
+            connection.authenticated = True
+            connection.api_key = args[0] if args else None
+            connection.send({'success': True, 'ret_msg': '', 'op': 'auth', 'conn_id': 'standin'})
+        else:
+            connection.send({'success': False, 'ret_msg': 'Invalid apikey or signature', 'op': 'auth',
+                             'conn_id': 'standin'})
+
+
+def _verify_auth(api_secrets: Optional[Dict[str, str]], args: List) -> bool:
+    """Validasi args auth [api_key, expires, signature]; tanpa api_secrets semua diterima"""
+    if not api_secrets:
+        return True
+    if len(args) != 3 or args[0] not in api_secrets:
+        return False
+    api_key, expires, signature = args
+    if int(expires) < int(time.time() * 1000):
+        return False
+    expected = hmac.new(api_secrets[api_key].encode('utf-8'), f"GET/realtime{expires}".encode('utf-8'),
+                        hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, str(signature))
+
+
+class LocalWebSocketServer:
+    """Threaded websocket server lokal untuk stand-in stream Bybit"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 handler: Optional[Callable[[StandInConnection, dict], None]] = None,
+                 api_secrets: Optional[Dict[str, str]] = None):
+        self.host = host
+        self.api_secrets = api_secrets  # {api_key: secret} untuk validasi op auth (private stream)
+        self.port = port
+        self.handler = handler or bybit_op_handler
+        self.connections: List[StandInConnection] = []
+        self.received: List[dict] = []
+        self._sock: Optional[socket.socket] = None
+        self._running = False
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"ws://{self.host}:{self.port}"
+
+    def start(self) -> str:
+        """Start server di background thread, return ws:// URL"""
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind((self.host, self.port))
+        self.port = self._sock.getsockname()[1]
+        self._sock.listen(16)
+        self._running = True
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        """Stop server dan tutup semua koneksi"""
+        self._running = False
+        for connection in list(self.connections):
+            connection.close()
+        if self._sock:
+            self._sock.close()
+
+    def broadcast(self, message, topic: Optional[str] = None):
+        """
+        Push pesan ke semua koneksi. Jika topic diberikan (atau ada di message),
+        hanya koneksi yang subscribe ke topic tersebut yang menerima.
+        """
+        if topic is None and isinstance(message, dict):
+            topic = message.get('topic')
+        with self._lock:
+            targets = [c for c in self.connections if not c.closed]
+        for connection in targets:
+            if topic is None or topic in connection.subscriptions or not connection.subscriptions:
+                connection.send(message)
+
+    def drop_connections(self):
+        """Putus semua koneksi aktif (simulasi disconnect exchange)"""
+        with self._lock:
+            targets = list(self.connections)
+            self.connections = []
+        for connection in targets:
+            connection.close()
+
+    def _accept_loop(self):
+        while self._running:
+            try:
+                client, _ = self._sock.accept()
+            except OSError:
+                break
+            threading.Thread(target=self._serve, args=(client,), daemon=True).start()
+
+    def _handshake(self, client: socket.socket) -> Optional[str]:
+        request = b''
+        while b'\r\n\r\n' not in request:
+            chunk = client.recv(4096)
+            if not chunk:
+                return None
+            request += chunk
+        lines = request.decode('latin-1').split('\r\n')
+        path = lines[0].split(' ')[1] if len(lines[0].split(' ')) > 1 else '/'
+        headers = {}
+        for line in lines[1:]:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                headers[key.strip().lower()] = value.strip()
+        key = headers.get('sec-websocket-key')
+        if not key:
+            return None
+        accept = base64.b64encode(hashlib.sha1((key + WS_GUID).encode()).digest()).decode()
+        client.sendall((
+            'HTTP/1.1 101 Switching Protocols\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Accept: {accept}\r\n\r\n'
+        ).encode())
+        return path
+
+    def _serve(self, client: socket.socket):
+        path = self._handshake(client)
+        if path is None:
+            client.close()
+            return
+        connection = StandInConnection(self, client, path)
+        with self._lock:
+            self.connections.append(connection)
+        try:
+            while self._running and not connection.closed:
+                opcode, payload = connection.read_frame()
+                if opcode == OP_CLOSE:
+                    break
+                if opcode == OP_PING:
+                    connection._send_frame(OP_PONG, payload)
+                    continue
+                if opcode not in (OP_TEXT, OP_BINARY, OP_CONT):
+                    continue
+                try:
+                    message = json.loads(payload.decode('utf-8'))
+                except ValueError:
+                    continue
+                self.received.append(message)
+                self.handler(connection, message)
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            connection.closed = True
+            with self._lock:
+                if connection in self.connections:
+                    self.connections.remove(connection)
+            try:
+                client.close()
+            except OSError:
+                pass
+
+
+if __name__ == '__main__':
+    server = LocalWebSocketServer(port=8765)
+    print(f"🧪 Bybit websocket stand-in running at {server.start()}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
@@ -0,0 +1,17 @@
+"""
+🦄 SNIPER WSGI ENTRYPOINT - Multi-worker Deployment (gunicorn)
+Setiap worker membuat SniperBybitWebhook sendiri (koneksi, websocket, snapshot);
+daily limit, cooldown, dedupe signal dan status signal dibagi lewat state store SQLite.
+Jalankan: gunicorn -c gunicorn.conf.py wsgi:app
+Author: Sniper AI Trading Agent
+"""
+
+from dotenv import load_dotenv
+
+load_dotenv('.env.bybit')
+
+from bybit_webhook_app import SniperBybitWebhook  # noqa: E402 (env harus dimuat dulu)
+
+webhook = SniperBybitWebhook()
+webhook.start_background()
+app = webhook.app